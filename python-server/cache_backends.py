@@ -0,0 +1,212 @@
+"""
+공유 캐시 저장소 모듈
+여러 서버 복제본이 오디오 블롭과 캐시 항목 정보를 공유하기 위한 저장소 구현
+(로컬/네트워크 디스크, S3 호환 오브젝트 스토리지)
+"""
+
+import os
+import shutil
+import tempfile
+import logging
+from pathlib import Path
+from typing import Optional
+
+from constants import (
+    CACHE_SHARED_BACKEND,
+    CACHE_SHARED_DIR,
+    CACHE_S3_BUCKET,
+    CACHE_S3_PREFIX,
+    CACHE_S3_ENDPOINT_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    공유 캐시 저장소 인터페이스
+    
+    키는 "blobs/<해시>.mp3", "entries/<캐시 키>.json" 형식의 상대 경로이다.
+    """
+    
+    name = "base"
+    
+    def exists(self, key: str) -> bool:
+        """키에 해당하는 객체 존재 여부"""
+        raise NotImplementedError
+    
+    def download_file(self, key: str, dest_path: str) -> bool:
+        """
+        객체를 파일로 내려받기
+        
+        Returns:
+            성공 여부 (객체가 없으면 False)
+        """
+        raise NotImplementedError
+    
+    def upload_file(self, key: str, src_path: str):
+        """파일을 객체로 올리기 (원본 파일은 유지)"""
+        raise NotImplementedError
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """객체 내용 반환 (없으면 None)"""
+        raise NotImplementedError
+    
+    def put_bytes(self, key: str, data: bytes):
+        """객체 내용 저장"""
+        raise NotImplementedError
+    
+    def delete(self, key: str):
+        """객체 삭제 (없으면 무시)"""
+        raise NotImplementedError
+
+
+class LocalDiskBackend(CacheBackend):
+    """
+    디렉토리 기반 공유 저장소 (NFS 등 여러 서버가 마운트한 디스크)
+    
+    쓰기는 임시 파일에 쓴 뒤 os.replace로 교체하여 다른 서버가 쓰는 중인 파일을 읽지 않게 한다.
+    """
+    
+    name = "local"
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        return self.root / key
+    
+    def _atomic_write(self, key: str, write):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".partial")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+    
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+    
+    def download_file(self, key: str, dest_path: str) -> bool:
+        try:
+            shutil.copyfile(self._path(key), dest_path)
+        except FileNotFoundError:
+            return False
+        return True
+    
+    def upload_file(self, key: str, src_path: str):
+        def write(f):
+            with open(src_path, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        self._atomic_write(key, write)
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def put_bytes(self, key: str, data: bytes):
+        self._atomic_write(key, lambda f: f.write(data))
+    
+    def delete(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+
+class S3Backend(CacheBackend):
+    """
+    S3 호환 오브젝트 스토리지 저장소 (AWS S3, MinIO 등)
+    
+    인증 정보는 boto3 기본 방식(AWS_ACCESS_KEY_ID 환경 변수, ~/.aws 등)을 따르며,
+    endpoint_url을 지정하면 MinIO 같은 S3 호환 서버를 사용한다.
+    객체 보관 기간은 버킷의 수명 주기 규칙으로 관리한다.
+    """
+    
+    name = "s3"
+    
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("S3 캐시 저장소를 사용하려면 boto3를 설치해야 합니다 (pip install boto3)") from e
+        
+        self._client_error = ClientError
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+    
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+    
+    def _is_not_found(self, error) -> bool:
+        code = error.response.get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+    
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return False
+            raise
+        return True
+    
+    def download_file(self, key: str, dest_path: str) -> bool:
+        try:
+            self.client.download_file(self.bucket, self._key(key), dest_path)
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return False
+            raise
+        return True
+    
+    def upload_file(self, key: str, src_path: str):
+        self.client.upload_file(src_path, self.bucket, self._key(key))
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        return response["Body"].read()
+    
+    def put_bytes(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+    
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def create_shared_backend() -> Optional[CacheBackend]:
+    """
+    CACHE_SHARED_BACKEND 설정에 따라 공유 저장소 생성
+    
+    Returns:
+        공유 저장소 또는 None (사용하지 않거나 생성 실패 시, 로컬 캐시만 사용)
+    """
+    if not CACHE_SHARED_BACKEND:
+        return None
+    
+    try:
+        if CACHE_SHARED_BACKEND == "local":
+            backend = LocalDiskBackend(CACHE_SHARED_DIR)
+        elif CACHE_SHARED_BACKEND == "s3":
+            if not CACHE_S3_BUCKET:
+                raise ValueError("CACHE_S3_BUCKET이 설정되지 않았습니다")
+            backend = S3Backend(CACHE_S3_BUCKET, CACHE_S3_PREFIX, CACHE_S3_ENDPOINT_URL)
+        else:
+            raise ValueError(f"알 수 없는 공유 캐시 저장소: {CACHE_SHARED_BACKEND}")
+    except Exception as e:
+        logger.error(f"공유 캐시 저장소 초기화 실패, 로컬 캐시만 사용: {e}")
+        return None
+    
+    logger.info(f"공유 캐시 저장소 사용: {backend.name}")
+    return backend
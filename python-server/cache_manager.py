@@ -4,207 +4,1334 @@
 """
 
 import os
+import re
 import hashlib
 import json
+import sqlite3
 import time
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlparse, parse_qs
 import logging
 
-from constants import CACHE_DIR, CACHE_RETENTION_HOURS, CACHE_CLEANUP_INTERVAL
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from constants import (
+    CACHE_DIR,
+    CACHE_RETENTION_HOURS,
+    CACHE_RETENTION_HOURS_BY_TIER,
+    CACHE_VALUE_TTL_HOURS_BY_TIER,
+    CACHE_CLEANUP_INTERVAL,
+    CACHE_JANITOR_MAX_DELETES,
+    CACHE_WORK_DIR_MAX_AGE_HOURS,
+    CACHE_MAX_SIZE_MB,
+    CACHE_MAX_ENTRIES,
+    CACHE_EVICTION_POLICY,
+    CACHE_SHARED_UPLOAD_WORKERS,
+    CACHE_SHARED_VALUE_TIERS
+)
+from cache_backends import CacheBackend, create_shared_backend
 
 logger = logging.getLogger(__name__)
 
+TimeRange = Tuple[float, Optional[float]]
+
+# 용량 초과 시 제거 순서 (앞에 올수록 먼저 제거)
+_EVICTION_ORDER = {
+    "lru": "last_access ASC",
+    # 크기 대비 사용 횟수가 적은 항목부터 (큰 파일은 자주 쓰여야 남는다)
+    "lfu": "(hit_count + 1.0) / MAX(file_size, 1) ASC, last_access ASC",
+}
+
+# 캐시 항목 나이/크기 분포 구간 (상한, 이름) - 보관 시간과 용량 산정용
+_AGE_BUCKETS = [(1, "<1h"), (6, "1-6h"), (24, "6-24h"), (72, "1-3d"), (168, "3-7d"), (None, ">7d")]
+_SIZE_BUCKETS = [
+    (0.1, "<100KB"), (1, "100KB-1MB"), (10, "1-10MB"), (50, "10-50MB"),
+    (100, "50-100MB"), (None, ">100MB")
+]
+
+_VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+_YOUTUBE_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+
+def extract_video_id(youtube_url: str) -> Optional[str]:
+    """
+    YouTube URL에서 영상 ID 추출
+    
+    watch?v=, youtu.be/, /shorts/, /embed/, /live/ 형식을 지원하며
+    t=, si=, feature= 같은 부가 파라미터는 무시한다.
+    
+    Args:
+        youtube_url: YouTube URL
+    
+    Returns:
+        11자리 영상 ID 또는 None (YouTube 영상 URL이 아닌 경우)
+    """
+    try:
+        parsed = urlparse(youtube_url.strip())
+    except ValueError:
+        return None
+    
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path_parts = [part for part in parsed.path.split("/") if part]
+    
+    candidate = None
+    if host == "youtu.be":
+        candidate = path_parts[0] if path_parts else None
+    elif host in _YOUTUBE_HOSTS:
+        if path_parts[:1] == ["watch"]:
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in _YOUTUBE_PATH_PREFIXES:
+            candidate = path_parts[1]
+    
+    if candidate and _VIDEO_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+def format_time_range(time_range: Optional[TimeRange]) -> str:
+    """구간을 캐시 키/로그용 문자열로 변환 (예: "30-210", "600-end")"""
+    if time_range is None:
+        return "full"
+    start, end = time_range
+    end_label = "end" if end is None else f"{end:g}"
+    return f"{start:g}-{end_label}"
+
+def _histogram(values, buckets) -> Dict[str, int]:
+    """값 목록을 (상한, 이름) 구간별 개수로 집계 (마지막 구간의 상한은 None)"""
+    counts = {label: 0 for _, label in buckets}
+    for value in values:
+        for upper, label in buckets:
+            if upper is None or value < upper:
+                counts[label] += 1
+                break
+    return counts
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256 해시 계산"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class CacheManager:
-    def __init__(self):
+    def __init__(self, shared_backend: Optional[CacheBackend] = None):
         self.cache_dir = Path(CACHE_DIR)
-        self.metadata_file = self.cache_dir / "metadata.json"
-        self.last_cleanup = 0
+        self.blobs_dir = self.cache_dir / "blobs"
+        self.temp_dir = self.cache_dir / "tmp"  # 다운로드 작업 디렉토리 (블롭과 같은 파일시스템)
+        self.index_file = self.cache_dir / "index.db"
+        self.metadata_file = self.cache_dir / "metadata.json"  # 이전 형식 인덱스 (이전 후 이름 변경)
+        self.janitor_lock_file = self.cache_dir / "janitor.lock"
         
-        # 캐시 디렉토리 생성
-        self.cache_dir.mkdir(exist_ok=True)
+        # 스레드별 SQLite 연결
+        self._local = threading.local()
         
-        # 메타데이터 로드
-        self.metadata = self._load_metadata()
+        # 인덱스 준비 상태 (서버 시작을 늦추지 않도록 생성자가 아닌 initialize에서 준비)
+        self._ready = False
+        self._init_lock = threading.Lock()
+        self._init_thread: Optional[int] = None
         
-        # 주기적 정리 실행
-        self._cleanup_if_needed()
-    
-    def _load_metadata(self) -> Dict[str, Any]:
-        """메타데이터 파일 로드"""
-        if self.metadata_file.exists():
+        # 공유 저장소 (여러 서버 복제본 간 캐시 공유, 없으면 로컬 캐시만 사용)
+        # 로컬 캐시는 앞단의 읽기 캐시로 동작하며, 업로드는 별도 스레드에서 수행
+        self.shared = shared_backend or create_shared_backend()
+        self._upload_executor = None
+        if self.shared is not None:
+            self._upload_executor = ThreadPoolExecutor(
+                max_workers=CACHE_SHARED_UPLOAD_WORKERS, thread_name_prefix="cache-upload"
+            )
+        
+    def initialize(self):
+        """
+        캐시 디렉토리 생성, 인덱스 초기화 및 이전 형식 메타데이터 이전 (처음 한 번)
+        
+        서버 시작 후 백그라운드에서 호출하며, 그 전에 캐시를 사용하면 그 자리에서 수행한다.
+        (정리 작업은 요청 경로와 초기화에서 하지 않고 run_janitor_cycle이 백그라운드에서 수행)
+        """
+        if self._ready:
+            return
+        with self._init_lock:
+            if self._ready:
+                return
+            self._init_thread = threading.get_ident()
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"메타데이터 로드 실패: {e}")
-                return {}
-        return {}
-    
-    def _save_metadata(self):
-        """메타데이터 파일 저장"""
+                self.cache_dir.mkdir(exist_ok=True)
+                self.blobs_dir.mkdir(exist_ok=True)
+                self.temp_dir.mkdir(exist_ok=True)
+                self._init_index()
+                self._migrate_metadata_json()
+                self._ready = True
+            finally:
+                self._init_thread = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        현재 스레드의 인덱스 연결 반환 (인덱스가 준비되지 않았으면 먼저 준비)
+        
+        WAL 모드로 열어 여러 스레드/워커 프로세스가 동시에 읽고,
+        쓰기는 트랜잭션 단위로 직렬화된다.
+        """
+        if not self._ready and self._init_thread != threading.get_ident():
+            self.initialize()
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE로 시작하여 확인-후-변경 작업을 원자적으로 수행)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    def _init_index(self):
+        """인덱스 테이블 생성"""
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    cache_key TEXT PRIMARY KEY,
+                    youtube_url TEXT NOT NULL,
+                    video_id TEXT,
+                    blob TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    duration REAL,
+                    range_start REAL,
+                    range_end REAL,
+                    tier TEXT NOT NULL DEFAULT 'audio',
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    fetch_seconds REAL
+                )
+            """)
+            # 이전 버전 인덱스에 없는 컬럼 추가
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(entries)")}
+            if 'tier' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN tier TEXT NOT NULL DEFAULT 'audio'")
+                conn.execute("UPDATE entries SET tier = 'audio_range' WHERE range_start IS NOT NULL")
+            if 'hit_count' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0")
+            if 'fetch_seconds' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN fetch_seconds REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_blob ON entries(blob)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_file_size ON entries(file_size)")
+            # 사용 중인 블롭 (프로세스별 참조 카운트)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pins (
+                    blob TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (blob, pid)
+                )
+            """)
+            # 워커 간 공유되는 누적 통계 (계층별 통계는 "<계층>.<이름>")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            # 파일이 아닌 값 캐시 (스크립트 결과, 영상 정보, 외부 API 응답)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cached_values (
+                    tier TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    cost_seconds REAL,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (tier, cache_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_values_expires_at ON cached_values(expires_at)")
+    
+    def _migrate_metadata_json(self):
+        """
+        이전 형식의 metadata.json 인덱스를 SQLite 인덱스로 이전
+        
+        URL 해시 키와 <키>.mp3 파일로 저장된 더 이전 형식의 항목은 블롭 저장소로 옮긴다.
+        """
+        if not self.metadata_file.exists():
+            return
+        
         try:
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
         except Exception as e:
-            logger.error(f"메타데이터 저장 실패: {e}")
+            logger.error(f"메타데이터 로드 실패: {e}")
+            metadata = {}
+        
+        migrated = 0
+        for legacy_key, cache_info in metadata.items():
+            blob_hash = cache_info.get('blob')
+            if blob_hash is None:
+                legacy_file = self.cache_dir / f"{legacy_key}.mp3"
+                if not legacy_file.exists():
+                    continue
+                try:
+                    blob_hash = self._store_blob(str(legacy_file))
+                except Exception as e:
+                    logger.error(f"이전 캐시 항목 이전 실패: {legacy_key} ({e})")
+                    continue
+            if not self._blob_path(blob_hash).exists():
+                continue
+            
+            time_range = tuple(cache_info['time_range']) if cache_info.get('time_range') else None
+            self._insert_entry(
+                cache_info['youtube_url'],
+                blob_hash,
+                cache_info.get('duration'),
+                time_range,
+                created_at=cache_info.get('created_at')
+            )
+            migrated += 1
+        
+        self.metadata_file.rename(self.metadata_file.with_suffix(".json.migrated"))
+        logger.info(f"metadata.json 캐시 항목 {migrated}개를 인덱스로 이전함")
     
-    def _generate_cache_key(self, youtube_url: str) -> str:
-        """YouTube URL로부터 캐시 키 생성"""
-        return hashlib.md5(youtube_url.encode()).hexdigest()
+    def _generate_cache_key(self, youtube_url: str, time_range: Optional[TimeRange] = None) -> str:
+        """
+        YouTube URL (및 구간)으로부터 캐시 키 생성
+        
+        같은 영상은 URL 형식과 관계없이 같은 키를 갖도록 영상 ID를 사용하고,
+        영상 ID를 알 수 없는 URL만 URL 해시를 사용한다.
+        """
+        video_id = extract_video_id(youtube_url)
+        key = f"yt_{video_id}" if video_id else f"url_{hashlib.md5(youtube_url.encode()).hexdigest()}"
+        if time_range is not None:
+            key += f"@{format_time_range(time_range)}"
+        return key
     
-    def _cleanup_if_needed(self):
-        """필요시 캐시 정리 실행"""
-        current_time = time.time()
-        if current_time - self.last_cleanup > CACHE_CLEANUP_INTERVAL:
-            self.cleanup_expired_files()
-            self.last_cleanup = current_time
+    def get_cache_key(self, youtube_url: str, time_range: Optional[TimeRange] = None) -> str:
+        """영상(구간) 캐시 키 반환 (값 캐시 키의 접두사로 사용)"""
+        return self._generate_cache_key(youtube_url, time_range)
+    
+    @staticmethod
+    def _tier_for(time_range: Optional[TimeRange]) -> str:
+        """캐시 계층 이름 (전체 오디오 / 구간 오디오)"""
+        return "audio" if time_range is None else "audio_range"
+    
+    @staticmethod
+    def _retention_seconds(tier: str) -> float:
+        """계층별 보관 시간 (초)"""
+        return CACHE_RETENTION_HOURS_BY_TIER.get(tier, CACHE_RETENTION_HOURS) * 3600
+    
+    def _blob_path(self, blob_hash: str) -> Path:
+        """블롭 해시에 해당하는 파일 경로"""
+        return self.blobs_dir / f"{blob_hash}.mp3"
+    
+    def _incr_stat(self, conn: sqlite3.Connection, name: str, amount: float = 1, tier: Optional[str] = None):
+        """누적 통계 증가 (호출자의 트랜잭션 안에서 실행, tier가 주어지면 계층별 통계)"""
+        if tier is not None:
+            name = f"{tier}.{name}"
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+    
+    def make_work_dir(self) -> str:
+        """
+        다운로드용 임시 디렉토리 생성
+        
+        블롭 저장소와 같은 파일시스템에 만들어 캐시 저장 시 복사 없이 os.replace로 이동할 수 있게 한다.
+        """
+        self.initialize()
+        return tempfile.mkdtemp(dir=self.temp_dir)
+    
+    def _store_blob(self, file_path: str, blob_hash: Optional[str] = None) -> str:
+        """
+        파일을 내용 해시 기준으로 블롭 저장소로 이동
+        
+        원본 파일은 블롭으로 이동(같은 파일시스템이면 원자적 os.replace)되어 사라진다.
+        같은 내용의 블롭이 이미 있으면 원본만 삭제한다 (재업로드/미러 영상의 중복 저장 방지).
+        
+        Returns:
+            블롭 해시
+        """
+        blob_hash = blob_hash or hash_file(file_path)
+        blob_path = self._blob_path(blob_hash)
+        if blob_path.exists():
+            with self._transaction() as conn:
+                self._incr_stat(conn, 'dedup_hits')
+            logger.info(f"동일한 오디오가 이미 캐시되어 있음: {blob_hash[:12]}")
+            os.remove(file_path)
+        else:
+            file_size = os.path.getsize(file_path)
+            try:
+                os.replace(file_path, blob_path)
+            except OSError:
+                # 다른 파일시스템이면 임시 이름으로 옮긴 뒤 교체 (부분 파일이 블롭으로 보이지 않도록)
+                partial_path = blob_path.with_suffix(".partial")
+                shutil.move(file_path, partial_path)
+                os.replace(partial_path, blob_path)
+            with self._transaction() as conn:
+                self._incr_stat(conn, 'bytes_written', file_size)
+        return blob_hash
+    
+    def _pin_blob(self, conn: sqlite3.Connection, blob_hash: str):
+        """블롭 사용 시작 (현재 프로세스의 참조 카운트 증가, 호출자의 트랜잭션 안에서 실행)"""
+        conn.execute(
+            "INSERT INTO pins (blob, pid, count) VALUES (?, ?, 1) "
+            "ON CONFLICT(blob, pid) DO UPDATE SET count = count + 1",
+            (blob_hash, os.getpid())
+        )
+    
+    def _is_pinned(self, conn: sqlite3.Connection, blob_hash: str) -> bool:
+        """블롭이 살아 있는 프로세스에서 사용 중인지 확인 (종료된 프로세스의 참조는 정리)"""
+        rows = conn.execute("SELECT pid FROM pins WHERE blob = ?", (blob_hash,)).fetchall()
+        pinned = False
+        for row in rows:
+            if _is_process_alive(row['pid']):
+                pinned = True
+            else:
+                conn.execute("DELETE FROM pins WHERE blob = ? AND pid = ?", (blob_hash, row['pid']))
+        return pinned
     
-    def get_cached_file(self, youtube_url: str) -> Optional[str]:
+    def is_pinned(self, blob_hash: str) -> bool:
+        """블롭이 사용 중인지 확인"""
+        with self._transaction() as conn:
+            return self._is_pinned(conn, blob_hash)
+    
+    def release_file(self, file_path: str):
+        """
+        get_cached_file/cache_file(pin=True)로 받은 파일 사용 종료
+        
+        사용 중에 캐시 엔트리가 제거되었다면 마지막 사용자가 반환할 때 파일을 삭제한다.
+        """
+        blob_hash = Path(file_path).stem
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE pins SET count = count - 1 WHERE blob = ? AND pid = ?",
+                (blob_hash, os.getpid())
+            )
+            conn.execute("DELETE FROM pins WHERE blob = ? AND count <= 0", (blob_hash,))
+            self._remove_blob_if_unreferenced(conn, blob_hash)
+    
+    def get_cached_file(self, youtube_url: str, time_range: Optional[TimeRange] = None, pin: bool = False) -> Optional[str]:
         """
         캐시된 파일 경로 반환
         
+        파일을 복사하지 않고 캐시 안의 경로를 그대로 돌려준다.
+        pin=True이면 release_file을 호출할 때까지 정리 작업이 파일을 삭제하지 않는다.
+        
         Args:
             youtube_url: YouTube URL
-            
+            time_range: (시작 초, 종료 초) 구간, None이면 전체 오디오
+            pin: 사용 중 표시 여부
+        
         Returns:
             캐시된 파일 경로 또는 None
         """
-        cache_key = self._generate_cache_key(youtube_url)
+        cache_key = self._generate_cache_key(youtube_url, time_range)
         
-        if cache_key in self.metadata:
-            cache_info = self.metadata[cache_key]
-            file_path = self.cache_dir / f"{cache_key}.mp3"
+        with self._transaction() as conn:
+            cache_info = conn.execute(
+                "SELECT * FROM entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
             
-            # 파일이 존재하고 만료되지 않았는지 확인
-            if file_path.exists():
-                current_time = time.time()
-                if current_time - cache_info['created_at'] < CACHE_RETENTION_HOURS * 3600:
-                    logger.info(f"캐시된 파일 사용: {youtube_url}")
-                    return str(file_path)
-                else:
-                    logger.info(f"캐시 만료: {youtube_url}")
-                    self._remove_cache_entry(cache_key)
+            if cache_info is not None:
+                file_path = self._blob_path(cache_info['blob'])
+                
+                # 파일이 존재하고 만료되지 않았는지 확인 (마지막 사용 이후 보관 시간 기준)
+                if file_path.exists():
+                    current_time = time.time()
+                    if current_time - cache_info['last_access'] < self._retention_seconds(cache_info['tier']):
+                        logger.info(f"캐시된 파일 사용: {youtube_url} ({format_time_range(time_range)})")
+                        conn.execute(
+                            "UPDATE entries SET last_access = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                            (current_time, cache_key)
+                        )
+                        self._incr_stat(conn, 'hits')
+                        self._incr_stat(conn, 'hits', tier=cache_info['tier'])
+                        self._incr_stat(conn, 'bytes_served', cache_info['file_size'], tier=cache_info['tier'])
+                        # 기록된 다운로드 시간만큼 절약 (기록이 없으면 0)
+                        self._incr_stat(conn, 'seconds_saved', cache_info['fetch_seconds'] or 0, tier=cache_info['tier'])
+                        if cache_info['youtube_url'] != youtube_url:
+                            self._incr_stat(conn, 'alias_hits')
+                        if pin:
+                            self._pin_blob(conn, cache_info['blob'])
+                        return str(file_path)
+                    else:
+                        # 만료된 항목은 미스로 처리하고 삭제는 정리 작업에 맡긴다
+                        logger.info(f"캐시 만료: {youtube_url}")
+            
+            self._incr_stat(conn, 'misses')
+            self._incr_stat(conn, 'misses', tier=self._tier_for(time_range))
         
+        # 로컬에 없으면 공유 저장소에서 가져오기 (다른 서버가 이미 받은 오디오)
+        if self.shared is not None:
+            return self._fetch_shared_entry(youtube_url, time_range, pin)
         return None
     
-    def cache_file(self, youtube_url: str, file_path: str, duration: Optional[float] = None) -> str:
+    @staticmethod
+    def _shared_entry_key(cache_key: str) -> str:
+        """공유 저장소의 캐시 항목 정보 키"""
+        return f"entries/{cache_key}.json"
+    
+    @staticmethod
+    def _shared_blob_key(blob_hash: str) -> str:
+        """공유 저장소의 블롭 키"""
+        return f"blobs/{blob_hash}.mp3"
+    
+    @staticmethod
+    def _shared_value_key(tier: str, key: str) -> str:
+        """공유 저장소의 값 캐시 키 (키 문자열은 해시로 변환)"""
+        return f"values/{tier}/{hashlib.sha256(key.encode()).hexdigest()}.json"
+    
+    def _fetch_shared_entry(self, youtube_url: str, time_range: Optional[TimeRange], pin: bool) -> Optional[str]:
+        """
+        공유 저장소의 캐시 항목을 로컬 캐시로 가져오기
+        
+        공유 저장소의 보관 기간은 저장소 쪽(버킷 수명 주기 규칙 등)에서 관리한다.
+        
+        Returns:
+            로컬 캐시 파일 경로 또는 None (공유 저장소에도 없거나 실패한 경우)
+        """
+        cache_key = self._generate_cache_key(youtube_url, time_range)
+        try:
+            data = self.shared.get_bytes(self._shared_entry_key(cache_key))
+            if data is None:
+                return None
+            entry = json.loads(data)
+            blob_hash = entry['blob']
+            
+            with self._transaction() as conn:
+                self._pin_blob(conn, blob_hash)
+            work_dir = self.make_work_dir()
+            try:
+                # 같은 오디오가 이미 로컬에 있으면 항목 정보만 추가
+                if not self._blob_path(blob_hash).exists():
+                    temp_path = os.path.join(work_dir, "audio.mp3")
+                    if not self.shared.download_file(self._shared_blob_key(blob_hash), temp_path):
+                        return None
+                    if hash_file(temp_path) != blob_hash:
+                        logger.warning(f"공유 캐시 블롭 해시 불일치: {blob_hash[:12]}")
+                        return None
+                    self._store_blob(temp_path, blob_hash)
+                self._insert_entry(
+                    youtube_url, blob_hash, entry.get('duration'), time_range,
+                    pin=pin, fetch_seconds=entry.get('fetch_seconds')
+                )
+            finally:
+                self.release_file(str(self._blob_path(blob_hash)))
+                shutil.rmtree(work_dir, ignore_errors=True)
+            
+            blob_path = self._blob_path(blob_hash)
+            with self._transaction() as conn:
+                tier = self._tier_for(time_range)
+                self._incr_stat(conn, 'shared_hits', tier=tier)
+                self._incr_stat(conn, 'bytes_served', blob_path.stat().st_size, tier=tier)
+                self._incr_stat(conn, 'seconds_saved', entry.get('fetch_seconds') or 0, tier=tier)
+            logger.info(f"공유 캐시에서 가져옴: {youtube_url} ({format_time_range(time_range)})")
+            return str(blob_path)
+        
+        except Exception as e:
+            logger.warning(f"공유 캐시 조회 실패: {e}")
+            return None
+    
+    def _publish_entry(self, cache_key: str, entry: Dict[str, Any]):
+        """
+        로컬 캐시 항목을 공유 저장소에 올리기 (업로드 스레드에서 실행)
+        
+        블롭은 호출 전에 사용 중으로 표시되어 있으며 업로드가 끝나면 반환한다.
+        """
+        blob_path = self._blob_path(entry['blob'])
+        try:
+            blob_key = self._shared_blob_key(entry['blob'])
+            if not self.shared.exists(blob_key):
+                self.shared.upload_file(blob_key, str(blob_path))
+            self.shared.put_bytes(self._shared_entry_key(cache_key), json.dumps(entry).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"공유 캐시 업로드 실패: {cache_key} ({e})")
+        finally:
+            self.release_file(str(blob_path))
+    
+    def _publish_value(self, tier: str, key: str, payload: Dict[str, Any]):
+        """값 캐시를 공유 저장소에 올리기 (업로드 스레드에서 실행)"""
+        try:
+            self.shared.put_bytes(
+                self._shared_value_key(tier, key),
+                json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            )
+        except Exception as e:
+            logger.warning(f"공유 값 캐시 업로드 실패 ({tier}): {e}")
+    
+    def _insert_entry(self, youtube_url: str, blob_hash: str, duration: Optional[float], time_range: Optional[TimeRange], created_at: Optional[float] = None, pin: bool = False, fetch_seconds: Optional[float] = None):
+        """캐시 엔트리 추가/교체 (이전 블롭이 더 이상 참조되지 않으면 삭제)"""
+        cache_key = self._generate_cache_key(youtube_url, time_range)
+        created_at = created_at or time.time()
+        file_size = self._blob_path(blob_hash).stat().st_size
+        range_start, range_end = time_range if time_range is not None else (None, None)
+        
+        with self._transaction() as conn:
+            previous = conn.execute(
+                "SELECT blob FROM entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (cache_key, youtube_url, video_id, blob, created_at, last_access,
+                     file_size, duration, range_start, range_end, tier, fetch_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (cache_key, youtube_url, extract_video_id(youtube_url), blob_hash,
+                 created_at, created_at, file_size, duration, range_start, range_end,
+                 self._tier_for(time_range), fetch_seconds)
+            )
+            if pin:
+                self._pin_blob(conn, blob_hash)
+            
+            # 같은 키가 다른 블롭을 가리키고 있었다면 더 이상 참조되지 않는 블롭 정리
+            if previous is not None and previous['blob'] != blob_hash:
+                self._remove_blob_if_unreferenced(conn, previous['blob'])
+    
+    def cache_file(self, youtube_url: str, file_path: str, duration: Optional[float] = None, time_range: Optional[TimeRange] = None, pin: bool = False, fetch_seconds: Optional[float] = None) -> str:
         """
-        파일을 캐시에 저장
+        파일을 캐시로 이동하여 저장
+        
+        원본 파일은 캐시로 옮겨지므로 호출 후에는 반환된 경로를 사용해야 한다.
         
         Args:
             youtube_url: YouTube URL
             file_path: 원본 파일 경로
-            duration: 영상 길이 (초)
-            
+            duration: 영상(구간) 길이 (초)
+            time_range: (시작 초, 종료 초) 구간, None이면 전체 오디오
+            pin: 사용 중 표시 여부 (release_file로 해제)
+            fetch_seconds: 파일을 받는 데 걸린 시간 (초, 캐시 히트 시 절약 시간 통계에 사용)
+        
         Returns:
-            캐시된 파일 경로
+            캐시된 파일 경로 (캐시 실패 시 원본 파일 경로)
         """
-        cache_key = self._generate_cache_key(youtube_url)
-        cache_file_path = self.cache_dir / f"{cache_key}.mp3"
-        
         try:
-            # 파일 복사
-            shutil.copy2(file_path, cache_file_path)
-            
-            # 파일 크기 계산
-            file_size = os.path.getsize(cache_file_path)
-            file_size_mb = file_size / (1024 * 1024)
-            
-            # 메타데이터 저장
-            self.metadata[cache_key] = {
-                'youtube_url': youtube_url,
-                'created_at': time.time(),
-                'file_size_mb': file_size_mb,
-                'duration': duration,
-                'original_path': file_path
-            }
+            # 다른 워커가 같은 블롭을 정리하지 않도록 저장 전에 먼저 사용 중으로 표시
+            blob_hash = hash_file(file_path)
+            with self._transaction() as conn:
+                self._pin_blob(conn, blob_hash)
             
-            self._save_metadata()
+            try:
+                self._store_blob(file_path, blob_hash)
+                self._insert_entry(youtube_url, blob_hash, duration, time_range, pin=pin, fetch_seconds=fetch_seconds)
+                
+                # 다른 서버가 다시 받지 않도록 공유 저장소에 올리기 (업로드가 끝날 때까지 사용 중 표시 유지)
+                if self.shared is not None:
+                    range_start, range_end = time_range if time_range is not None else (None, None)
+                    entry = {
+                        'youtube_url': youtube_url,
+                        'blob': blob_hash,
+                        'duration': duration,
+                        'range_start': range_start,
+                        'range_end': range_end,
+                        'fetch_seconds': fetch_seconds,
+                        'created_at': time.time()
+                    }
+                    with self._transaction() as conn:
+                        self._pin_blob(conn, blob_hash)
+                    self._upload_executor.submit(
+                        self._publish_entry, self._generate_cache_key(youtube_url, time_range), entry
+                    )
+            finally:
+                self.release_file(str(self._blob_path(blob_hash)))
             
+            cache_file_path = self._blob_path(blob_hash)
+            file_size_mb = os.path.getsize(cache_file_path) / (1024 * 1024)
             logger.info(f"파일 캐시됨: {youtube_url} ({file_size_mb:.2f}MB)")
             return str(cache_file_path)
-            
+        
         except Exception as e:
             logger.error(f"파일 캐시 실패: {e}")
             # 캐시 실패 시 원본 파일 경로 반환
             return file_path
     
+    def get_cached_duration(self, youtube_url: str, time_range: Optional[TimeRange] = None) -> Optional[float]:
+        """캐시 인덱스에 기록된 영상(구간) 길이 반환"""
+        cache_key = self._generate_cache_key(youtube_url, time_range)
+        row = self._connect().execute(
+            "SELECT duration FROM entries WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        return row['duration'] if row is not None else None
+    
+    def get_value(self, tier: str, key: str) -> Optional[Any]:
+        """
+        값 캐시 조회
+        
+        Args:
+            tier: 캐시 계층 (transcript, metadata, naver)
+            key: 캐시 키
+        
+        Returns:
+            저장된 값 (JSON 역직렬화) 또는 None (없거나 만료된 경우)
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value, size, expires_at, cost_seconds FROM cached_values WHERE tier = ? AND cache_key = ?",
+                (tier, key)
+            ).fetchone()
+            current_time = time.time()
+            if row is None or row['expires_at'] <= current_time:
+                # 만료된 값은 미스로 처리하고 삭제는 정리 작업에 맡긴다
+                self._incr_stat(conn, 'misses', tier=tier)
+                row = None
+            else:
+                conn.execute(
+                    "UPDATE cached_values SET last_access = ?, hit_count = hit_count + 1 "
+                    "WHERE tier = ? AND cache_key = ?",
+                    (current_time, tier, key)
+                )
+                self._incr_stat(conn, 'hits', tier=tier)
+                self._incr_stat(conn, 'bytes_served', row['size'], tier=tier)
+                self._incr_stat(conn, 'seconds_saved', row['cost_seconds'] or 0, tier=tier)
+        
+        if row is not None:
+            return json.loads(row['value'])
+        if self.shared is not None and tier in CACHE_SHARED_VALUE_TIERS:
+            return self._fetch_shared_value(tier, key)
+        return None
+    
+    def _fetch_shared_value(self, tier: str, key: str) -> Optional[Any]:
+        """공유 저장소의 값 캐시를 로컬로 가져오기 (남은 유효 시간 유지)"""
+        try:
+            data = self.shared.get_bytes(self._shared_value_key(tier, key))
+            if data is None:
+                return None
+            payload = json.loads(data)
+            if payload.get('key') != key or payload['expires_at'] <= time.time():
+                return None
+        except Exception as e:
+            logger.warning(f"공유 값 캐시 조회 실패 ({tier}): {e}")
+            return None
+        
+        serialized = json.dumps(payload['value'], ensure_ascii=False)
+        with self._transaction() as conn:
+            self._write_value(conn, tier, key, serialized, payload['expires_at'], payload.get('cost_seconds'))
+            self._incr_stat(conn, 'shared_hits', tier=tier)
+            self._incr_stat(conn, 'bytes_served', len(serialized.encode('utf-8')), tier=tier)
+            self._incr_stat(conn, 'seconds_saved', payload.get('cost_seconds') or 0, tier=tier)
+        return payload['value']
+    
+    def _write_value(self, conn: sqlite3.Connection, tier: str, key: str, serialized: str, expires_at: float, cost_seconds: Optional[float]):
+        """값 캐시 행 추가/교체 (호출자의 트랜잭션 안에서 실행)"""
+        current_time = time.time()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO cached_values
+                (tier, cache_key, value, size, created_at, last_access, expires_at, cost_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (tier, key, serialized, len(serialized.encode('utf-8')), current_time, current_time,
+             expires_at, cost_seconds)
+        )
+    
+    def put_value(self, tier: str, key: str, value: Any, cost_seconds: Optional[float] = None, ttl_hours: Optional[float] = None):
+        """
+        값 캐시 저장
+        
+        Args:
+            tier: 캐시 계층 (transcript, metadata, naver)
+            key: 캐시 키
+            value: JSON으로 직렬화 가능한 값
+            cost_seconds: 값을 만드는 데 걸린 시간 (초, 캐시 히트 시 절약 시간 통계에 사용)
+            ttl_hours: 유효 시간 (None이면 CACHE_VALUE_TTL_HOURS_BY_TIER)
+        """
+        if ttl_hours is None:
+            ttl_hours = CACHE_VALUE_TTL_HOURS_BY_TIER.get(tier, CACHE_RETENTION_HOURS)
+        try:
+            serialized = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.error(f"값 캐시 저장 실패 ({tier}): {e}")
+            return
+        
+        expires_at = time.time() + ttl_hours * 3600
+        with self._transaction() as conn:
+            self._write_value(conn, tier, key, serialized, expires_at, cost_seconds)
+        
+        if self.shared is not None and tier in CACHE_SHARED_VALUE_TIERS:
+            payload = {'key': key, 'value': value, 'expires_at': expires_at, 'cost_seconds': cost_seconds}
+            self._upload_executor.submit(self._publish_value, tier, key, payload)
+    
+    def cleanup_expired_values(self, max_deletes: Optional[int] = None) -> int:
+        """
+        유효 시간이 지난 값 캐시 삭제
+        
+        Args:
+            max_deletes: 최대 삭제 수 (None이면 전부)
+        
+        Returns:
+            삭제된 값 수
+        """
+        limit = -1 if max_deletes is None else max_deletes
+        with self._transaction() as conn:
+            expired = conn.execute(
+                "SELECT tier, cache_key FROM cached_values WHERE expires_at <= ? "
+                "ORDER BY expires_at LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+            for row in expired:
+                conn.execute(
+                    "DELETE FROM cached_values WHERE tier = ? AND cache_key = ?",
+                    (row['tier'], row['cache_key'])
+                )
+                self._incr_stat(conn, 'expirations', tier=row['tier'])
+        
+        if expired:
+            logger.info(f"만료된 값 캐시 {len(expired)}개 정리됨")
+        return len(expired)
+    
+    def _remove_blob_if_unreferenced(self, conn: sqlite3.Connection, blob_hash: str) -> int:
+        """
+        어떤 캐시 엔트리도 참조하지 않고 사용 중이 아닌 블롭 파일 삭제 (호출자의 트랜잭션 안에서 실행)
+        
+        Returns:
+            삭제된 바이트 수 (삭제하지 않았으면 0)
+        """
+        if self._is_pinned(conn, blob_hash):
+            return 0
+        referenced = conn.execute(
+            "SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob_hash,)
+        ).fetchone()
+        if referenced is not None:
+            return 0
+        blob_path = self._blob_path(blob_hash)
+        if blob_path.exists():
+            file_size = blob_path.stat().st_size
+            blob_path.unlink()
+            return file_size
+        return 0
+    
     def _remove_cache_entry(self, cache_key: str):
         """캐시 엔트리 제거"""
         try:
-            # 파일 삭제
-            cache_file_path = self.cache_dir / f"{cache_key}.mp3"
-            if cache_file_path.exists():
-                cache_file_path.unlink()
-            
-            # 메타데이터에서 제거
-            if cache_key in self.metadata:
-                del self.metadata[cache_key]
-                self._save_metadata()
-                
-            logger.info(f"캐시 엔트리 제거됨: {cache_key}")
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT blob FROM entries WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,))
+                    
+                    # 다른 엔트리가 같은 블롭을 참조하지 않으면 파일 삭제
+                    self._remove_blob_if_unreferenced(conn, row['blob'])
             
+            logger.info(f"캐시 엔트리 제거됨: {cache_key}")
+        
         except Exception as e:
             logger.error(f"캐시 엔트리 제거 실패: {e}")
     
-    def cleanup_expired_files(self):
-        """만료된 파일들 정리"""
+    def cleanup_expired_files(self, max_deletes: Optional[int] = None) -> int:
+        """
+        만료된 파일들 정리 (계층별 보관 시간, 마지막 사용 기준)
+        
+        Args:
+            max_deletes: 최대 제거 항목 수 (None이면 전부)
+        
+        Returns:
+            제거된 항목 수
+        """
         current_time = time.time()
+        limit = -1 if max_deletes is None else max_deletes
         expired_keys = []
+        for tier in self._connect().execute("SELECT DISTINCT tier FROM entries").fetchall():
+            cutoff = current_time - self._retention_seconds(tier['tier'])
+            expired_keys.extend(
+                (row['cache_key'], tier['tier']) for row in self._connect().execute(
+                    "SELECT cache_key FROM entries WHERE tier = ? AND last_access <= ? "
+                    "ORDER BY last_access LIMIT ?",
+                    (tier['tier'], cutoff, limit)
+                )
+            )
+        if max_deletes is not None:
+            expired_keys = expired_keys[:max_deletes]
         
-        for cache_key, cache_info in self.metadata.items():
-            if current_time - cache_info['created_at'] > CACHE_RETENTION_HOURS * 3600:
-                expired_keys.append(cache_key)
-        
-        for cache_key in expired_keys:
+        for cache_key, _ in expired_keys:
             self._remove_cache_entry(cache_key)
         
         if expired_keys:
+            with self._transaction() as conn:
+                self._incr_stat(conn, 'expirations', len(expired_keys))
+                for _, tier in expired_keys:
+                    self._incr_stat(conn, 'expirations', tier=tier)
             logger.info(f"만료된 캐시 파일 {len(expired_keys)}개 정리됨")
+        return len(expired_keys)
+    
+    def enforce_capacity(self, max_deletes: Optional[int] = None) -> int:
+        """
+        캐시 용량/항목 수 한도를 넘으면 CACHE_EVICTION_POLICY 순서로 항목 제거
+        
+        사용 중인 블롭을 가리키는 항목은 건너뛴다.
+        디스크 사용량은 블롭 기준이므로 다른 항목과 공유된 블롭은 제거해도 용량이 줄지 않는다.
+        
+        Args:
+            max_deletes: 최대 제거 항목 수 (None이면 한도 안으로 들어올 때까지)
+        
+        Returns:
+            제거된 항목 수
+        """
+        max_bytes = CACHE_MAX_SIZE_MB * 1024 * 1024
+        order = _EVICTION_ORDER.get(CACHE_EVICTION_POLICY, _EVICTION_ORDER["lru"])
+        
+        with self._transaction() as conn:
+            entry_count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(file_size), 0) FROM "
+                "(SELECT MAX(file_size) AS file_size FROM entries GROUP BY blob)"
+            ).fetchone()[0]
+            if entry_count <= CACHE_MAX_ENTRIES and total_bytes <= max_bytes:
+                return 0
+            
+            evicted = 0
+            evicted_bytes = 0
+            candidates = conn.execute(
+                f"SELECT cache_key, blob, tier FROM entries ORDER BY {order}"
+            ).fetchall()
+            for candidate in candidates:
+                if entry_count <= CACHE_MAX_ENTRIES and total_bytes <= max_bytes:
+                    break
+                if max_deletes is not None and evicted >= max_deletes:
+                    break
+                if self._is_pinned(conn, candidate['blob']):
+                    continue
+                conn.execute("DELETE FROM entries WHERE cache_key = ?", (candidate['cache_key'],))
+                freed = self._remove_blob_if_unreferenced(conn, candidate['blob'])
+                entry_count -= 1
+                total_bytes -= freed
+                evicted += 1
+                evicted_bytes += freed
+                self._incr_stat(conn, 'evictions', tier=candidate['tier'])
+                self._incr_stat(conn, 'evicted_bytes', freed, tier=candidate['tier'])
+            
+            self._incr_stat(conn, 'evictions', evicted)
+            self._incr_stat(conn, 'evicted_bytes', evicted_bytes)
+        
+        logger.info(
+            f"캐시 용량 초과로 {evicted}개 항목 제거 ({CACHE_EVICTION_POLICY}, "
+            f"{evicted_bytes / (1024 * 1024):.2f}MB 확보)"
+        )
+        return evicted
+    
+    def reconcile(self, max_deletes: Optional[int] = None) -> Dict[str, int]:
+        """
+        인덱스와 캐시 디렉토리 대조 정리
+        
+        - 블롭 파일이 없는 인덱스 항목 제거
+        - 어떤 항목도 참조하지 않는 블롭 파일 (고아 파일) 삭제
+        - 오래된 다운로드 작업 디렉토리와 종료된 프로세스의 사용 표시 삭제
+        
+        Args:
+            max_deletes: 종류별 최대 삭제 수 (None이면 전부)
+        
+        Returns:
+            종류별 삭제 수
+        """
+        limit = max_deletes if max_deletes is not None else float('inf')
+        result = {'missing_blob_entries': 0, 'orphan_blobs': 0, 'stale_work_dirs': 0}
+        
+        # 1. 블롭 파일이 없는 인덱스 항목
+        missing_keys = []
+        for row in self._connect().execute("SELECT cache_key, blob FROM entries"):
+            if len(missing_keys) >= limit:
+                break
+            if not self._blob_path(row['blob']).exists():
+                missing_keys.append(row['cache_key'])
+        if missing_keys:
+            with self._transaction() as conn:
+                conn.executemany(
+                    "DELETE FROM entries WHERE cache_key = ?", [(key,) for key in missing_keys]
+                )
+        result['missing_blob_entries'] = len(missing_keys)
+        
+        # 2. 고아 블롭 파일 (사용 중 표시가 있으면 저장 중이거나 사용 중이므로 제외)
+        current_time = time.time()
+        for entry in os.scandir(self.blobs_dir):
+            if result['orphan_blobs'] >= limit:
+                break
+            path = Path(entry.path)
+            if path.suffix == ".partial":
+                # 중단된 파일시스템 간 이동의 잔여물
+                if current_time - entry.stat().st_mtime > 3600:
+                    path.unlink(missing_ok=True)
+                    result['orphan_blobs'] += 1
+                continue
+            with self._transaction() as conn:
+                if self._remove_blob_if_unreferenced(conn, path.stem) or not path.exists():
+                    result['orphan_blobs'] += 1
+        
+        # 3. 남겨진 다운로드 작업 디렉토리
+        work_dir_cutoff = current_time - CACHE_WORK_DIR_MAX_AGE_HOURS * 3600
+        for entry in os.scandir(self.temp_dir):
+            if result['stale_work_dirs'] >= limit:
+                break
+            if entry.is_dir() and entry.stat().st_mtime < work_dir_cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                result['stale_work_dirs'] += 1
+        
+        # 4. 종료된 프로세스의 사용 표시
+        with self._transaction() as conn:
+            for row in conn.execute("SELECT DISTINCT pid FROM pins").fetchall():
+                if not _is_process_alive(row['pid']):
+                    conn.execute("DELETE FROM pins WHERE pid = ?", (row['pid'],))
+        
+        if any(result.values()):
+            logger.info(f"캐시 인덱스 대조 정리: {result}")
+        return result
+    
+    @contextmanager
+    def _janitor_lock(self):
+        """
+        여러 워커 중 하나만 정리 작업을 수행하도록 파일 잠금 획득 시도
+        
+        Yields:
+            잠금 획득 여부
+        """
+        if fcntl is None:
+            yield True
+            return
+        with open(self.janitor_lock_file, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def run_janitor_cycle(self, max_deletes: int = CACHE_JANITOR_MAX_DELETES) -> Optional[Dict[str, Any]]:
+        """
+        정리 작업 1회 실행 (백그라운드 스레드에서 호출)
+        
+        만료 항목 제거와 용량 한도 적용은 매 주기, 인덱스-디렉토리 대조는
+        CACHE_CLEANUP_INTERVAL마다 수행하며, 각 단계는 max_deletes개까지만 삭제한다.
+        
+        Returns:
+            단계별 삭제 수 (다른 워커가 정리 중이면 None)
+        """
+        self.initialize()
+        with self._janitor_lock() as acquired:
+            if not acquired:
+                return None
+            
+            summary: Dict[str, Any] = {
+                'expired': self.cleanup_expired_files(max_deletes),
+                'expired_values': self.cleanup_expired_values(max_deletes),
+                'evicted': self.enforce_capacity(max_deletes)
+            }
+            
+            # 대조 정리 시각은 워커 간에 공유
+            current_time = time.time()
+            last_reconcile = self._connect().execute(
+                "SELECT value FROM stats WHERE name = 'last_reconcile_at'"
+            ).fetchone()
+            if last_reconcile is None or current_time - last_reconcile['value'] >= CACHE_CLEANUP_INTERVAL:
+                summary['reconcile'] = self.reconcile(max_deletes)
+                with self._transaction() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO stats (name, value) VALUES ('last_reconcile_at', ?)",
+                        (int(current_time),)
+                    )
+            
+            with self._transaction() as conn:
+                self._incr_stat(conn, 'janitor_runs')
+            return summary
+    
+    def select_snapshot(self, since_hours: Optional[float] = None, min_hits: Optional[int] = None, value_tiers=CACHE_SHARED_VALUE_TIERS) -> Dict[str, Any]:
+        """
+        스냅샷으로 내보낼 캐시 항목 선택
+        
+        한 트랜잭션 안에서 항목을 고르고 블롭을 사용 중으로 표시하므로 내보내는 동안
+        정리 작업이 파일을 삭제하지 않는다. 내보내기가 끝나면 release_snapshot을 호출해야 한다.
+        
+        Args:
+            since_hours: 최근 N시간 안에 사용된 항목만 (None이면 전부)
+            min_hits: 히트 수가 N 이상인 항목만 (None이면 전부)
+            value_tiers: 함께 내보낼 값 캐시 계층
+        
+        Returns:
+            {"created_at", "entries": [...], "values": [...], "blobs": {해시: 크기}}
+        """
+        conditions = []
+        params: list = []
+        if since_hours is not None:
+            conditions.append("last_access >= ?")
+            params.append(time.time() - since_hours * 3600)
+        if min_hits is not None:
+            conditions.append("hit_count >= ?")
+            params.append(min_hits)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._transaction() as conn:
+            entries = [
+                dict(row) for row in conn.execute(
+                    "SELECT cache_key, youtube_url, blob, duration, range_start, range_end, "
+                    f"last_access, hit_count, fetch_seconds, file_size FROM entries {where}",
+                    params
+                )
+            ]
+            blobs = {}
+            for entry in entries:
+                if entry['blob'] not in blobs and self._blob_path(entry['blob']).exists():
+                    self._pin_blob(conn, entry['blob'])
+                    blobs[entry['blob']] = entry['file_size']
+            entries = [entry for entry in entries if entry['blob'] in blobs]
+            
+            values = []
+            if value_tiers:
+                placeholders = ", ".join("?" for _ in value_tiers)
+                values = [
+                    dict(row) for row in conn.execute(
+                        "SELECT tier, cache_key, value, expires_at, cost_seconds FROM cached_values "
+                        f"WHERE tier IN ({placeholders}) AND expires_at > ?",
+                        (*value_tiers, time.time())
+                    )
+                ]
+        
+        return {'created_at': time.time(), 'entries': entries, 'values': values, 'blobs': blobs}
+    
+    def release_snapshot(self, snapshot: Dict[str, Any]):
+        """select_snapshot에서 사용 중으로 표시한 블롭 반환"""
+        for blob_hash in snapshot['blobs']:
+            self.release_file(str(self._blob_path(blob_hash)))
+    
+    def get_blob_path(self, blob_hash: str) -> str:
+        """블롭 해시에 해당하는 로컬 파일 경로"""
+        return str(self._blob_path(blob_hash))
+    
+    def has_blob(self, blob_hash: str) -> bool:
+        """블롭이 로컬 캐시에 있는지 확인"""
+        return self._blob_path(blob_hash).exists()
+    
+    def import_entries(self, blob_hash: str, entries: list, blob_file: Optional[str] = None) -> int:
+        """
+        스냅샷 항목을 로컬 캐시에 추가
+        
+        이미 로컬에 있는 캐시 키는 건너뛰며, 마지막 사용 시각과 히트 수는 원래 값을 유지한다.
+        
+        Args:
+            blob_hash: 항목들이 가리키는 블롭 해시
+            entries: select_snapshot의 항목 정보 리스트
+            blob_file: 블롭 파일 경로 (로컬에 블롭이 없을 때, 블롭 저장소로 이동됨)
+        
+        Returns:
+            추가된 항목 수
+        """
+        with self._transaction() as conn:
+            self._pin_blob(conn, blob_hash)
+        
+        imported = 0
+        try:
+            if blob_file is not None and not self._blob_path(blob_hash).exists():
+                self._store_blob(blob_file, blob_hash)
+            if not self._blob_path(blob_hash).exists():
+                return 0
+            
+            for entry in entries:
+                exists = self._connect().execute(
+                    "SELECT 1 FROM entries WHERE cache_key = ?", (entry['cache_key'],)
+                ).fetchone()
+                if exists is not None:
+                    continue
+                time_range = None
+                if entry.get('range_start') is not None:
+                    time_range = (entry['range_start'], entry.get('range_end'))
+                self._insert_entry(
+                    entry['youtube_url'], blob_hash, entry.get('duration'), time_range,
+                    created_at=entry.get('last_access'), fetch_seconds=entry.get('fetch_seconds')
+                )
+                with self._transaction() as conn:
+                    conn.execute(
+                        "UPDATE entries SET hit_count = ? WHERE cache_key = ?",
+                        (entry.get('hit_count', 0), self._generate_cache_key(entry['youtube_url'], time_range))
+                    )
+                imported += 1
+        finally:
+            self.release_file(str(self._blob_path(blob_hash)))
+        return imported
+    
+    def import_values(self, values: list) -> int:
+        """
+        스냅샷 값 캐시를 로컬 캐시에 추가 (유효 시간이 남은 것만, 이미 있는 키는 건너뜀)
+        
+        Returns:
+            추가된 값 수
+        """
+        imported = 0
+        current_time = time.time()
+        with self._transaction() as conn:
+            for value in values:
+                if value['expires_at'] <= current_time:
+                    continue
+                exists = conn.execute(
+                    "SELECT 1 FROM cached_values WHERE tier = ? AND cache_key = ?",
+                    (value['tier'], value['cache_key'])
+                ).fetchone()
+                if exists is not None:
+                    continue
+                self._write_value(
+                    conn, value['tier'], value['cache_key'], value['value'],
+                    value['expires_at'], value.get('cost_seconds')
+                )
+                imported += 1
+        return imported
     
     def get_cache_info(self) -> Dict[str, Any]:
         """캐시 정보 반환"""
+        conn = self._connect()
         current_time = time.time()
-        total_size = 0
+        
+        counts = conn.execute(
+            "SELECT COUNT(*) AS total_files, COALESCE(SUM(file_size), 0) AS logical_size FROM entries"
+        ).fetchone()
         valid_files = 0
-        expired_files = 0
+        mb = 1024 * 1024
+        stats = {row['name']: row['value'] for row in conn.execute("SELECT name, value FROM stats")}
         
-        for cache_info in self.metadata.values():
-            if current_time - cache_info['created_at'] < CACHE_RETENTION_HOURS * 3600:
-                total_size += cache_info.get('file_size_mb', 0)
-                valid_files += 1
-            else:
-                expired_files += 1
+        # 계층별 항목 나이/크기 (파일 캐시는 파일 크기, 값 캐시는 직렬화된 크기)
+        tier_items: Dict[str, Dict[str, Any]] = {}
+        for row in conn.execute("SELECT tier, created_at, last_access, file_size FROM entries"):
+            items = tier_items.setdefault(row['tier'], {'ages': [], 'sizes': [], 'valid': 0})
+            items['ages'].append((current_time - row['created_at']) / 3600)
+            items['sizes'].append(row['file_size'] / mb)
+            if current_time - row['last_access'] < self._retention_seconds(row['tier']):
+                items['valid'] += 1
+        for row in conn.execute("SELECT tier, created_at, expires_at, size FROM cached_values"):
+            items = tier_items.setdefault(row['tier'], {'ages': [], 'sizes': [], 'valid': 0})
+            items['ages'].append((current_time - row['created_at']) / 3600)
+            items['sizes'].append(row['size'] / mb)
+            if row['expires_at'] > current_time:
+                items['valid'] += 1
+        
+        tier_names = set(tier_items) | {name.split('.', 1)[0] for name in stats if '.' in name}
+        tiers = {}
+        for tier in sorted(tier_names):
+            items = tier_items.get(tier, {'ages': [], 'sizes': [], 'valid': 0})
+            tier_hits = stats.get(f"{tier}.hits", 0)
+            tier_misses = stats.get(f"{tier}.misses", 0)
+            tier_lookups = tier_hits + tier_misses
+            if tier in CACHE_RETENTION_HOURS_BY_TIER:
+                valid_files += items['valid']
+            tiers[tier] = {
+                'items': len(items['ages']),
+                'valid_items': items['valid'],
+                'size_mb': round(sum(items['sizes']), 2),
+                'hits': tier_hits,
+                'misses': tier_misses,
+                'hit_rate': round(tier_hits / tier_lookups, 4) if tier_lookups else None,
+                'shared_hits': stats.get(f"{tier}.shared_hits", 0),
+                'evictions': stats.get(f"{tier}.evictions", 0),
+                'expirations': stats.get(f"{tier}.expirations", 0),
+                'served_mb': round(stats.get(f"{tier}.bytes_served", 0) / mb, 2),
+                'seconds_saved': round(stats.get(f"{tier}.seconds_saved", 0), 1),
+                'age_histogram': _histogram(items['ages'], _AGE_BUCKETS),
+                'size_histogram': _histogram(items['sizes'], _SIZE_BUCKETS)
+            }
+        # 블롭은 여러 엔트리가 공유할 수 있으므로 실제 디스크 사용량은 블롭 기준으로 계산
+        blobs = conn.execute(
+            """
+            SELECT COUNT(*) AS unique_blobs, COALESCE(SUM(file_size), 0) AS total_size
+            FROM (SELECT blob, MAX(file_size) AS file_size FROM entries GROUP BY blob)
+            """
+        ).fetchone()
+        last_reconcile = stats.get('last_reconcile_at')
+        
+        hits = stats.get('hits', 0)
+        misses = stats.get('misses', 0)
+        lookups = hits + misses
+        # 오디오/영상 정보 캐시 히트는 다운로드 시간, 스크립트 캐시 히트는 음성 인식 시간을 절약
+        download_seconds_saved = sum(
+            tier['seconds_saved'] for name, tier in tiers.items() if name in ('audio', 'audio_range', 'metadata')
+        )
+        asr_seconds_saved = tiers.get('transcript', {}).get('seconds_saved', 0)
         
         return {
-            'total_files': len(self.metadata),
+            'total_files': counts['total_files'],
             'valid_files': valid_files,
-            'expired_files': expired_files,
-            'total_size_mb': round(total_size, 2),
+            'expired_files': counts['total_files'] - valid_files,
+            'total_size_mb': round(blobs['total_size'] / mb, 2),
+            'unique_blobs': blobs['unique_blobs'],
+            'dedup_saved_mb': round((counts['logical_size'] - blobs['total_size']) / mb, 2),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'alias_hits': stats.get('alias_hits', 0),
+            'dedup_hits': stats.get('dedup_hits', 0),
+            'evictions': stats.get('evictions', 0),
+            'evicted_mb': round(stats.get('evicted_bytes', 0) / mb, 2),
+            'expirations': stats.get('expirations', 0),
+            'written_mb': round(stats.get('bytes_written', 0) / mb, 2),
+            'served_mb': round(sum(tier['served_mb'] for tier in tiers.values()), 2),
+            'download_seconds_saved': round(download_seconds_saved, 1),
+            'asr_seconds_saved': asr_seconds_saved,
+            'shared_backend': self.shared.name if self.shared is not None else None,
+            'eviction_policy': CACHE_EVICTION_POLICY,
+            'max_size_mb': CACHE_MAX_SIZE_MB,
+            'max_entries': CACHE_MAX_ENTRIES,
+            'janitor_runs': stats.get('janitor_runs', 0),
+            'last_reconcile_at': last_reconcile,
+            'tiers': tiers,
             'retention_hours': CACHE_RETENTION_HOURS,
+            'retention_hours_by_tier': CACHE_RETENTION_HOURS_BY_TIER,
+            'value_ttl_hours_by_tier': CACHE_VALUE_TTL_HOURS_BY_TIER,
             'cache_dir': str(self.cache_dir)
         }
     
     def clear_all_cache(self):
-        """모든 캐시 삭제"""
+        """모든 로컬 캐시 삭제 (공유 저장소는 다른 서버가 사용하므로 유지)"""
         try:
-            # 모든 파일 삭제
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM cached_values")
+                conn.execute("DELETE FROM stats")
+                
+                # 사용 중이 아닌 모든 파일 삭제 (이전 형식의 <키>.mp3 포함)
+                for file_path in self.blobs_dir.glob("*.mp3"):
+                    if not self._is_pinned(conn, file_path.stem):
+                        file_path.unlink()
             for file_path in self.cache_dir.glob("*.mp3"):
                 file_path.unlink()
             
-            # 메타데이터 파일 삭제
-            if self.metadata_file.exists():
-                self.metadata_file.unlink()
-            
-            # 메타데이터 초기화
-            self.metadata = {}
-            
             logger.info("모든 캐시 삭제됨")
-            
+        
         except Exception as e:
             logger.error(f"캐시 삭제 실패: {e}")
 
+def _is_process_alive(pid: int) -> bool:
+    """프로세스가 살아 있는지 확인"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
 # 전역 캐시 매니저 인스턴스
-cache_manager = CacheManager() 
\ No newline at end of file
+cache_manager = CacheManager()
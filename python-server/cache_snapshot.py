@@ -0,0 +1,227 @@
+"""
+캐시 스냅샷 모듈
+캐시 인덱스와 블롭을 tar 아카이브로 내보내고 다른 서버에서 가져와 새 서버를 미리 채운다
+
+사용법:
+    python cache_snapshot.py export snapshot.tar --since-hours 72 --min-hits 1
+    python cache_snapshot.py import snapshot.tar
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import tarfile
+import argparse
+import logging
+import threading
+from typing import Iterator, Optional, Dict, Any, BinaryIO
+
+from cache_manager import cache_manager, hash_file
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+_BLOB_MEMBER_PATTERN = re.compile(r"^blobs/([0-9a-f]{64})\.mp3$")
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+
+# 진행 중/마지막 가져오기 상태 (GET /cache/snapshot/status)
+import_status: Dict[str, Any] = {"state": "idle"}
+_import_lock = threading.Lock()
+
+
+def _tar_header(name: str, size: int) -> bytes:
+    """tar 멤버 헤더 생성"""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _tar_padding(size: int) -> bytes:
+    """멤버 내용 뒤의 512바이트 블록 정렬용 패딩"""
+    return b"\0" * ((_BLOCK_SIZE - size % _BLOCK_SIZE) % _BLOCK_SIZE)
+
+
+def iter_snapshot(since_hours: Optional[float] = None, min_hits: Optional[int] = None, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    캐시 스냅샷을 tar 아카이브로 스트리밍
+    
+    manifest.json(인덱스 항목과 값 캐시)을 먼저 쓰고 블롭을 이어서 쓴다.
+    항목 선택 시점에 블롭을 사용 중으로 표시하므로 내보내는 동안 삭제되지 않는다.
+    
+    Args:
+        since_hours: 최근 N시간 안에 사용된 항목만
+        min_hits: 히트 수가 N 이상인 항목만
+        chunk_size: 블롭을 읽는 단위 (바이트)
+    
+    Yields:
+        tar 아카이브 조각
+    """
+    snapshot = cache_manager.select_snapshot(since_hours=since_hours, min_hits=min_hits)
+    try:
+        manifest = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "created_at": snapshot["created_at"],
+            "entries": snapshot["entries"],
+            "values": snapshot["values"],
+        }, ensure_ascii=False).encode("utf-8")
+        yield _tar_header(MANIFEST_NAME, len(manifest))
+        yield manifest + _tar_padding(len(manifest))
+        
+        for blob_hash in snapshot["blobs"]:
+            blob_path = cache_manager.get_blob_path(blob_hash)
+            size = os.path.getsize(blob_path)
+            yield _tar_header(f"blobs/{blob_hash}.mp3", size)
+            with open(blob_path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    yield chunk
+            yield _tar_padding(size)
+        
+        # 아카이브 끝 (빈 블록 2개)
+        yield b"\0" * (_BLOCK_SIZE * 2)
+        
+        logger.info(
+            f"캐시 스냅샷 내보내기 완료: 항목 {len(snapshot['entries'])}개, "
+            f"블롭 {len(snapshot['blobs'])}개, 값 {len(snapshot['values'])}개"
+        )
+    finally:
+        cache_manager.release_snapshot(snapshot)
+
+
+def export_snapshot(output: BinaryIO, since_hours: Optional[float] = None, min_hits: Optional[int] = None):
+    """캐시 스냅샷을 파일 객체에 쓰기"""
+    for chunk in iter_snapshot(since_hours=since_hours, min_hits=min_hits):
+        output.write(chunk)
+
+
+def import_snapshot(source: BinaryIO) -> Dict[str, int]:
+    """
+    tar 스트림에서 캐시 스냅샷 가져오기
+    
+    블롭 하나씩 짧은 트랜잭션으로 추가하므로 가져오는 동안에도 요청 처리가 막히지 않는다.
+    로컬에 이미 있는 캐시 키와 블롭은 건너뛰고, 해시가 맞지 않는 블롭은 버린다.
+    
+    Args:
+        source: tar 아카이브를 읽을 파일 객체 (순차 읽기)
+    
+    Returns:
+        {"entries", "values", "blobs", "skipped_blobs"} 가져온 수
+    """
+    result = {"entries": 0, "values": 0, "blobs": 0, "skipped_blobs": 0}
+    entries_by_blob: Dict[str, list] = {}
+    work_dir = cache_manager.make_work_dir()
+    
+    try:
+        with tarfile.open(fileobj=source, mode="r|*") as archive:
+            for member in archive:
+                if member.name == MANIFEST_NAME:
+                    manifest = json.load(archive.extractfile(member))
+                    if manifest.get("version") != SNAPSHOT_VERSION:
+                        raise ValueError(f"지원하지 않는 스냅샷 버전: {manifest.get('version')}")
+                    for entry in manifest["entries"]:
+                        entries_by_blob.setdefault(entry["blob"], []).append(entry)
+                    result["values"] = cache_manager.import_values(manifest["values"])
+                    continue
+                
+                match = _BLOB_MEMBER_PATTERN.match(member.name)
+                if not match or not member.isfile():
+                    continue
+                blob_hash = match.group(1)
+                entries = entries_by_blob.get(blob_hash, [])
+                if not entries:
+                    continue
+                
+                # 로컬에 이미 있는 블롭은 내용을 받지 않고 항목 정보만 추가
+                blob_file = None
+                if not cache_manager.has_blob(blob_hash):
+                    blob_file = os.path.join(work_dir, f"{blob_hash}.mp3")
+                    with open(blob_file, "wb") as f:
+                        shutil.copyfileobj(archive.extractfile(member), f)
+                    if hash_file(blob_file) != blob_hash:
+                        logger.warning(f"스냅샷 블롭 해시 불일치, 건너뜀: {blob_hash[:12]}")
+                        os.remove(blob_file)
+                        result["skipped_blobs"] += 1
+                        continue
+                    result["blobs"] += 1
+                
+                result["entries"] += cache_manager.import_entries(blob_hash, entries, blob_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    logger.info(f"캐시 스냅샷 가져오기 완료: {result}")
+    return result
+
+
+def import_snapshot_file(path: str, remove_after: bool = False):
+    """
+    파일에서 스냅샷 가져오기 (백그라운드 작업용, 진행 상태는 import_status에 기록)
+    
+    Args:
+        path: 스냅샷 파일 경로
+        remove_after: 가져온 뒤 파일 삭제 여부
+    """
+    if not _import_lock.acquire(blocking=False):
+        logger.warning("이미 스냅샷을 가져오는 중입니다")
+        return
+    
+    import_status.clear()
+    import_status.update({"state": "running", "started_at": time.time()})
+    try:
+        with open(path, "rb") as f:
+            result = import_snapshot(f)
+        import_status.update({"state": "done", "finished_at": time.time(), "result": result})
+    except Exception as e:
+        logger.error(f"캐시 스냅샷 가져오기 실패: {e}")
+        import_status.update({"state": "failed", "finished_at": time.time(), "error": str(e)})
+    finally:
+        _import_lock.release()
+        if remove_after:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def is_import_running() -> bool:
+    """스냅샷 가져오기 진행 여부"""
+    return _import_lock.locked()
+
+
+def main():
+    """명령줄 실행 (export/import)"""
+    parser = argparse.ArgumentParser(description="캐시 스냅샷 내보내기/가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="캐시 스냅샷 내보내기")
+    export_parser.add_argument("output", help="출력 파일 경로 (- 이면 표준 출력)")
+    export_parser.add_argument("--since-hours", type=float, help="최근 N시간 안에 사용된 항목만")
+    export_parser.add_argument("--min-hits", type=int, help="히트 수가 N 이상인 항목만")
+    
+    import_parser = subparsers.add_parser("import", help="캐시 스냅샷 가져오기")
+    import_parser.add_argument("input", help="스냅샷 파일 경로 (- 이면 표준 입력)")
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    
+    if args.command == "export":
+        if args.output == "-":
+            export_snapshot(sys.stdout.buffer, args.since_hours, args.min_hits)
+        else:
+            with open(args.output, "wb") as f:
+                export_snapshot(f, args.since_hours, args.min_hits)
+    else:
+        if args.input == "-":
+            result = import_snapshot(sys.stdin.buffer)
+        else:
+            with open(args.input, "rb") as f:
+                result = import_snapshot(f)
+        print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+YouTube 자막 파싱 모듈
+yt-dlp로 가져온 자막(VTT/SRT/json3)을 Whisper 결과와 같은 세그먼트 구조로 변환
+"""
+
+import json
+import re
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 자막 타임스탬프 (00:01:02.345, 01:02.345, 00:01:02,345)
+_TIMESTAMP_PATTERN = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})")
+_CUE_TIMING_PATTERN = re.compile(r"^\s*(\S+)\s+-->\s+(\S+)")
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def _parse_timestamp(value: str) -> Optional[float]:
+    """자막 타임스탬프 문자열을 초 단위로 변환"""
+    match = _TIMESTAMP_PATTERN.match(value.strip())
+    if not match:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return (
+        int(hours or 0) * 3600
+        + int(minutes) * 60
+        + int(seconds)
+        + int(millis.ljust(3, "0")) / 1000
+    )
+
+
+def _clean_caption_text(text: str) -> str:
+    """자막 텍스트에서 스타일 태그와 불필요한 공백 제거"""
+    text = _TAG_PATTERN.sub("", text)
+    text = text.replace("&nbsp;", " ").replace("&amp;", "&")
+    text = text.replace("&lt;", "<").replace("&gt;", ">")
+    return " ".join(text.split())
+
+
+def _parse_cues(content: str) -> List[Dict[str, Any]]:
+    """VTT/SRT 공통 큐 블록 파싱 (타이밍 줄 이후의 텍스트 줄을 하나의 세그먼트로)"""
+    segments = []
+    for block in re.split(r"\r?\n\s*\r?\n", content):
+        lines = block.strip().splitlines()
+        for index, line in enumerate(lines):
+            timing = _CUE_TIMING_PATTERN.match(line)
+            if not timing:
+                continue
+            start = _parse_timestamp(timing.group(1))
+            end = _parse_timestamp(timing.group(2))
+            text = _clean_caption_text(" ".join(lines[index + 1:]))
+            if start is not None and end is not None and text:
+                segments.append({"start": start, "end": end, "text": text})
+            break
+    return segments
+
+
+def parse_vtt(content: str) -> List[Dict[str, Any]]:
+    """WebVTT 자막 파싱"""
+    return _dedupe_rolling_segments(_parse_cues(content))
+
+
+def parse_srt(content: str) -> List[Dict[str, Any]]:
+    """SRT 자막 파싱"""
+    return _dedupe_rolling_segments(_parse_cues(content))
+
+
+def parse_json3(content: str) -> List[Dict[str, Any]]:
+    """YouTube json3 자막 파싱"""
+    data = json.loads(content)
+    segments = []
+    for event in data.get("events", []):
+        if "segs" not in event:
+            continue
+        text = _clean_caption_text("".join(seg.get("utf8", "") for seg in event["segs"]))
+        if not text:
+            continue
+        start = event.get("tStartMs", 0) / 1000
+        end = start + event.get("dDurationMs", 0) / 1000
+        segments.append({"start": start, "end": end, "text": text})
+    return _dedupe_rolling_segments(segments)
+
+
+def _dedupe_rolling_segments(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    자동 생성 자막의 롤링(이전 줄 반복) 현상 제거
+
+    자동 자막은 이전 큐의 텍스트를 다음 큐의 앞부분에 다시 포함하므로
+    앞 세그먼트와 겹치는 접두부를 잘라낸다.
+    """
+    deduped = []
+    previous_text = ""
+    for segment in segments:
+        text = segment["text"]
+        if text == previous_text:
+            continue
+        if previous_text and text.startswith(previous_text):
+            text = text[len(previous_text):].strip()
+        previous_text = segment["text"]
+        if text:
+            deduped.append({**segment, "text": text})
+    return deduped
+
+
+CAPTION_PARSERS = {
+    "json3": parse_json3,
+    "vtt": parse_vtt,
+    "srt": parse_srt,
+}
+
+
+def parse_captions(content: str, ext: str) -> List[Dict[str, Any]]:
+    """
+    자막 내용을 세그먼트 리스트로 변환
+
+    Args:
+        content: 자막 파일 내용
+        ext: 자막 형식 (json3, vtt, srt)
+
+    Returns:
+        [{"start": 초, "end": 초, "text": 텍스트}, ...]
+    """
+    parser = CAPTION_PARSERS.get(ext)
+    if parser is None:
+        raise ValueError(f"지원하지 않는 자막 형식: {ext}")
+    return parser(content)
+
+
+def select_caption_track(info: dict, language: str, allow_auto: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    yt-dlp 영상 정보에서 요청 언어의 자막 트랙 선택
+
+    업로드된 자막을 자동 생성 자막보다 우선하며, 형식은 CAPTION_PARSERS 순서로 선택한다.
+
+    Args:
+        info: yt-dlp extract_info 결과
+        language: 언어 코드 (ko, en 등)
+        allow_auto: 자동 생성 자막 허용 여부
+
+    Returns:
+        {"url", "ext", "language", "auto_generated"} 또는 None
+    """
+    sources = [("subtitles", False)]
+    # 자동 자막은 모든 언어로의 기계 번역본이 함께 제공되므로
+    # 영상 원어가 요청 언어일 때만 사용 (원어 트랙은 "<lang>-orig"로 표시됨)
+    automatic = info.get("automatic_captions") or {}
+    video_language = (info.get("language") or "").split("-")[0]
+    if allow_auto and (f"{language}-orig" in automatic or video_language == language):
+        sources.append(("automatic_captions", True))
+
+    for field, auto_generated in sources:
+        tracks = info.get(field) or {}
+        for lang in (f"{language}-orig", language):
+            for ext in CAPTION_PARSERS:
+                for track in tracks.get(lang) or []:
+                    if track.get("ext") == ext and track.get("url"):
+                        return {
+                            "url": track["url"],
+                            "ext": ext,
+                            "language": language,
+                            "auto_generated": auto_generated,
+                        }
+    return None
@@ -2,6 +2,8 @@
 YouTube 스크립트 추출 서버 상수 정의
 """
 
+import os
+
 # Whisper 모델 관련 상수
 DEFAULT_WHISPER_MODEL = "large"
 AVAILABLE_WHISPER_MODELS = [
@@ -32,11 +34,26 @@ USE_MPS_ON_APPLE_SILICON = False  # Apple Silicon에서 MPS 사용 여부
 USE_WHISPER_CPP = True  # whisper.cpp 사용 여부 (Metal GPU 활성화)
 WHISPER_CPP_PATH = "./whisper.cpp"  # whisper.cpp 설치 경로
 WHISPER_CPP_MODELS_PATH = "./whisper.cpp/models"  # 모델 경로
+# 모델별 whisper-server 프로세스 하나를 모든 워커가 함께 사용 (모델 가중치를 한 번만 메모리에 올림)
+# 서버는 추론을 한 번에 하나씩 처리하므로 워커/동시 처리 수와 관계없이 음성 인식이 순서대로 실행됨
+# 메모리가 부족할 때만 켜고, 기본은 요청마다 whisper-cli 실행 (모델 파일은 mmap으로 읽어 페이지 캐시 공유)
+USE_WHISPER_CPP_SERVER = os.getenv("USE_WHISPER_CPP_SERVER", "0") == "1"
+WHISPER_CPP_SERVER_HOST = "127.0.0.1"
+WHISPER_CPP_SERVER_STARTUP_TIMEOUT = 120  # 서버 시작(모델 로드) 대기 시간 (초)
+# 운영 모드에서 워커를 만들기 전에 미리 로드할 모델 (쉼표 구분, 워커들이 같은 메모리를 공유)
+PRELOAD_WHISPER_MODELS = [m.strip() for m in os.getenv("PRELOAD_WHISPER_MODELS", "").split(",") if m.strip()]
 
 # 기본 설정값
 DEFAULT_FORMAT_WITH_SEGMENTS = True
 DEFAULT_FORMAT_WITH_TIMESTAMPS = False
 
+# 음성 인식 언어
+DEFAULT_TRANSCRIPTION_LANGUAGE = "ko"
+
+# 자막 우선 사용 설정 (영상에 자막이 있으면 음성 인식 생략)
+USE_CAPTIONS_WHEN_AVAILABLE = True  # 자막 우선 사용 여부
+ALLOW_AUTO_GENERATED_CAPTIONS = True  # YouTube 자동 생성 자막 허용 여부
+
 # 오디오 품질 설정
 AUDIO_QUALITY = "192"
 AUDIO_CODEC = "mp3"
@@ -44,6 +61,19 @@ AUDIO_CODEC = "mp3"
 # 서버 설정
 SERVER_HOST = "0.0.0.0"
 SERVER_PORT = 15000
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))  # 운영 모드 워커 프로세스 수
+# 워커당 동시 처리할 스크립트 추출 요청 수 (나머지는 대기) - 음성 인식은 CPU/GPU를 모두 사용하므로 작게 유지
+MAX_CONCURRENT_TRANSCRIPTIONS = int(os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", "2"))
+
+# 다운로드 실패 처리
+DOWNLOAD_MAX_ATTEMPTS = 3  # 일시적 실패(네트워크, 요청 제한) 시 최대 시도 횟수
+DOWNLOAD_RETRY_BACKOFF_SECONDS = 2.0  # 재시도 대기 시간 (시도마다 2배)
+# 실패 결과 캐시 시간 (시간) - 같은 영상 재요청은 다운로드 없이 바로 실패
+DOWNLOAD_FAILURE_TTL_HOURS = {
+    "permanent": 6,    # 비공개, 삭제, 사용 불가 (공개 전환 가능성 고려)
+    "restricted": 6,   # 연령/지역/회원 제한
+    "transient": 1 / 60  # 네트워크 오류, 요청 제한 (1분)
+}
 
 # 타임아웃 설정
 DEFAULT_TIMEOUT_SECONDS = 300  # 기본 5분
@@ -52,8 +82,76 @@ TIMEOUT_PER_MB_SECONDS = 10    # MB당 10초 추가
 
 # 파일 캐시 설정
 CACHE_DIR = "./cache"  # 캐시 디렉토리
-CACHE_RETENTION_HOURS = 24  # 캐시 보관 시간 (시간)
-CACHE_CLEANUP_INTERVAL = 3600  # 캐시 정리 간격 (초)
+CACHE_RETENTION_HOURS = 24  # 캐시 보관 시간 (시간, 마지막 사용 기준)
+CACHE_CLEANUP_INTERVAL = 3600  # 캐시 인덱스-디렉토리 대조 정리 간격 (초)
+CACHE_JANITOR_INTERVAL = 60  # 백그라운드 정리 작업 주기 (초, 만료/용량 정리)
+CACHE_JANITOR_MAX_DELETES = 200  # 정리 1회당 최대 삭제 항목 수 (I/O 제한)
+CACHE_WORK_DIR_MAX_AGE_HOURS = 6  # 남겨진 다운로드 작업 디렉토리 삭제 기준 (시간)
+# 계층별 보관 시간 (시간, 마지막 사용 기준) - 구간 오디오는 전체 오디오에서 다시 만들 수 있으므로 짧게
+CACHE_RETENTION_HOURS_BY_TIER = {
+    "audio": CACHE_RETENTION_HOURS,
+    "audio_range": 6
+}
+# 값 캐시 계층별 유효 시간 (시간, 저장 시점 기준) - 스크립트 결과, yt-dlp 영상 정보, 네이버 API 응답
+# 영상 정보의 자막 URL은 서명이 만료되므로 짧게 유지
+CACHE_VALUE_TTL_HOURS_BY_TIER = {
+    "transcript": 24 * 7,
+    "metadata": 1,
+    "naver": 6,
+    "evaluation": 24 * 7
+}
+CACHE_MAX_SIZE_MB = 10240  # 캐시 최대 디스크 사용량 (MB)
+CACHE_MAX_ENTRIES = 5000  # 캐시 최대 항목 수
+CACHE_EVICTION_POLICY = "lru"  # 용량 초과 시 제거 정책: "lru" (오래 안 쓴 순) 또는 "lfu" (크기 대비 사용 횟수 적은 순)
+
+# 공유 캐시 저장소 (여러 서버 복제본이 오디오/스크립트 캐시 공유, 로컬 캐시는 앞단의 읽기 캐시로 동작)
+CACHE_SHARED_BACKEND = os.getenv("CACHE_SHARED_BACKEND")  # 없으면 사용 안 함, "local" (공유 디스크) 또는 "s3"
+CACHE_SHARED_DIR = os.getenv("CACHE_SHARED_DIR", "./shared-cache")  # "local" 저장소 경로 (NFS 마운트 등)
+CACHE_S3_BUCKET = os.getenv("CACHE_S3_BUCKET")  # "s3" 저장소 버킷
+CACHE_S3_PREFIX = os.getenv("CACHE_S3_PREFIX", "ttube-cache")  # 버킷 안의 경로 접두사
+CACHE_S3_ENDPOINT_URL = os.getenv("CACHE_S3_ENDPOINT_URL")  # S3 호환 서버 주소 (MinIO: http://localhost:9000)
+CACHE_SHARED_UPLOAD_WORKERS = 2  # 공유 저장소 업로드 스레드 수 (요청 처리와 분리)
+CACHE_SHARED_VALUE_TIERS = ("transcript",)  # 공유할 값 캐시 계층 (영상 정보의 자막 URL은 서버별로 서명되므로 제외)
+
+# 캐시 스냅샷 API (GET/POST /cache/snapshot - 캐시 전체를 내보내거나 덮어쓰므로 기본은 꺼짐)
+CACHE_SNAPSHOT_API_ENABLED = os.getenv("CACHE_SNAPSHOT_API_ENABLED", "0") == "1"
+CACHE_ADMIN_TOKEN = os.getenv("CACHE_ADMIN_TOKEN")  # 설정하면 X-Admin-Token 헤더가 같은 요청만 허용
+
+# 스크립트 검색 색인 (캐시 정리 대상이 아닌 영구 저장, SQLite FTS5 trigram)
+TRANSCRIPT_INDEX_FILE = os.getenv("TRANSCRIPT_INDEX_FILE", "./data/transcripts.db")
+TRANSCRIPT_INDEX_PASSAGE_CHARS = 200  # 연속 세그먼트를 이 길이까지 묶어 색인 (단어 단위 세그먼트도 문구로 검색)
+SEARCH_MAX_RESULTS = 20  # 검색 결과 최대 스크립트 수
+SEARCH_MAX_HITS_PER_TRANSCRIPT = 5  # 스크립트별 반환할 구간 수
+SEARCH_MAX_SCANNED_HITS = 2000  # 검색 1회에 읽는 최대 구간 수 (흔한 검색어의 응답 시간 제한)
+
+# 스크립트 키워드 (말뭉치 단어 통계를 스크립트가 추가될 때마다 갱신, TF-IDF)
+KEYWORD_INDEX_FILE = os.getenv("KEYWORD_INDEX_FILE", "./data/keywords.db")
+KEYWORD_MIN_DOCUMENT_FREQUENCY = 2  # 말뭉치 상위 키워드는 이 수 이상의 스크립트에 나온 단어만
+
+# 중복 스크립트 탐지 (MinHash 서명 + LSH 색인)
+NEAR_DUPLICATE_INDEX_FILE = os.getenv("NEAR_DUPLICATE_INDEX_FILE", "./data/near_duplicates.db")
+MINHASH_NUM_PERM = 128  # 서명 길이 (유사도 추정 오차 약 1/sqrt(128) = 0.09)
+MINHASH_LSH_BANDS = 16  # 밴드 수 (밴드당 8개 값) - 유사도 약 0.7 이상이면 후보가 될 확률이 높음 ((1/16)^(1/8))
+MINHASH_SHINGLE_CHARS = 5  # n-gram 글자 수 (공백/문장부호 제거 후)
+NEAR_DUPLICATE_THRESHOLD = 0.7  # 중복으로 볼 최소 자카드 유사도
+NEAR_DUPLICATE_PREFIX_SECONDS = 180  # 중복 확인용 앞부분 길이 (초)
+# 스크립트 추출 시 앞부분만 먼저 음성 인식해 이미 추출한 영상과 같으면 저장된 스크립트 재사용 (요청의 reuse_duplicates 기본값)
+NEAR_DUPLICATE_SHORT_CIRCUIT = os.getenv("NEAR_DUPLICATE_SHORT_CIRCUIT", "0") == "1"
+NEAR_DUPLICATE_DURATION_TOLERANCE = 0.05  # 재사용할 스크립트의 영상 길이 허용 오차 (비율, 앞부분만 같은 리액션 영상 제외)
+
+# 콘텐츠 평가 (Claude CLI)
+EVALUATION_BACKEND = os.getenv("EVALUATION_BACKEND", "claude")  # "claude" (Claude CLI) 또는 "fake" (오프라인 테스트용 고정 결과)
+CLAUDE_CLI_COMMAND = os.getenv("CLAUDE_CLI_COMMAND", "claude")  # Claude CLI 실행 파일 경로
+EVALUATION_TIMEOUT_SECONDS = int(os.getenv("EVALUATION_TIMEOUT_SECONDS", "60"))  # 평가 1회 최대 시간 (초과 시 CLI 프로세스 종료)
+MAX_CONCURRENT_EVALUATIONS = int(os.getenv("MAX_CONCURRENT_EVALUATIONS", "4"))  # 동시에 실행할 Claude CLI 프로세스 수 (워커 프로세스당)
+# 긴 콘텐츠 평가 (구간별로 동시에 평가한 뒤 한 번 더 호출해 합치기)
+EVALUATION_LONG_CONTENT_CHARS = 8000  # 이보다 긴 종합 평가는 자동으로 구간 평가 (요청의 long_content로 지정 가능)
+EVALUATION_CHUNK_CHARS = 4000  # 구간 최대 글자 수 (한국어 약 10분 분량)
+EVALUATION_MAX_CHUNKS = 8  # 최대 구간 수 (넘으면 구간 길이를 늘림, MAX_CONCURRENT_EVALUATIONS보다 작은 쪽 적용)
+EVALUATION_MAX_CONTENT_CHARS = 200000  # 평가할 콘텐츠 최대 글자 수 (한국어 약 8시간 분량, 일괄 평가는 항목마다 적용)
+# 여러 콘텐츠 일괄 평가
+EVALUATION_BATCH_MAX_ITEMS = 100  # 요청 1회 최대 항목 수
+EVALUATION_BATCH_WORKERS = int(os.getenv("EVALUATION_BATCH_WORKERS", str(MAX_CONCURRENT_EVALUATIONS)))  # 요청 1회에서 동시에 진행할 평가 수
 
 # CORS 설정
 ALLOWED_ORIGINS = [
@@ -0,0 +1,61 @@
+"""
+다운로드 실패 분류 모듈
+yt-dlp 오류 메시지를 영구 실패(비공개, 삭제), 제한(연령/지역/회원), 일시적 실패(네트워크, 요청 제한)로 분류
+"""
+
+import re
+from typing import Dict, Any
+
+from constants import DOWNLOAD_FAILURE_TTL_HOURS
+
+PERMANENT = "permanent"    # 영상이 없거나 비공개 - 다시 시도해도 실패
+RESTRICTED = "restricted"  # 연령/지역/회원 제한 - 이 서버에서는 계속 실패
+TRANSIENT = "transient"    # 네트워크 오류, 요청 제한 - 잠시 후 재시도
+
+# (패턴, 분류, 사유 코드, 사용자 메시지, HTTP 상태 코드) - 위에서부터 먼저 일치하는 규칙 사용
+_FAILURE_RULES = [
+    (r"private video", PERMANENT, "private", "비공개 영상입니다", 404),
+    (r"removed by the uploader|has been removed|account .* terminated", PERMANENT, "removed", "삭제된 영상입니다", 404),
+    (r"copyright", PERMANENT, "copyright", "저작권 문제로 차단된 영상입니다", 404),
+    # 제한 영상 메시지에도 "not available"/"unavailable"이 포함될 수 있으므로 사용 불가 규칙보다 먼저 검사
+    (r"available in your country|geo[- ]?restrict|blocked it in your country", RESTRICTED, "geo_blocked", "이 지역에서 볼 수 없는 영상입니다", 451),
+    (r"confirm your age|age[- ]restricted|inappropriate for some users", RESTRICTED, "age_restricted", "연령 제한 영상입니다", 403),
+    (r"members[- ]only|join this channel", RESTRICTED, "members_only", "채널 회원 전용 영상입니다", 403),
+    # 오래된 yt-dlp/추출기 오류 - 영상 문제가 아니므로 짧게만 기억 (영상 규칙의 "not available"보다 먼저 검사)
+    (r"requested format is not available", TRANSIENT, "unknown", "오디오 다운로드에 실패했습니다", 502),
+    (r"video unavailable|this video is not available|does not exist|unsupported url|incomplete youtube id", PERMANENT, "unavailable", "사용할 수 없는 영상입니다", 404),
+    (r"http error 429|too many requests|rate[- ]limit", TRANSIENT, "rate_limited", "YouTube 요청 제한에 걸렸습니다", 503),
+    (r"timed? ?out|connection|network|temporary failure|http error 5\d\d|unable to download", TRANSIENT, "network", "YouTube 연결에 실패했습니다", 503),
+]
+_COMPILED_RULES = [
+    (re.compile(pattern, re.IGNORECASE), kind, reason, message, status_code)
+    for pattern, kind, reason, message, status_code in _FAILURE_RULES
+]
+
+
+def classify_download_error(error: Exception) -> Dict[str, Any]:
+    """
+    다운로드 오류 분류
+    
+    Args:
+        error: yt-dlp 예외
+    
+    Returns:
+        {"kind", "reason", "message", "status_code", "ttl_hours", "detail"}
+    """
+    detail = str(error).replace("ERROR: ", "").strip()
+    for pattern, kind, reason, message, status_code in _COMPILED_RULES:
+        if pattern.search(detail):
+            break
+    else:
+        # 알 수 없는 오류는 일시적 실패로 보고 짧게만 기억
+        kind, reason, message, status_code = TRANSIENT, "unknown", "오디오 다운로드에 실패했습니다", 502
+    
+    return {
+        "kind": kind,
+        "reason": reason,
+        "message": message,
+        "status_code": status_code,
+        "ttl_hours": DOWNLOAD_FAILURE_TTL_HOURS[kind],
+        "detail": detail[:500],
+    }
@@ -0,0 +1,1069 @@
+"""
+콘텐츠 평가 서비스 모듈
+Claude CLI를 비동기 서브프로세스로 실행하고, 동시 실행 수 제한 / 결과 캐시 / 같은 평가 요청 합치기를 담당
+평가기는 교체 가능 (EVALUATION_BACKEND=fake 이면 Claude CLI 없이 고정 결과를 반환해 오프라인 테스트)
+"""
+
+import json
+import math
+import time
+import asyncio
+import hashlib
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from constants import (
+    CLAUDE_CLI_COMMAND,
+    EVALUATION_BACKEND,
+    EVALUATION_TIMEOUT_SECONDS,
+    MAX_CONCURRENT_EVALUATIONS,
+    EVALUATION_CHUNK_CHARS,
+    EVALUATION_MAX_CHUNKS,
+    EVALUATION_BATCH_WORKERS
+)
+from cache_manager import cache_manager
+from transcript_renderer import Segment, format_clock, split_sentences
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_CACHE_TIER = "evaluation"  # 값 캐시 계층 (유효 시간은 CACHE_VALUE_TTL_HOURS_BY_TIER)
+
+SCORE_CRITERIA = (
+    "재미도", "사실성", "흥미도", "독창성",
+    "실용성", "트렌드_적합성", "타겟_명확성", "제작_가능성"
+)
+COMPREHENSIVE_FIELDS = ("총평", "점수", "평균_점수", "강점", "개선점", "추천_액션")
+
+_STREAM_LINE_LIMIT = 4 * 1024 * 1024  # Claude CLI stream-json 한 줄 최대 크기 (전체 메시지 이벤트 포함)
+
+
+_CRITERIA_GUIDE = """다음 기준으로 1-10점 척도로 평가하고 구체적인 이유를 제시해주세요:
+
+1. 재미도 (Entertainment Value): 시청자의 흥미를 유발하고 지속시킬 수 있는가?
+2. 사실성 (Factual Accuracy): 정보의 정확성과 신뢰성은 어떠한가?
+3. 흥미도 (Engagement Level): 시청자가 끝까지 볼 가능성은 얼마나 되는가?
+4. 독창성 (Originality): 기존 콘텐츠와 차별화되는 독특한 요소가 있는가?
+5. 실용성 (Practical Value): 시청자에게 실질적 도움이나 가치를 제공하는가?
+6. 트렌드 적합성 (Trend Relevance): 현재 트렌드와 얼마나 잘 맞는가?
+7. 타겟 명확성 (Target Clarity): 목표 시청자층이 명확하고 그들에게 적합한가?
+8. 제작 가능성 (Production Feasibility): 실제 제작이 현실적으로 가능한가?"""
+
+_COMPREHENSIVE_SCHEMA = """{
+  "총평": "한 문장 종합 평가",
+  "점수": {
+    "재미도": {"점수": 0, "이유": ""},
+    "사실성": {"점수": 0, "이유": ""},
+    "흥미도": {"점수": 0, "이유": ""},
+    "독창성": {"점수": 0, "이유": ""},
+    "실용성": {"점수": 0, "이유": ""},
+    "트렌드_적합성": {"점수": 0, "이유": ""},
+    "타겟_명확성": {"점수": 0, "이유": ""},
+    "제작_가능성": {"점수": 0, "이유": ""}
+  },
+  "평균_점수": 0,
+  "강점": ["강점1", "강점2"],
+  "개선점": ["개선점1", "개선점2"],
+  "추천_액션": "구체적인 다음 단계 제안"
+}"""
+
+# 구간 평가 응답 형식 (종합 평가 형식 + 구간 요약, 합치기 단계에서 전체 흐름 파악용)
+_CHUNK_SCHEMA = _COMPREHENSIVE_SCHEMA[:-2] + """,
+  "요약": "이 구간의 핵심 내용 2-3문장"
+}"""
+
+
+class ContentChunk(NamedTuple):
+    """긴 콘텐츠를 나눈 구간 (세그먼트로 나눈 경우 시작/끝 시간 포함)"""
+    text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+    
+    @property
+    def label(self) -> str:
+        if self.start is None or self.end is None:
+            return ""
+        return f"{format_clock(self.start)}-{format_clock(self.end)}"
+
+
+class EvaluationError(Exception):
+    """평가 실패 (CLI 실행 오류, 응답 파싱 실패)"""
+
+
+class EvaluationTimeout(EvaluationError):
+    """평가 시간 초과"""
+
+
+def build_prompt(content: str, title: Optional[str] = None, category: Optional[str] = None,
+                 evaluation_type: Optional[str] = "comprehensive") -> str:
+    """
+    평가 프롬프트 생성
+    
+    Args:
+        content: 평가할 콘텐츠
+        title: 제목
+        category: 카테고리
+        evaluation_type: "simple" 또는 "comprehensive"
+    
+    Returns:
+        Claude CLI에 전달할 프롬프트
+    """
+    if evaluation_type == "simple":
+        return f"""콘텐츠: {content}
+
+YouTube 영상 콘텐츠로서 1-10점 평가:
+- 재미도 (시청자가 재미있어할까?)
+- 정보성 (유용한 정보를 제공하는가?)
+- 바이럴 가능성 (공유하고 싶은 콘텐츠인가?)
+- 제작 난이도 (실제 만들기 어려운가?)
+
+JSON 형식으로 응답해주세요."""
+    
+    return f"""다음 콘텐츠를 객관적으로 평가해주세요.
+
+콘텐츠: {content}
+{f'제목: {title}' if title else ''}
+{f'카테고리: {category}' if category else ''}
+
+{_CRITERIA_GUIDE}
+
+JSON 형식으로 응답해주세요:
+{_COMPREHENSIVE_SCHEMA}"""
+
+
+def build_chunk_prompt(chunk: ContentChunk, index: int, total: int,
+                       title: Optional[str] = None, category: Optional[str] = None) -> str:
+    """긴 콘텐츠의 한 구간 평가 프롬프트 (구간 요약 포함)"""
+    position = f"{index + 1}/{total}번째 구간" + (f" ({chunk.label})" if chunk.label else "")
+    return f"""다음은 긴 영상 콘텐츠를 {total}개 구간으로 나눈 것 중 {position}입니다.
+이 구간만 객관적으로 평가해주세요. 앞뒤 구간은 따로 평가됩니다.
+
+구간 내용: {chunk.text}
+{f'제목: {title}' if title else ''}
+{f'카테고리: {category}' if category else ''}
+
+{_CRITERIA_GUIDE}
+
+JSON 형식으로 응답해주세요:
+{_CHUNK_SCHEMA}"""
+
+
+def build_reduce_prompt(chunks: List[ContentChunk], chunk_evaluations: List[Dict[str, Any]],
+                        title: Optional[str] = None, category: Optional[str] = None) -> str:
+    """구간별 평가 결과를 하나의 종합 평가로 합치는 프롬프트"""
+    parts = []
+    for index, (chunk, evaluation) in enumerate(zip(chunks, chunk_evaluations)):
+        header = f"[구간 {index + 1}" + (f" {chunk.label}" if chunk.label else "") + f", {len(chunk.text)}자]"
+        parts.append(header + "\n" + json.dumps(evaluation, ensure_ascii=False))
+    joined = "\n\n".join(parts)
+    return f"""다음은 긴 영상 콘텐츠를 {len(chunks)}개 구간으로 나누어 각각 평가한 결과입니다.
+{f'제목: {title}' if title else ''}
+{f'카테고리: {category}' if category else ''}
+
+{joined}
+
+구간별 평가를 종합해 콘텐츠 전체를 평가해주세요.
+점수는 구간 길이와 전체 흐름(도입부의 흡입력, 구간 간 반복, 후반부 이탈 가능성)을 고려해 정하고,
+강점과 개선점은 어느 구간에 해당하는지 밝혀주세요.
+
+{_CRITERIA_GUIDE}
+
+JSON 형식으로 응답해주세요:
+{_COMPREHENSIVE_SCHEMA}"""
+
+
+def split_content(
+    content: str,
+    segments: Optional[Iterable[Segment]] = None,
+    max_chars: int = EVALUATION_CHUNK_CHARS,
+    max_chunks: int = EVALUATION_MAX_CHUNKS
+) -> List[ContentChunk]:
+    """
+    긴 콘텐츠를 구간으로 나누기
+    
+    세그먼트가 있으면 세그먼트 경계에서, 없으면 문장 경계에서 나눈다.
+    구간 수가 max_chunks를 넘지 않도록 구간 길이를 늘린다 (동시 평가 수와 합치기 프롬프트 길이 제한).
+    
+    Args:
+        content: 평가할 콘텐츠 (세그먼트가 없을 때 사용)
+        segments: 스크립트 세그먼트 (시작/끝 시간, 텍스트)
+        max_chars: 구간 최대 글자 수
+        max_chunks: 최대 구간 수
+    
+    Returns:
+        구간 목록 (짧은 콘텐츠는 구간 하나)
+    """
+    if segments is not None:
+        units = [(segment.text.strip(), segment.start, segment.end) for segment in segments]
+    else:
+        units = [(sentence, None, None) for sentence in split_sentences(content)]
+    units = [unit for unit in units if unit[0]]
+    if not units:
+        return [ContentChunk(content.strip())] if content.strip() else []
+    
+    total_chars = sum(len(text) + 1 for text, _, _ in units)
+    chunk_chars = max(max_chars, math.ceil(total_chars / max(1, max_chunks)))
+    chunks = _pack_units(units, chunk_chars)
+    while len(chunks) > max_chunks:
+        # 경계에 맞춰 채우면 구간이 조금씩 덜 차므로 구간 길이를 늘려 다시 나눔
+        chunk_chars = math.ceil(chunk_chars * 1.1)
+        chunks = _pack_units(units, chunk_chars)
+    return chunks
+
+
+def _pack_units(units: List[tuple], chunk_chars: int) -> List[ContentChunk]:
+    """세그먼트/문장을 순서대로 chunk_chars까지 채워 구간으로 묶기"""
+    chunks: List[ContentChunk] = []
+    texts: List[str] = []
+    size = 0
+    start = end = None
+    for text, unit_start, unit_end in units:
+        if texts and size + len(text) > chunk_chars:
+            chunks.append(ContentChunk(" ".join(texts), start, end))
+            texts, size, start = [], 0, None
+        # 문장부호 없이 이어지는 긴 문장은 글자 수로 자름
+        while len(text) > chunk_chars:
+            chunks.append(ContentChunk(text[:chunk_chars], unit_start, unit_end))
+            text = text[chunk_chars:]
+        if start is None:
+            start = unit_start
+        end = unit_end
+        texts.append(text)
+        size += len(text) + 1
+    if texts:
+        chunks.append(ContentChunk(" ".join(texts), start, end))
+    return chunks
+
+
+def extract_json(output: str) -> Dict[str, Any]:
+    """
+    평가기 응답에서 JSON 객체 추출 (```json 코드블록 또는 첫 '{'부터 마지막 '}'까지)
+    
+    Raises:
+        EvaluationError: JSON 객체를 찾지 못하거나 파싱할 수 없을 때
+    """
+    output = output.strip()
+    if '```json' in output:
+        json_start = output.find('```json') + 7
+        json_end = output.find('```', json_start)
+        output = output[json_start:json_end if json_end != -1 else None].strip()
+    elif not output.startswith('{'):
+        json_start = output.find('{')
+        json_end = output.rfind('}') + 1
+        if json_start == -1 or json_end <= json_start:
+            raise EvaluationError("Claude CLI가 JSON 형식으로 응답하지 않았습니다.")
+        output = output[json_start:json_end]
+    
+    try:
+        data = json.loads(output)
+    except json.JSONDecodeError as e:
+        raise EvaluationError(f"응답 파싱 실패: {e}")
+    if not isinstance(data, dict):
+        raise EvaluationError("응답 파싱 실패: JSON 객체가 아닙니다.")
+    return data
+
+
+def validate_evaluation(evaluation: Dict[str, Any], evaluation_type: Optional[str] = "comprehensive") -> List[str]:
+    """
+    종합 평가 형식에서 빠진 필드 목록 (간단 평가는 형식을 정하지 않으므로 검사하지 않음)
+    
+    Returns:
+        빠진 필드 이름 목록 (예: ["추천_액션", "점수.독창성"]), 형식에 맞으면 빈 목록
+    """
+    if evaluation_type == "simple":
+        return []
+    missing = [field for field in COMPREHENSIVE_FIELDS if field not in evaluation]
+    scores = evaluation.get("점수")
+    if isinstance(scores, dict):
+        missing += [f"점수.{criterion}" for criterion in SCORE_CRITERIA if criterion not in scores]
+    return missing
+
+
+class JsonFieldParser:
+    """
+    스트리밍 응답에서 최상위 JSON 필드를 완성되는 대로 꺼내는 파서
+    
+    첫 '{'부터 문자열/중첩 괄호를 추적해, 최상위 깊이의 ',' 또는 닫는 '}'를 만나면
+    그 사이의 "키": 값 한 쌍을 파싱한다. 받은 글자는 한 번씩만 훑는다.
+    """
+    
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start: Optional[int] = None
+        self.done = False
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """텍스트 조각을 추가하고 새로 완성된 (필드 이름, 값) 목록 반환"""
+        self.buffer += text
+        fields: List[Tuple[str, Any]] = []
+        buffer = self.buffer
+        while self.position < len(buffer) and not self.done:
+            char = buffer[self.position]
+            if self.member_start is None:
+                if char == '{':
+                    self.depth = 1
+                    self.member_start = self.position + 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    fields.extend(self._parse_member(self.member_start, self.position))
+                    self.done = True
+            elif char == ',' and self.depth == 1:
+                fields.extend(self._parse_member(self.member_start, self.position))
+                self.member_start = self.position + 1
+            self.position += 1
+        return fields
+    
+    def _parse_member(self, start: int, end: int) -> List[Tuple[str, Any]]:
+        member = self.buffer[start:end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError:
+            return []
+
+
+def evaluation_cache_key(evaluation_type: Optional[str], content: str,
+                         title: Optional[str] = None, category: Optional[str] = None) -> str:
+    """평가 결과 캐시 키 (평가 타입, 콘텐츠, 제목, 카테고리의 SHA-256)"""
+    payload = json.dumps([evaluation_type or "comprehensive", content, title or "", category or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Evaluator:
+    """
+    평가기 인터페이스
+    
+    프롬프트를 받아 원본 텍스트 응답을 반환한다. 실패하면 EvaluationError를 발생시킨다.
+    """
+    
+    name = "base"
+    
+    async def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+    
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """응답 텍스트를 생성되는 대로 조각으로 반환 (기본: 완성된 응답 한 번)"""
+        yield await self.complete(prompt)
+
+
+class ClaudeCliEvaluator(Evaluator):
+    """Claude CLI (claude -p) 를 비동기 서브프로세스로 실행하는 평가기"""
+    
+    name = "claude"
+    
+    def __init__(self, command: str = CLAUDE_CLI_COMMAND, timeout: float = EVALUATION_TIMEOUT_SECONDS):
+        self.command = command
+        self.timeout = timeout
+        self.partial_messages = True  # --include-partial-messages 사용 여부 (모르는 CLI 버전이면 꺼짐)
+    
+    async def complete(self, prompt: str) -> str:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.command, "-p", prompt,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise EvaluationError(f"Claude CLI를 찾을 수 없습니다: {self.command}")
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise EvaluationTimeout(f"평가 처리 시간이 초과되었습니다. ({self.timeout:.0f}초)")
+        except asyncio.CancelledError:
+            # 요청이 취소되면 CLI 프로세스도 종료 (고아 프로세스 방지)
+            process.kill()
+            await process.wait()
+            raise
+        
+        if process.returncode != 0:
+            message = stderr.decode("utf-8", errors="replace").strip()
+            raise EvaluationError(f"Claude CLI 실행 실패: {message}")
+        return stdout.decode("utf-8", errors="replace").strip()
+    
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        stream-json 출력 모드로 실행해 텍스트 조각(text_delta)을 받는 대로 반환
+        
+        --include-partial-messages를 모르는 CLI 버전이면 옵션 없이 다시 실행해 완성된 assistant 메시지의 텍스트를
+        한 번에 반환한다 (이후 요청은 처음부터 옵션 없이 실행).
+        """
+        if self.partial_messages:
+            try:
+                async with aclosing(self._stream(prompt, partial_messages=True)) as texts:
+                    async for text in texts:
+                        yield text
+                return
+            except _UnsupportedOption:
+                logger.warning("Claude CLI가 --include-partial-messages를 지원하지 않아 완성된 메시지 단위로 받습니다")
+                self.partial_messages = False
+        
+        async with aclosing(self._stream(prompt, partial_messages=False)) as texts:
+            async for text in texts:
+                yield text
+    
+    async def _stream(self, prompt: str, partial_messages: bool) -> AsyncIterator[str]:
+        """CLI를 stream-json 출력 모드로 한 번 실행"""
+        options = ["--output-format", "stream-json", "--verbose"]
+        if partial_messages:
+            options.append("--include-partial-messages")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.command, "-p", prompt, *options,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=_STREAM_LINE_LIMIT
+            )
+        except FileNotFoundError:
+            raise EvaluationError(f"Claude CLI를 찾을 수 없습니다: {self.command}")
+        
+        # stderr는 따로 계속 읽음 (출력이 많은 CLI가 stderr 파이프를 채워 멈추지 않도록)
+        stderr_task = asyncio.create_task(process.stderr.read())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        streamed = False  # 부분 메시지 조각을 받았으면 완성된 메시지는 건너뜀
+        produced = False  # 텍스트를 하나라도 내보냈으면 다시 실행하지 않음
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    raise EvaluationTimeout(f"평가 처리 시간이 초과되었습니다. ({self.timeout:.0f}초)")
+                if not line:
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                
+                event_type = event.get("type")
+                if event_type == "stream_event":
+                    delta = event.get("event", {}).get("delta", {})
+                    if delta.get("type") == "text_delta" and delta.get("text"):
+                        streamed = produced = True
+                        yield delta["text"]
+                elif event_type == "assistant" and not streamed:
+                    for block in event.get("message", {}).get("content", []):
+                        if block.get("type") == "text" and block.get("text"):
+                            produced = True
+                            yield block["text"]
+                elif event_type == "result" and event.get("is_error"):
+                    raise EvaluationError(f"Claude CLI 실행 실패: {event.get('result')}")
+            
+            await process.wait()
+            if process.returncode != 0:
+                message = (await stderr_task).decode("utf-8", errors="replace").strip()
+                if partial_messages and not produced and "--include-partial-messages" in message:
+                    raise _UnsupportedOption(message)
+                raise EvaluationError(f"Claude CLI 실행 실패: {message}")
+        finally:
+            # 시간 초과, 오류, 스트림이 닫히면 CLI 프로세스 종료 (고아 프로세스 방지)
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr_task.cancel()
+            await asyncio.gather(stderr_task, return_exceptions=True)
+
+
+class _UnsupportedOption(EvaluationError):
+    """CLI가 모르는 옵션으로 실행에 실패 (옵션 없이 다시 실행)"""
+
+
+class FakeEvaluator(Evaluator):
+    """
+    오프라인 테스트용 평가기
+    
+    프롬프트 해시로 점수를 정해 같은 프롬프트에는 항상 같은 JSON을 반환한다.
+    """
+    
+    name = "fake"
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+    
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._respond(prompt)
+    
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """응답을 32자씩 나눠 delay에 걸쳐 반환"""
+        self.calls += 1
+        output = self._respond(prompt)
+        pieces = [output[i:i + 32] for i in range(0, len(output), 32)]
+        for piece in pieces:
+            if self.delay:
+                await asyncio.sleep(self.delay / len(pieces))
+            yield piece
+    
+    def _respond(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        scores = {
+            criterion: {"점수": 1 + digest[i] % 10, "이유": f"{criterion} 테스트 평가"}
+            for i, criterion in enumerate(SCORE_CRITERIA)
+        }
+        average = round(sum(score["점수"] for score in scores.values()) / len(scores), 1)
+        evaluation = {
+            "총평": "테스트 평가기 결과입니다.",
+            "점수": scores,
+            "평균_점수": average,
+            "강점": ["테스트 강점"],
+            "개선점": ["테스트 개선점"],
+            "추천_액션": "테스트 추천 액션"
+        }
+        if "구간 내용:" in prompt:
+            evaluation["요약"] = "테스트 구간 요약"
+        return "```json\n" + json.dumps(evaluation, ensure_ascii=False, indent=2) + "\n```"
+
+
+def create_evaluator(backend: str = EVALUATION_BACKEND) -> Evaluator:
+    """EVALUATION_BACKEND 설정에 맞는 평가기 생성 ("claude" 또는 "fake")"""
+    if backend == "fake":
+        return FakeEvaluator()
+    if backend != "claude":
+        logger.warning(f"알 수 없는 평가기: {backend} - Claude CLI 사용")
+    return ClaudeCliEvaluator()
+
+
+class _EventBroadcast:
+    """
+    진행 중인 스트리밍 평가의 이벤트를 여러 구독자에게 전달
+    
+    이벤트를 모두 보관하므로 늦게 구독해도 처음부터 받는다.
+    구독자가 떠나도 평가(발행)는 영향을 받지 않는다.
+    """
+    
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+    
+    def publish(self, event: Dict[str, Any]):
+        self.events.append(event)
+        self._notify()
+    
+    def close(self):
+        self.closed = True
+        self._notify()
+    
+    def _notify(self):
+        # 기다리는 구독자를 모두 깨우고 다음 변경을 위해 새 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        position = 0
+        while True:
+            while position < len(self.events):
+                yield self.events[position]
+                position += 1
+            if self.closed:
+                return
+            await self._changed.wait()
+
+
+class EvaluationService:
+    """
+    콘텐츠 평가 서비스
+    
+    - 평가기 호출은 동시에 max_concurrency개까지만 실행 (Claude CLI 프로세스 수 제한)
+    - 결과는 값 캐시("evaluation" 계층)에 저장해 같은 콘텐츠는 다시 평가하지 않음
+    - 같은 평가가 진행 중이면 새로 실행하지 않고 그 결과를 함께 기다림
+    """
+    
+    def __init__(self, evaluator: Optional[Evaluator] = None, max_concurrency: int = MAX_CONCURRENT_EVALUATIONS,
+                 use_cache: bool = True):
+        self.evaluator = evaluator or create_evaluator()
+        self.max_concurrency = max(1, max_concurrency)
+        self.use_cache = use_cache
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._broadcasts: Dict[str, _EventBroadcast] = {}  # 스트리밍으로 진행 중인 평가의 이벤트
+        self.active = 0
+        self.stats = {"evaluations": 0, "cache_hits": 0, "coalesced": 0, "failures": 0}
+    
+    async def evaluate(self, content: str, title: Optional[str] = None, category: Optional[str] = None,
+                       evaluation_type: Optional[str] = "comprehensive") -> Dict[str, Any]:
+        """
+        콘텐츠 평가
+        
+        Args:
+            content: 평가할 콘텐츠
+            title: 제목
+            category: 카테고리
+            evaluation_type: "simple" 또는 "comprehensive"
+        
+        Returns:
+            {"evaluation", "result", "from_cache", "coalesced", "evaluation_time"}
+        
+        Raises:
+            EvaluationError: 평가 실패 (EvaluationTimeout: 시간 초과)
+        """
+        key = evaluation_cache_key(evaluation_type, content, title, category)
+        return await self._evaluate_prompt(key, lambda: build_prompt(content, title, category, evaluation_type),
+                                           evaluation_type)
+    
+    async def evaluate_long(self, content: str, title: Optional[str] = None, category: Optional[str] = None,
+                            segments: Optional[Iterable[Segment]] = None) -> Dict[str, Any]:
+        """
+        긴 콘텐츠 평가 (map-reduce)
+        
+        구간으로 나눠 동시에 평가한 뒤 평가기를 한 번 더 호출해 하나의 종합 평가로 합친다.
+        구간 평가는 각각 캐시되므로 같은 스크립트를 다시 평가하면 합치기만 (또는 그것도 캐시에서) 처리한다.
+        
+        Args:
+            content: 평가할 콘텐츠
+            title: 제목
+            category: 카테고리
+            segments: 스크립트 세그먼트 (있으면 세그먼트 경계에서 나눔)
+        
+        Returns:
+            evaluate()의 결과 + "chunks" (구간별 시작/끝, 글자 수, 평균 점수, 요약)
+        
+        Raises:
+            EvaluationError: 구간 또는 합치기 평가 실패
+        """
+        chunks = self._split(content, segments)
+        if len(chunks) <= 1:
+            return await self.evaluate(content, title, category, "comprehensive")
+        
+        start_time = time.time()
+        chunk_results = await asyncio.gather(*self._chunk_evaluations(chunks, title, category))
+        map_time = time.time() - start_time
+        
+        reduce_prompt = build_reduce_prompt(chunks, [result["evaluation"] for result in chunk_results], title, category)
+        reduced = await self._evaluate_prompt(evaluation_cache_key("reduce", reduce_prompt), lambda: reduce_prompt,
+                                              "comprehensive")
+        
+        logger.info(
+            f"긴 콘텐츠 평가: {len(content)}자, {len(chunks)}개 구간 "
+            f"(구간 평가 {map_time:.1f}초, 전체 {time.time() - start_time:.1f}초)"
+        )
+        return {
+            **reduced,
+            "from_cache": reduced["from_cache"] and all(result["from_cache"] for result in chunk_results),
+            "chunks": [_chunk_summary(chunk, result) for chunk, result in zip(chunks, chunk_results)]
+        }
+    
+    async def evaluate_stream(self, content: str, title: Optional[str] = None, category: Optional[str] = None,
+                              evaluation_type: Optional[str] = "comprehensive") -> AsyncIterator[Dict[str, Any]]:
+        """
+        콘텐츠 평가 (스트리밍)
+        
+        평가기 응답을 받는 대로 이벤트로 반환한다.
+        - {"event": "delta", "text"}: 응답 텍스트 조각
+        - {"event": "field", "name", "value"}: 완성된 최상위 JSON 필드
+        - {"event": "done", "evaluation", "result", "from_cache", "coalesced", "missing_fields", ...}: 검증된 최종 결과
+        
+        캐시된 결과나 진행 중인 같은 평가의 결과는 완성된 응답을 한 번에 같은 이벤트 형식으로 반환한다.
+        
+        Raises:
+            EvaluationError: 평가 실패 (EvaluationTimeout: 시간 초과)
+        """
+        key = evaluation_cache_key(evaluation_type, content, title, category)
+        make_prompt = lambda: build_prompt(content, title, category, evaluation_type)  # noqa: E731
+        async with aclosing(self._stream_prompt(key, make_prompt, evaluation_type)) as events:
+            async for event in events:
+                yield event
+    
+    async def evaluate_long_stream(self, content: str, title: Optional[str] = None, category: Optional[str] = None,
+                                   segments: Optional[Iterable[Segment]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        긴 콘텐츠 평가 (스트리밍, map-reduce)
+        
+        구간 평가가 끝나는 대로 {"event": "chunk", "index", "total", ...} 이벤트를 반환하고,
+        합치기 평가는 evaluate_stream()과 같은 이벤트로 스트리밍한다 ("done"에 "chunks" 포함).
+        """
+        chunks = self._split(content, segments)
+        if len(chunks) <= 1:
+            async with aclosing(self.evaluate_stream(content, title, category, "comprehensive")) as events:
+                async for event in events:
+                    yield event
+            return
+        
+        tasks = [asyncio.ensure_future(evaluation) for evaluation in self._chunk_evaluations(chunks, title, category)]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=tasks.index):
+                    index = tasks.index(task)
+                    yield {"event": "chunk", "index": index, "total": len(chunks), **_chunk_summary(chunks[index], task.result())}
+        finally:
+            # 클라이언트가 연결을 끊어도 구간 평가 자체는 계속되어 캐시에 남음 (기다리기만 중단)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        chunk_results = [task.result() for task in tasks]
+        reduce_prompt = build_reduce_prompt(chunks, [result["evaluation"] for result in chunk_results], title, category)
+        reduce_key = evaluation_cache_key("reduce", reduce_prompt)
+        async with aclosing(self._stream_prompt(reduce_key, lambda: reduce_prompt, "comprehensive")) as events:
+            async for event in events:
+                if event["event"] == "done":
+                    event["from_cache"] = event["from_cache"] and all(result["from_cache"] for result in chunk_results)
+                    event["chunks"] = [_chunk_summary(chunk, result) for chunk, result in zip(chunks, chunk_results)]
+                yield event
+    
+    async def evaluate_batch(self, items: List[Dict[str, Any]],
+                             workers: int = EVALUATION_BATCH_WORKERS) -> AsyncIterator[Dict[str, Any]]:
+        """
+        여러 콘텐츠 평가 (완료되는 대로 반환)
+        
+        - "error"가 있는 항목(요청 검증 실패)은 평가하지 않고 바로 실패로 반환
+        - 같은 평가(캐시 키가 같은 항목)는 한 번만 실행해 결과를 모든 항목에 전달
+        - 캐시된 항목은 평가기를 기다리지 않고 먼저 반환
+        - 나머지는 긴 콘텐츠부터 workers개의 작업자가 나눠 평가 (전체 완료 시간 단축)
+          CLI 프로세스 수는 서비스 전체의 동시 실행 제한을 그대로 따름
+        
+        Args:
+            items: {"content", "title", "category", "evaluation_type", "long_content", "error"} 목록
+            workers: 이 요청에서 동시에 진행할 평가 수
+        
+        Returns:
+            항목별 {"type": "item", "index", "success", "evaluation", "error", "from_cache",
+            "deduplicated", "latency", "completed_at", ...} 을 완료 순서대로,
+            마지막에 {"type": "summary", "items", "succeeded", "failed", "throughput", "latency", ...}
+        """
+        start_time = time.time()
+        groups: Dict[str, List[int]] = {}
+        invalid: List[int] = []
+        for index, item in enumerate(items):
+            if item.get("error"):
+                invalid.append(index)
+                continue
+            key = evaluation_cache_key(
+                ("long:" if item.get("long_content") else "") + (item.get("evaluation_type") or "comprehensive"),
+                item["content"], item.get("title"), item.get("category")
+            )
+            groups.setdefault(key, []).append(index)
+        
+        latencies: List[float] = []
+        counts = {"succeeded": 0, "failed": 0, "cache_hits": 0, "deduplicated": 0}
+        
+        def item_events(key: str, outcome: Optional[Dict[str, Any]], error: Optional[Exception],
+                        latency: float) -> Iterable[Dict[str, Any]]:
+            finished_at = time.time() - start_time
+            for position, index in enumerate(groups[key]):
+                event = {
+                    "type": "item",
+                    "index": index,
+                    "success": error is None,
+                    "evaluation": outcome["evaluation"] if outcome else None,
+                    "result": outcome["result"] if outcome else None,
+                    "error": str(error) if error else None,
+                    "timeout": isinstance(error, EvaluationTimeout),
+                    "from_cache": bool(outcome and outcome["from_cache"]),
+                    "deduplicated": position > 0,
+                    "latency": latency,
+                    "completed_at": finished_at
+                }
+                if outcome and outcome.get("chunks"):
+                    event["chunks"] = outcome["chunks"]
+                counts["succeeded" if error is None else "failed"] += 1
+                counts["cache_hits"] += int(event["from_cache"])
+                counts["deduplicated"] += int(position > 0)
+                yield event
+        
+        for index in invalid:
+            counts["failed"] += 1
+            yield {
+                "type": "item",
+                "index": index,
+                "success": False,
+                "evaluation": None,
+                "result": None,
+                "error": items[index]["error"],
+                "timeout": False,
+                "from_cache": False,
+                "deduplicated": False,
+                "latency": 0.0,
+                "completed_at": time.time() - start_time
+            }
+        
+        # 캐시 적중 항목 먼저 반환 (긴 콘텐츠는 구간별로 캐시되므로 작업자에서 처리)
+        pending: List[str] = []
+        for key, indexes in groups.items():
+            item = items[indexes[0]]
+            cached = None
+            if self.use_cache and not item.get("long_content"):
+                lookup_start = time.time()
+                cached = await asyncio.to_thread(cache_manager.get_value, EVALUATION_CACHE_TIER, key)
+            if cached is None:
+                pending.append(key)
+                continue
+            self.stats["cache_hits"] += 1
+            latency = time.time() - lookup_start
+            latencies.append(latency)
+            for event in item_events(key, {**cached, "from_cache": True}, None, latency):
+                yield event
+        
+        # 긴 콘텐츠부터 처리 (작업자 사이의 완료 시간 편차 감소)
+        pending.sort(key=lambda key: len(items[groups[key][0]]["content"]), reverse=True)
+        queue: asyncio.Queue = asyncio.Queue()
+        for key in pending:
+            queue.put_nowait(key)
+        completed: asyncio.Queue = asyncio.Queue()
+        
+        async def worker():
+            while not queue.empty():
+                key = queue.get_nowait()
+                item = items[groups[key][0]]
+                item_start = time.time()
+                outcome, error = None, None
+                try:
+                    if item.get("long_content"):
+                        outcome = await self.evaluate_long(item["content"], item.get("title"), item.get("category"))
+                    else:
+                        outcome = await self.evaluate(
+                            item["content"], item.get("title"), item.get("category"), item.get("evaluation_type")
+                        )
+                except Exception as e:
+                    error = e
+                completed.put_nowait((key, outcome, error, time.time() - item_start))
+        
+        tasks = [asyncio.create_task(worker()) for _ in range(min(max(1, workers), len(pending)))]
+        try:
+            for _ in range(len(pending)):
+                key, outcome, error, latency = await completed.get()
+                latencies.append(latency)
+                for event in item_events(key, outcome, error, latency):
+                    yield event
+        finally:
+            # 연결이 끊기면 남은 항목은 시작하지 않음 (진행 중인 평가는 캐시에 남도록 계속됨)
+            for task in tasks:
+                task.cancel()
+        
+        elapsed = time.time() - start_time
+        latencies.sort()
+        yield {
+            "type": "summary",
+            "items": len(items),
+            "unique_items": len(groups),
+            **counts,
+            "evaluated": len(pending),
+            "workers": len(tasks),
+            "elapsed": elapsed,
+            "throughput": len(items) / elapsed if elapsed > 0 else None,
+            "latency": {
+                "mean": sum(latencies) / len(latencies) if latencies else None,
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "max": latencies[-1] if latencies else None
+            }
+        }
+    
+    def _split(self, content: str, segments: Optional[Iterable[Segment]]) -> List[ContentChunk]:
+        """
+        긴 콘텐츠를 구간으로 나누기 (구간 수는 동시 실행 수 이하)
+        
+        구간이 동시 실행 수보다 많으면 구간 평가가 여러 차례로 나뉘어 응답 시간이 길이에 비례하므로,
+        구간 길이를 늘려서라도 한 차례에 모두 평가되도록 한다.
+        """
+        return split_content(content, segments, max_chunks=min(EVALUATION_MAX_CHUNKS, self.max_concurrency))
+    
+    def _chunk_evaluations(self, chunks: List[ContentChunk], title: Optional[str], category: Optional[str]) -> List[Any]:
+        """
+        구간별 평가 코루틴 (구간 평가도 캐시 / 진행 중인 같은 평가 합치기 적용)
+        
+        프롬프트에 구간 위치와 시간이 들어가므로 캐시 키도 프롬프트로 만든다 (내용이 같은 구간도 따로 평가).
+        """
+        prompts = [build_chunk_prompt(chunk, index, len(chunks), title, category) for index, chunk in enumerate(chunks)]
+        return [
+            self._evaluate_prompt(evaluation_cache_key("chunk", prompt), lambda prompt=prompt: prompt, "comprehensive")
+            for prompt in prompts
+        ]
+    
+    async def _stream_prompt(self, key: str, make_prompt: Callable[[], str],
+                             evaluation_type: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """캐시 조회 -> 진행 중인 같은 평가 합치기 -> 평가기 스트리밍 실행"""
+        if self.use_cache:
+            cached = await asyncio.to_thread(cache_manager.get_value, EVALUATION_CACHE_TIER, key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                for event in _replay_events(cached, evaluation_type, from_cache=True, coalesced=False):
+                    yield event
+                return
+        
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.stats["coalesced"] += 1
+            broadcast = self._broadcasts.get(key)
+            if broadcast is None:
+                # 스트리밍이 아닌 같은 평가가 진행 중이면 끝난 결과를 같은 이벤트 순서로 전달
+                result = await asyncio.shield(task)
+                for event in _replay_events(result, evaluation_type, from_cache=False, coalesced=True):
+                    yield event
+                return
+        else:
+            broadcast = _EventBroadcast()
+            task = asyncio.create_task(self._run_stream(key, make_prompt(), evaluation_type, broadcast))
+            task.add_done_callback(self._finish_task)
+            self._inflight[key] = task
+            self._broadcasts[key] = broadcast
+        
+        # 연결이 끊겨 이 제너레이터가 닫혀도 구독만 끝나고 평가는 계속 진행 (같은 평가를 기다리는 요청, 캐시를 위해)
+        async with aclosing(broadcast.subscribe()) as events:
+            async for event in events:
+                yield event
+        result = await asyncio.shield(task)
+        missing = validate_evaluation(result["evaluation"], evaluation_type)
+        yield {"event": "done", **result, "from_cache": False, "coalesced": coalesced, "missing_fields": missing}
+    
+    async def _evaluate_prompt(self, key: str, make_prompt: Callable[[], str],
+                               evaluation_type: Optional[str]) -> Dict[str, Any]:
+        """캐시 조회 -> 진행 중인 같은 평가 합치기 -> 평가기 실행 (프롬프트는 실행할 때만 생성)"""
+        if self.use_cache:
+            cached = await asyncio.to_thread(cache_manager.get_value, EVALUATION_CACHE_TIER, key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return {**cached, "from_cache": True, "coalesced": False}
+        
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.create_task(self._run(key, make_prompt(), evaluation_type))
+            task.add_done_callback(self._finish_task)
+            self._inflight[key] = task
+        
+        # 한 요청이 취소돼도 같은 평가를 기다리는 다른 요청을 위해 평가는 계속 진행
+        result = await asyncio.shield(task)
+        return {**result, "from_cache": False, "coalesced": coalesced}
+    
+    async def _run(self, key: str, prompt: str, evaluation_type: Optional[str]) -> Dict[str, Any]:
+        """평가기 실행 (동시 실행 제한) 후 결과 캐시"""
+        async with self._semaphore:
+            self.active += 1
+            start_time = time.time()
+            try:
+                output = await self.evaluator.complete(prompt)
+            finally:
+                self.active -= 1
+        
+        result = {
+            "evaluation": extract_json(output),
+            "result": output,
+            "evaluation_time": time.time() - start_time
+        }
+        await self._store(key, result, evaluation_type)
+        return result
+    
+    async def _run_stream(self, key: str, prompt: str, evaluation_type: Optional[str],
+                          broadcast: "_EventBroadcast") -> Dict[str, Any]:
+        """평가기 스트리밍 실행 (동시 실행 제한) - 조각과 완성된 필드를 구독자에게 전달하고 결과 캐시"""
+        try:
+            async with self._semaphore:
+                self.active += 1
+                start_time = time.time()
+                parser = JsonFieldParser()
+                parts: List[str] = []
+                try:
+                    async with aclosing(self.evaluator.stream(prompt)) as texts:
+                        async for text in texts:
+                            parts.append(text)
+                            broadcast.publish({"event": "delta", "text": text})
+                            for name, value in parser.feed(text):
+                                broadcast.publish({"event": "field", "name": name, "value": value})
+                finally:
+                    self.active -= 1
+            
+            output = "".join(parts).strip()
+            result = {
+                "evaluation": extract_json(output),
+                "result": output,
+                "evaluation_time": time.time() - start_time
+            }
+            await self._store(key, result, evaluation_type)
+            return result
+        finally:
+            broadcast.close()
+    
+    async def _store(self, key: str, result: Dict[str, Any], evaluation_type: Optional[str]):
+        """평가 결과 캐시 (형식에 맞지 않는 응답은 다음 요청에서 다시 평가하도록 캐시하지 않음)"""
+        self.stats["evaluations"] += 1
+        missing = validate_evaluation(result["evaluation"], evaluation_type)
+        if missing:
+            logger.warning(f"평가 응답에 빠진 필드: {', '.join(missing)}")
+        elif self.use_cache:
+            await asyncio.to_thread(cache_manager.put_value, EVALUATION_CACHE_TIER, key, result, result["evaluation_time"])
+    
+    def _finish_task(self, task: asyncio.Task):
+        """진행 중 목록에서 제거 (기다리는 요청이 모두 취소된 경우에도 예외를 소비해 경고 방지)"""
+        for key, inflight in list(self._inflight.items()):
+            if inflight is task:
+                del self._inflight[key]
+                self._broadcasts.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failures"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """평가 서비스 상태"""
+        return {
+            "evaluator": self.evaluator.name,
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "inflight": len(self._inflight),
+            **self.stats
+        }
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """정렬된 값의 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def _chunk_summary(chunk: ContentChunk, result: Dict[str, Any]) -> Dict[str, Any]:
+    """구간 평가 요약 (응답의 chunks 항목)"""
+    return {
+        "start": chunk.start,
+        "end": chunk.end,
+        "characters": len(chunk.text),
+        "평균_점수": result["evaluation"].get("평균_점수"),
+        "요약": result["evaluation"].get("요약"),
+        "from_cache": result["from_cache"]
+    }
+
+
+def _replay_events(result: Dict[str, Any], evaluation_type: Optional[str],
+                   from_cache: bool, coalesced: bool) -> Iterable[Dict[str, Any]]:
+    """완성된 평가 결과를 스트리밍과 같은 이벤트 순서로 반환 (캐시 적중, 진행 중인 평가 공유)"""
+    yield {"event": "delta", "text": result["result"]}
+    for name, value in result["evaluation"].items():
+        yield {"event": "field", "name": name, "value": value}
+    yield {
+        "event": "done",
+        **result,
+        "from_cache": from_cache,
+        "coalesced": coalesced,
+        "missing_fields": validate_evaluation(result["evaluation"], evaluation_type)
+    }
+
+
+# 전역 평가 서비스 인스턴스
+evaluation_service = EvaluationService()
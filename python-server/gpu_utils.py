@@ -3,11 +3,18 @@ GPU 감지 및 설정 유틸리티
 Apple Silicon Mac에서 최적화된 Whisper 성능을 위한 설정
 """
 
+import time
 import logging
 import platform
+import threading
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# 디바이스 확인 결과 캐시 (torch import와 MPS 텐서 테스트는 서버 시작 시 한 번만 수행)
+_device_info_cache: Optional[dict] = None
+_device_info_lock = threading.Lock()
+
 def is_apple_silicon() -> bool:
     """Apple Silicon Mac인지 확인"""
     return platform.processor() == 'arm' and platform.system() == 'Darwin'
@@ -146,9 +153,27 @@ def get_safe_device() -> str:
     
     return device
 
-def get_device_info() -> dict:
+def get_device_info(refresh: bool = False) -> dict:
+    """
+    현재 디바이스 정보를 반환 (처음 한 번 확인한 결과를 캐시)
+    
+    Args:
+        refresh: True이면 캐시를 무시하고 다시 확인 (GET /health/diagnostics?refresh=true)
+    """
+    global _device_info_cache
+    with _device_info_lock:
+        if _device_info_cache is None or refresh:
+            _device_info_cache = _probe_device_info()
+        return dict(_device_info_cache)
+
+def get_cached_device_info() -> Optional[dict]:
+    """캐시된 디바이스 정보 (아직 확인 전이면 None, 확인 작업을 하지 않음)"""
+    cached = _device_info_cache
+    return dict(cached) if cached is not None else None
+
+def _probe_device_info() -> dict:
     """
-    현재 디바이스 정보를 반환
+    디바이스 확인 (torch import, MPS 안정성 테스트 포함)
     """
     # Simplified device detection for whisper.cpp Metal
     info = {
@@ -181,6 +206,7 @@ def get_device_info() -> dict:
         # torch not available, use simplified detection
         pass
     
+    info["probed_at"] = time.time()
     return info
 
 def log_device_info():
@@ -0,0 +1,331 @@
+"""
+스크립트 키워드 추출 모듈
+스크립트가 추가될 때마다 말뭉치 통계(단어별 문서 빈도, 정규화 단어 빈도 합)를 갱신하고
+스크립트별/말뭉치 전체 TF-IDF 상위 키워드를 numpy 벡터 연산으로 계산
+"""
+
+import re
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from constants import KEYWORD_INDEX_FILE, KEYWORD_MIN_DOCUMENT_FREQUENCY
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[A-Za-z][A-Za-z0-9+#'-]*")
+
+# 명사 뒤에 붙는 조사 (긴 것부터 제거)
+_KOREAN_PARTICLES = sorted([
+    "은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "와", "과", "만", "랑", "나",
+    "으로", "에서", "에게", "한테", "까지", "부터", "보다", "처럼", "이나", "이랑", "하고",
+    "에서는", "에서도", "으로는", "으로도", "에게는", "까지는", "부터는", "이라고", "라고", "이라는", "라는"
+], key=len, reverse=True)
+
+# 용언 어미 (키워드가 아닌 서술어로 보고 제외)
+_KOREAN_VERB_ENDINGS = (
+    "습니다", "니다", "어요", "아요", "해요", "세요", "에요", "예요", "네요", "거든요", "잖아요",
+    "는데", "지만", "니까", "면서", "했다", "한다", "된다", "있다", "없다", "이다", "하는", "했던", "하게", "해서"
+)
+
+_STOPWORDS = {
+    # 한국어
+    "그리고", "그래서", "그런데", "하지만", "그러면", "그러니까", "그냥", "진짜", "정말", "너무", "이제", "지금",
+    "여기", "거기", "저기", "이거", "그거", "저거", "이것", "그것", "저것", "우리", "저희", "여러분", "오늘",
+    "어떤", "이런", "그런", "저런", "하나", "이렇게", "그렇게", "저렇게", "좀", "또", "막", "뭐", "왜", "어떻게",
+    "때문", "정도", "경우", "생각", "사람", "부분", "다음", "같은", "많이", "조금", "다시", "바로", "먼저",
+    "안녕하세요", "감사합니다", "구독", "좋아요", "알림", "영상", "채널",
+    # 영어
+    "the", "and", "that", "this", "with", "for", "you", "are", "was", "have", "not", "but", "they", "what",
+    "all", "can", "just", "like", "about", "your", "from", "there", "will", "would", "one", "its", "it's"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    키워드 후보 단어 목록 (형태소 분석기 없이 규칙 기반)
+    
+    한글은 끝의 조사를 떼고 2글자 이상 명사형만, 영어는 소문자로 3글자 이상만 남기며
+    용언(…습니다, …했다)과 불용어는 제외한다.
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        if token[0] <= "z":
+            token = token.lower().strip("'-")
+            if len(token) >= 3 and token not in _STOPWORDS:
+                tokens.append(token)
+            continue
+        if token.endswith(_KOREAN_VERB_ENDINGS):
+            continue
+        for particle in _KOREAN_PARTICLES:
+            if token.endswith(particle) and len(token) - len(particle) >= 2:
+                token = token[:-len(particle)]
+                break
+        if len(token) >= 2 and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _chunks(items: List[Any], size: int = 500) -> Iterable[List[Any]]:
+    """SQL 파라미터 수 제한을 넘지 않도록 나누기"""
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class KeywordExtractor:
+    def __init__(self, index_file: str = KEYWORD_INDEX_FILE):
+        self.index_file = Path(index_file)
+        
+        # 스레드별 SQLite 연결
+        self._local = threading.local()
+        
+        # 테이블 준비 상태 (처음 사용할 때 생성)
+        self._ready = False
+        self._init_lock = threading.Lock()
+        
+        # 말뭉치 상위 키워드 계산 결과 (말뭉치가 바뀌지 않았으면 재사용)
+        self._corpus_cache: Optional[Tuple[int, int, Dict[str, Any]]] = None
+        self._corpus_lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 반환 (WAL 모드, 처음 사용 시 테이블 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._init_tables(conn)
+                    self._ready = True
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    def _init_tables(self, conn: sqlite3.Connection):
+        """테이블 생성"""
+        # 단어별 문서 빈도(df)와 문서별 정규화 빈도(단어 수 / 문서 길이)의 합 - 말뭉치 TF-IDF 합 = tf_sum * idf
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS terms (
+                term_id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL UNIQUE,
+                df INTEGER NOT NULL DEFAULT 0,
+                tf_sum REAL NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_terms_df ON terms(df)")
+        # 문서별 단어 빈도 희소 벡터 (term_id 배열과 빈도 배열을 int32 바이트로 저장)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                transcript_id TEXT PRIMARY KEY,
+                term_ids BLOB NOT NULL,
+                counts BLOB NOT NULL,
+                length INTEGER NOT NULL,
+                added_at REAL NOT NULL
+            )
+        """)
+        # 문서 수와 변경 세대 (워커 간 말뭉치 계산 결과 재사용 판단)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO stats (name, value) VALUES ('documents', 0), ('generation', 0)")
+    
+    def _get_stats(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        """(문서 수, 변경 세대)"""
+        stats = {row['name']: row['value'] for row in conn.execute("SELECT name, value FROM stats")}
+        return stats.get('documents', 0), stats.get('generation', 0)
+    
+    def contains(self, transcript_id: str) -> bool:
+        """말뭉치에 있는 스크립트인지 확인"""
+        row = self._connect().execute("SELECT 1 FROM documents WHERE transcript_id = ?", (transcript_id,)).fetchone()
+        return row is not None
+    
+    def _subtract_document(self, conn: sqlite3.Connection, document: sqlite3.Row):
+        """문서가 단어 통계에 더한 기여분 제거 (교체/삭제 시)"""
+        ids = np.frombuffer(document['term_ids'], dtype=np.int32)
+        tf = np.frombuffer(document['counts'], dtype=np.int32) / max(document['length'], 1)
+        conn.executemany(
+            "UPDATE terms SET df = df - 1, tf_sum = MAX(tf_sum - ?, 0) WHERE term_id = ?",
+            zip(tf.tolist(), ids.tolist())
+        )
+    
+    def add_document(self, transcript_id: str, text: str):
+        """
+        스크립트를 말뭉치에 추가 (같은 ID가 있으면 교체)
+        
+        문서의 단어에 해당하는 통계만 갱신하므로 말뭉치 크기와 관계없이 문서 길이에 비례하는 시간이 걸린다.
+        
+        Args:
+            transcript_id: 스크립트 ID
+            text: 스크립트 본문
+        """
+        counter = Counter(tokenize(text))
+        length = sum(counter.values())
+        terms = list(counter)
+        
+        with self._transaction() as conn:
+            old = conn.execute("SELECT term_ids, counts, length FROM documents WHERE transcript_id = ?", (transcript_id,)).fetchone()
+            if old is not None:
+                self._subtract_document(conn, old)
+            else:
+                conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'documents'")
+            
+            conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((term,) for term in terms))
+            term_ids = {}
+            for chunk in _chunks(terms):
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(f"SELECT term_id, term FROM terms WHERE term IN ({placeholders})", chunk):
+                    term_ids[row['term']] = row['term_id']
+            
+            ids = np.array([term_ids[term] for term in terms], dtype=np.int32)
+            counts = np.array([counter[term] for term in terms], dtype=np.int32)
+            order = np.argsort(ids)
+            ids, counts = ids[order], counts[order]
+            tf = counts / max(length, 1)
+            conn.executemany(
+                "UPDATE terms SET df = df + 1, tf_sum = tf_sum + ? WHERE term_id = ?",
+                zip(tf.tolist(), ids.tolist())
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (transcript_id, term_ids, counts, length, added_at) VALUES (?, ?, ?, ?, ?)",
+                (transcript_id, ids.tobytes(), counts.tobytes(), length, time.time())
+            )
+            conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'generation'")
+        logger.info(f"키워드 통계 갱신: {transcript_id} (단어 {length}개, 고유 {len(terms)}개)")
+    
+    def remove_document(self, transcript_id: str) -> bool:
+        """스크립트를 말뭉치에서 제거"""
+        with self._transaction() as conn:
+            old = conn.execute("SELECT term_ids, counts, length FROM documents WHERE transcript_id = ?", (transcript_id,)).fetchone()
+            if old is None:
+                return False
+            self._subtract_document(conn, old)
+            conn.execute("DELETE FROM documents WHERE transcript_id = ?", (transcript_id,))
+            conn.execute("UPDATE stats SET value = value - 1 WHERE name = 'documents'")
+            conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'generation'")
+        return True
+    
+    @staticmethod
+    def _idf(df: np.ndarray, documents: int) -> np.ndarray:
+        """평활화한 역문서 빈도 (모든 문서에 나오는 단어도 0이 되지 않음)"""
+        return np.log((1 + documents) / (1 + df)) + 1
+    
+    def document_keywords(self, transcript_id: str, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        스크립트의 TF-IDF 상위 키워드
+        
+        Args:
+            transcript_id: 스크립트 ID
+            limit: 최대 키워드 수
+        
+        Returns:
+            [{"keyword", "score", "count", "document_frequency"}] (점수 높은 순) 또는 None (말뭉치에 없음)
+        """
+        conn = self._connect()
+        doc = conn.execute("SELECT term_ids, counts, length FROM documents WHERE transcript_id = ?", (transcript_id,)).fetchone()
+        if doc is None:
+            return None
+        documents, _ = self._get_stats(conn)
+        ids = np.frombuffer(doc['term_ids'], dtype=np.int32)
+        counts = np.frombuffer(doc['counts'], dtype=np.int32)
+        
+        # 문서 단어의 df와 단어 문자열 (term_id 순으로 정렬되어 있으므로 searchsorted로 위치 매핑)
+        df = np.zeros(len(ids), dtype=np.float64)
+        terms = np.empty(len(ids), dtype=object)
+        for chunk in _chunks(ids.tolist()):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT term_id, term, df FROM terms WHERE term_id IN ({placeholders})", chunk).fetchall()
+            positions = np.searchsorted(ids, [row['term_id'] for row in rows])
+            df[positions] = [row['df'] for row in rows]
+            terms[positions] = [row['term'] for row in rows]
+        
+        scores = counts / max(doc['length'], 1) * self._idf(df, documents)
+        top = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            {
+                "keyword": terms[i],
+                "score": round(float(scores[i]), 6),
+                "count": int(counts[i]),
+                "document_frequency": int(df[i])
+            }
+            for i in top
+        ]
+    
+    def corpus_keywords(self, limit: int = 50, min_document_frequency: int = KEYWORD_MIN_DOCUMENT_FREQUENCY) -> Dict[str, Any]:
+        """
+        말뭉치 전체 상위 키워드 (모든 스크립트의 TF-IDF 합 = 정규화 빈도 합 x idf)
+        
+        단어 통계 테이블만 읽어 한 번의 벡터 연산으로 계산하며, 말뭉치가 바뀌지 않았으면 이전 결과를 사용한다.
+        
+        Args:
+            limit: 최대 키워드 수
+            min_document_frequency: 이 수 이상의 스크립트에 나온 단어만 (한 영상에만 나온 단어 제외)
+        
+        Returns:
+            {"documents": 스크립트 수, "keywords": [{"keyword", "score", "document_frequency", "document_ratio"}]}
+        """
+        conn = self._connect()
+        documents, generation = self._get_stats(conn)
+        with self._corpus_lock:
+            cached = self._corpus_cache
+            if cached is None or cached[:2] != (generation, min_document_frequency):
+                rows = conn.execute(
+                    "SELECT term, df, tf_sum FROM terms WHERE df >= ?", (max(min_document_frequency, 1),)
+                ).fetchall()
+                terms = np.array([row['term'] for row in rows], dtype=object)
+                df = np.array([row['df'] for row in rows], dtype=np.float64)
+                tf_sum = np.array([row['tf_sum'] for row in rows], dtype=np.float64)
+                scores = tf_sum * self._idf(df, documents)
+                order = np.argsort(-scores, kind="stable")
+                cached = (generation, min_document_frequency, {"terms": terms[order], "df": df[order], "scores": scores[order]})
+                self._corpus_cache = cached
+        ranked = cached[2]
+        return {
+            "documents": documents,
+            "keywords": [
+                {
+                    "keyword": ranked["terms"][i],
+                    "score": round(float(ranked["scores"][i]), 6),
+                    "document_frequency": int(ranked["df"][i]),
+                    "document_ratio": round(float(ranked["df"][i]) / documents, 4) if documents else 0.0
+                }
+                for i in range(min(limit, len(ranked["terms"])))
+            ]
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """말뭉치 통계"""
+        conn = self._connect()
+        documents, generation = self._get_stats(conn)
+        vocabulary = conn.execute("SELECT COUNT(*) FROM terms WHERE df > 0").fetchone()[0]
+        return {"documents": documents, "vocabulary": vocabulary, "generation": generation}
+
+
+# 전역 키워드 추출기 인스턴스
+keyword_extractor = KeywordExtractor()
@@ -13,22 +13,30 @@ from dotenv import load_dotenv
 import os
 import subprocess
 import json
+import sys
 import time
+import asyncio
+import threading
+import hashlib
+import hmac
 
 # .env.local 파일 로드 (프로젝트 루트에 있음)
 load_dotenv('../.env.local')
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
 from typing import List, Optional
-# whisper import will be done conditionally later
-import yt_dlp
+# whisper, yt_dlp, torch 등 무거운 모듈은 처음 사용할 때 또는 서버 시작 후 백그라운드에서 import
 
 from constants import (
     DEFAULT_WHISPER_MODEL,
     DEFAULT_FORMAT_WITH_SEGMENTS,
     DEFAULT_FORMAT_WITH_TIMESTAMPS,
+    DEFAULT_TRANSCRIPTION_LANGUAGE,
+    USE_CAPTIONS_WHEN_AVAILABLE,
+    ALLOW_AUTO_GENERATED_CAPTIONS,
     AUDIO_QUALITY,
     AUDIO_CODEC,
     SERVER_HOST,
@@ -36,11 +44,38 @@ from constants import (
     ALLOWED_ORIGINS,
     DEFAULT_TIMEOUT_SECONDS,
     MAX_TIMEOUT_SECONDS,
-    TIMEOUT_PER_MB_SECONDS
+    TIMEOUT_PER_MB_SECONDS,
+    CACHE_JANITOR_INTERVAL,
+    PRELOAD_WHISPER_MODELS,
+    WHISPER_MODEL_DESCRIPTIONS,
+    DOWNLOAD_MAX_ATTEMPTS,
+    DOWNLOAD_RETRY_BACKOFF_SECONDS,
+    SEARCH_MAX_RESULTS,
+    KEYWORD_MIN_DOCUMENT_FREQUENCY,
+    NEAR_DUPLICATE_THRESHOLD,
+    NEAR_DUPLICATE_PREFIX_SECONDS,
+    NEAR_DUPLICATE_SHORT_CIRCUIT,
+    NEAR_DUPLICATE_DURATION_TOLERANCE,
+    MAX_CONCURRENT_TRANSCRIPTIONS,
+    EVALUATION_LONG_CONTENT_CHARS,
+    EVALUATION_MAX_CONTENT_CHARS,
+    EVALUATION_BATCH_MAX_ITEMS,
+    EVALUATION_BATCH_WORKERS,
+    CACHE_SNAPSHOT_API_ENABLED,
+    CACHE_ADMIN_TOKEN
 )
-from gpu_utils import get_safe_device, log_device_info
-from cache_manager import cache_manager
-from naver_datalab import naver_datalab_service
+from gpu_utils import log_device_info, get_device_info, get_cached_device_info
+from cache_manager import cache_manager, format_time_range, extract_video_id
+from cache_snapshot import iter_snapshot, import_snapshot_file, import_status, is_import_running
+from caption_parser import CAPTION_PARSERS, parse_captions, select_caption_track
+from download_errors import TRANSIENT, classify_download_error
+from model_registry import model_registry
+from transcript_renderer import OUTPUT_FORMATS, render, render_to_string
+from segment_array import SegmentArray, load_segments
+from transcript_index import transcript_index
+from keyword_extractor import keyword_extractor
+from near_duplicate import near_duplicate_index
+from evaluation_service import evaluation_service, EvaluationTimeout
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -59,9 +94,6 @@ except Exception as e:
     logger.warning(f"⚠️ Whisper.cpp Metal을 사용할 수 없습니다: {e}")
     logger.info("💡 OpenAI Whisper를 사용합니다")
 
-# 서버 시작 시 디바이스 정보 출력
-log_device_info()
-
 # FastAPI 앱 생성
 app = FastAPI(
     title="YouTube 스크립트 추출 서버",
@@ -78,12 +110,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 캐시 정리 작업 (요청 처리와 분리된 백그라운드 루프)
+janitor_task: Optional[asyncio.Task] = None
+
+async def cache_janitor_loop():
+    """CACHE_JANITOR_INTERVAL마다 캐시 정리 1회 실행 (파일 I/O는 스레드에서)"""
+    while True:
+        try:
+            await asyncio.to_thread(cache_manager.run_janitor_cycle)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ 캐시 정리 실패: {e}")
+        await asyncio.sleep(CACHE_JANITOR_INTERVAL)
+
+# 서버 초기화 상태 (GET /health/ready)
+# 소켓을 먼저 열고 캐시 인덱스, yt-dlp, 디바이스 확인, 모델 로드는 백그라운드에서 수행한다
+# (초기화 중에 들어온 요청은 필요한 모듈을 직접 불러와 처리)
+server_readiness = {"ready": False, "steps": {}, "error": None}
+
+def _run_init_step(name: str, func):
+    """초기화 단계 실행 후 소요 시간 기록"""
+    step_start = time.time()
+    func()
+    server_readiness["steps"][name] = round(time.time() - step_start, 3)
+    logger.info(f"초기화 단계 완료: {name} ({server_readiness['steps'][name]:.2f}초)")
+
+def initialize_server():
+    """서버 시작 후 백그라운드 초기화 (캐시 인덱스, yt-dlp import, 디바이스 확인, 모델 미리 로드)"""
+    init_start = time.time()
+    try:
+        _run_init_step("cache", cache_manager.initialize)
+        _run_init_step("yt_dlp", lambda: __import__("yt_dlp"))
+        _run_init_step("device", log_device_info)
+        if PRELOAD_WHISPER_MODELS:
+            _run_init_step("models", lambda: preload_models(PRELOAD_WHISPER_MODELS))
+        server_readiness["ready"] = True
+        server_readiness["init_seconds"] = round(time.time() - init_start, 3)
+        logger.info(f"✅ 서버 초기화 완료 ({server_readiness['init_seconds']:.2f}초)")
+    except Exception as e:
+        server_readiness["error"] = str(e)
+        logger.error(f"❌ 서버 초기화 실패: {e}")
+        return
+    
+    # 모델 파일 체크섬은 준비 완료 후 계산 (새 파일만, 결과는 저장되어 재시작 시 재사용)
+    try:
+        model_registry.compute_checksums()
+    except Exception as e:
+        logger.warning(f"⚠️ 모델 체크섬 계산 실패: {e}")
+
+@app.on_event("startup")
+async def start_background_tasks():
+    global janitor_task
+    asyncio.create_task(asyncio.to_thread(initialize_server))
+    janitor_task = asyncio.create_task(cache_janitor_loop())
+
+@app.on_event("shutdown")
+async def stop_cache_janitor():
+    if janitor_task is not None:
+        janitor_task.cancel()
+    # 개발 모드/uvicorn --workers에서 시작한 whisper-server가 남지 않도록 종료
+    # (다른 워커가 계속 사용 중이면 다음 요청에서 다시 시작함)
+    await asyncio.to_thread(stop_shared_servers, True)
+
 # 요청 모델
 class TranscriptionRequest(BaseModel):
     youtube_url: HttpUrl
     model_size: Optional[str] = DEFAULT_WHISPER_MODEL
     format_with_timestamps: Optional[bool] = DEFAULT_FORMAT_WITH_TIMESTAMPS
     format_with_segments: Optional[bool] = DEFAULT_FORMAT_WITH_SEGMENTS
+    output_format: Optional[str] = None  # txt, segments, timestamped, srt, vtt, json (없으면 format_with_* 로 결정)
+    word_timestamps: Optional[bool] = False  # 단어 단위 세그먼트 (음성 인식 시)
+    language: Optional[str] = DEFAULT_TRANSCRIPTION_LANGUAGE
+    force_asr: Optional[bool] = False  # 자막이 있어도 음성 인식 강제
+    start: Optional[float] = None  # 구간 시작 (초), 구간 스크립트 추출 시
+    end: Optional[float] = None  # 구간 종료 (초), 없으면 영상 끝까지
+    reuse_duplicates: Optional[bool] = NEAR_DUPLICATE_SHORT_CIRCUIT  # 앞부분이 이미 추출한 영상과 같으면 저장된 스크립트 재사용
 
 # 응답 모델
 class TranscriptionResponse(BaseModel):
@@ -96,64 +198,384 @@ class TranscriptionResponse(BaseModel):
     download_time: Optional[float] = None
     transcription_time: Optional[float] = None
     from_cache: Optional[bool] = None
+    transcript_source: Optional[str] = None  # "captions", "asr" 또는 "duplicate"
+    duplicate_of: Optional[str] = None  # 재사용한 스크립트 ID (transcript_source가 "duplicate"일 때)
+    transcript_id: Optional[str] = None  # GET /transcripts/{id}/export 로 다른 형식 내보내기
+    output_format: Optional[str] = None
 
-# Whisper 모델 캐시
+# Whisper 모델 캐시 (워커 프로세스마다 별도이나 운영 모드에서 미리 로드하면 fork로 공유, 요청은 스레드 풀에서 처리되므로 잠금으로 보호)
 whisper_models = {}
+whisper_model_locks = {}  # 모델별 추론 잠금 (디코딩 중 모델에 훅을 설치하므로 동시 추론 불가)
+_model_load_lock = threading.Lock()
 
 def get_whisper_model(model_size: str = DEFAULT_WHISPER_MODEL):
     """Whisper 모델을 가져오거나 캐시에서 로드 (CPU 모드)"""
-    if model_size not in whisper_models:
-        logger.info(f"Whisper 모델 로딩 중: {model_size} (CPU 모드)")
+    with _model_load_lock:
+        if model_size not in whisper_models:
+            logger.info(f"Whisper 모델 로딩 중: {model_size} (CPU 모드)")
+            
+            try:
+                import whisper
+                whisper_models[model_size] = whisper.load_model(model_size, device="cpu")
+                whisper_model_locks[model_size] = threading.Lock()
+                logger.info(f"Whisper 모델 로딩 완료: {model_size} (CPU)")
+            except Exception as e:
+                logger.error(f"모델 로딩 실패: {e}")
+                raise
         
-        try:
-            import whisper
-            whisper_models[model_size] = whisper.load_model(model_size, device="cpu")
-            logger.info(f"Whisper 모델 로딩 완료: {model_size} (CPU)")
-        except Exception as e:
-            logger.error(f"모델 로딩 실패: {e}")
-            raise
+        return whisper_models[model_size]
+
+def get_whisper_cpp_instance(model_size: str):
+    """Whisper.cpp 모델별 인스턴스를 가져오거나 생성"""
+    with _model_load_lock:
+        if model_size not in whisper_cpp_instances:
+            logger.info(f"Whisper.cpp {model_size} 모델 초기화 중...")
+            # medium 모델이 손상된 경우 large 모델 사용
+            actual_model = model_size
+            if model_size == "medium":
+                actual_model = "large-v3"
+                logger.warning(f"medium 모델 대신 {actual_model} 모델 사용")
+            whisper_cpp_instances[model_size] = whisper_cpp_module(model_size=actual_model)
+        
+        return whisper_cpp_instances[model_size]
+
+def preload_models(model_sizes: List[str]):
+    """
+    워커 프로세스를 만들기 전에 모델 로드 (run_server.py 운영 모드)
     
-    return whisper_models[model_size]
+    Whisper.cpp는 모델별 공유 whisper-server를 시작하고, OpenAI Whisper는 현재 프로세스에 로드하여
+    fork된 워커들이 가중치 메모리 페이지를 copy-on-write로 공유하게 한다.
+    
+    Args:
+        model_sizes: 로드할 모델 크기 목록
+    """
+    for model_size in model_sizes:
+        if USE_WHISPER_CPP:
+            try:
+                if get_whisper_cpp_instance(model_size).start_server():
+                    continue
+                logger.warning(f"⚠️ whisper-server를 사용할 수 없어 {model_size} 모델을 미리 로드하지 못했습니다")
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ Whisper.cpp {model_size} 모델 초기화 실패, OpenAI Whisper로 로드: {e}")
+        get_whisper_model(model_size)
 
-def download_audio(youtube_url: str, output_path: str) -> tuple[bool, dict]:
+def stop_shared_servers(owned_only: bool = False):
+    """
+    공유 whisper-server 종료
+    
+    Args:
+        owned_only: 이 프로세스가 시작한 서버만 종료 (워커 종료 시, 감독 프로세스가 시작한 서버는 감독 프로세스가 종료)
+    """
+    for instance in list(whisper_cpp_instances.values()):
+        server = getattr(instance, "server", None)
+        if server is not None and (server.owned or not owned_only):
+            server.stop()
+
+def get_process_memory_mb() -> Optional[float]:
+    """현재 워커 프로세스의 메모리 사용량 (RSS, MB)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # /proc이 없는 시스템 (macOS)은 최대 사용량으로 대신함
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+def get_process_memory_breakdown() -> dict:
+    """
+    현재 워커 프로세스의 메모리를 다른 프로세스와 공유하는 부분과 이 워커만 쓰는 부분으로 구분 (MB)
+    
+    /proc/self/smaps_rollup 기준 (Linux). shared_mb는 fork 전에 로드한 모델처럼 다른 워커와 함께 쓰는 페이지,
+    unique_mb는 이 워커만 쓰는 페이지, pss_mb는 공유 페이지를 공유 프로세스 수로 나눠 더한 값이다.
+    /proc이 없는 시스템(macOS)은 rss_mb만 반환한다.
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024  # kB -> MB
+    except OSError:
+        return {"rss_mb": round(get_process_memory_mb() or 0, 1)}
+    
+    return {
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1),
+        "unique_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1)
+    }
+
+def get_model_memory_info() -> dict:
+    """
+    현재 워커에 로드된 모델별 메모리 사용량
+    
+    OpenAI Whisper는 파라미터 크기, Whisper.cpp는 모델 파일 크기와 모든 워커가 공유하는 whisper-server 프로세스 정보
+    """
+    models = {}
+    for model_size, model in list(whisper_models.items()):
+        param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        models[f"whisper:{model_size}"] = round(param_bytes / (1024 * 1024), 1)
+    shared_servers = {}
+    for model_size, instance in list(whisper_cpp_instances.items()):
+        model_path = getattr(instance, "model_path", None)
+        if model_path and os.path.exists(model_path):
+            models[f"whisper.cpp:{model_size}"] = round(os.path.getsize(model_path) / (1024 * 1024), 1)
+        if getattr(instance, "server", None) is not None:
+            shared_servers[model_size] = instance.server.memory_info()
+    
+    memory = get_process_memory_breakdown()
+    return {
+        "pid": os.getpid(),
+        "rss_mb": memory["rss_mb"],
+        "memory_mb": memory,
+        "models_mb": models,
+        "whisper_servers": shared_servers,
+        "active_transcriptions": active_transcriptions,
+        "max_concurrent_transcriptions": MAX_CONCURRENT_TRANSCRIPTIONS
+    }
+
+def _slim_caption_tracks(tracks: Optional[dict], keep=None) -> dict:
+    """자막 트랙 목록에서 파싱 가능한 형식의 ext/url만 남기기 (keep이 주어지면 해당 언어만)"""
+    slim = {}
+    for lang, formats in (tracks or {}).items():
+        if keep is not None and not keep(lang):
+            continue
+        slim[lang] = [
+            {'ext': fmt['ext'], 'url': fmt['url']}
+            for fmt in formats or []
+            if fmt.get('ext') in CAPTION_PARSERS and fmt.get('url')
+        ]
+    return slim
+
+def get_video_info(ydl, youtube_url: str) -> dict:
+    """
+    yt-dlp 영상 정보 조회 (metadata 캐시 계층 사용)
+    
+    길이 계산과 자막 선택에 필요한 필드만 캐시한다.
+    자동 자막은 모든 언어의 번역본이 포함되므로 원어 트랙과 영상 언어만 남긴다.
+    
+    Args:
+        ydl: 열려 있는 YoutubeDL 인스턴스
+        youtube_url: YouTube URL
+        
+    Returns:
+        {"title", "duration", "language", "subtitles", "automatic_captions"}
+    """
+    metadata_key = cache_manager.get_cache_key(youtube_url)
+    info = cache_manager.get_value("metadata", metadata_key)
+    if info is not None:
+        logger.info(f"캐시된 영상 정보 사용: {youtube_url}")
+        return info
+    
+    extract_start_time = time.time()
+    full_info = ydl.extract_info(youtube_url, download=False)
+    automatic = full_info.get('automatic_captions') or {}
+    video_language = (full_info.get('language') or "").split("-")[0]
+    info = {
+        'title': full_info.get('title'),
+        'duration': full_info.get('duration'),
+        'language': full_info.get('language'),
+        'subtitles': _slim_caption_tracks(full_info.get('subtitles')),
+        'automatic_captions': _slim_caption_tracks(
+            automatic,
+            keep=lambda lang: lang.endswith("-orig") or lang == video_language or f"{lang}-orig" in automatic
+        )
+    }
+    cache_manager.put_value("metadata", metadata_key, info, cost_seconds=time.time() - extract_start_time)
+    return info
+
+def fetch_captions(ydl, info: dict, language: str) -> Optional[list]:
+    """
+    영상 정보에서 요청 언어의 자막을 찾아 세그먼트 리스트로 변환
+    
+    Args:
+        ydl: 열려 있는 YoutubeDL 인스턴스
+        info: extract_info 결과
+        language: 언어 코드
+        
+    Returns:
+        세그먼트 리스트 또는 None (자막 없음/실패 시)
+    """
+    track = select_caption_track(info, language, allow_auto=ALLOW_AUTO_GENERATED_CAPTIONS)
+    if not track:
+        logger.info(f"사용 가능한 자막 없음 ({language}), 음성 인식 진행")
+        return None
+    
+    try:
+        content = ydl.urlopen(track['url']).read().decode('utf-8')
+        segments = parse_captions(content, track['ext'])
+    except Exception as e:
+        logger.warning(f"자막 가져오기 실패, 음성 인식으로 진행: {e}")
+        return None
+    
+    if not segments:
+        return None
+    
+    kind = "자동 생성" if track['auto_generated'] else "업로드"
+    logger.info(f"{kind} 자막 사용: {track['language']} ({track['ext']}, {len(segments)}개 세그먼트)")
+    return segments
+
+def get_range_duration(time_range: tuple, total_duration: Optional[float]) -> float:
+    """구간 길이 계산 (종료 시각이 없거나 영상 길이를 넘으면 영상 끝까지)"""
+    start, end = time_range
+    if end is None or (total_duration and end > total_duration):
+        end = total_duration or start
+    return max(0.0, end - start)
+
+def clip_segments(segments: list, time_range: tuple) -> list:
+    """구간과 겹치는 세그먼트만 남기기 (시간 정보는 영상 기준 그대로 유지)"""
+    start, end = time_range
+    return [
+        seg for seg in segments
+        if seg["end"] > start and (end is None or seg["start"] < end)
+    ]
+
+def extract_audio_range(source_path: str, output_file: str, time_range: tuple) -> bool:
+    """
+    ffmpeg 탐색(-ss)으로 오디오 파일에서 구간만 잘라내기 (재인코딩 없음)
+    
+    Args:
+        source_path: 원본 오디오 파일 경로
+        output_file: 출력 파일 경로
+        time_range: (시작 초, 종료 초) 구간
+        
+    Returns:
+        성공 여부
+    """
+    start, end = time_range
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-ss", str(start), "-i", source_path]
+    if end is not None:
+        cmd.extend(["-t", str(end - start)])
+    cmd.extend(["-c", "copy", output_file])
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except Exception as e:
+        logger.error(f"오디오 구간 추출 실패: {e}")
+        return False
+    
+    if result.returncode != 0 or not os.path.exists(output_file):
+        logger.error(f"오디오 구간 추출 실패: {result.stderr}")
+        return False
+    return True
+
+def fetch_with_ytdlp(ydl_opts: dict, youtube_url: str, caption_language: Optional[str], time_range: Optional[tuple]) -> dict:
+    """
+    yt-dlp로 영상 정보를 확인하고 자막 또는 오디오 가져오기
+    
+    Returns:
+        {"duration", "captions"} (자막 사용 시) 또는 {"duration", "fetch_seconds"} (오디오 다운로드 시)
+        
+    Raises:
+        DownloadError: yt-dlp 추출/다운로드 실패
+    """
+    import yt_dlp
+    
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # 먼저 정보만 가져오기 (캐시된 영상 정보가 있으면 재사용)
+        info = get_video_info(ydl, youtube_url)
+        duration = info.get('duration') or 0
+        if time_range is not None:
+            duration = get_range_duration(time_range, duration)
+        
+        # 자막이 있으면 오디오 다운로드 생략
+        if caption_language:
+            captions = fetch_captions(ydl, info, caption_language)
+            if captions and time_range is not None:
+                captions = clip_segments(captions, time_range)
+            if captions:
+                return {'duration': duration, 'captions': captions}
+        
+        # 실제 다운로드
+        fetch_start_time = time.time()
+        ydl.download([youtube_url])
+        return {'duration': duration, 'fetch_seconds': time.time() - fetch_start_time}
+
+def download_audio(youtube_url: str, output_path: str, caption_language: Optional[str] = None, time_range: Optional[tuple] = None) -> tuple[bool, dict]:
     """
     YouTube 영상에서 오디오 추출 (캐시 지원)
     
+    caption_language가 주어지면 다운로드 전에 해당 언어의 자막을 확인하고,
+    자막이 있으면 오디오를 받지 않고 자막 세그먼트를 반환한다.
+    time_range가 주어지면 해당 구간의 오디오만 가져온다.
+    
     Args:
         youtube_url: YouTube URL
         output_path: 출력 파일 경로
+        caption_language: 자막을 찾을 언어 코드 (None이면 자막 확인 생략)
+        time_range: (시작 초, 종료 초) 구간, None이면 전체 오디오
         
     Returns:
-        (성공 여부, 파일 정보)
+        (성공 여부, 파일 정보) - 자막 사용 시 파일 정보에 'captions' 포함,
+        yt-dlp 실패 시 'failure'에 분류된 실패 사유 포함
     """
+    from yt_dlp.utils import DownloadError, download_range_func
+    
     try:
+        temp_audio_file = output_path.replace('%(ext)s', 'mp3')
+        
         # 1. 캐시에서 파일 확인
-        cached_file = cache_manager.get_cached_file(youtube_url)
+        # (오디오가 캐시되어 있다면 이전 요청에서 자막이 없었거나 음성 인식이 강제된 경우)
+        # 복사하지 않고 캐시 파일을 그대로 사용하며, 사용이 끝나면 release_file로 반환
+        cached_file = cache_manager.get_cached_file(youtube_url, time_range, pin=True)
         if cached_file:
             logger.info(f"캐시된 파일 사용: {youtube_url}")
             
-            # 캐시된 파일을 임시 디렉토리로 복사
-            import shutil
-            temp_audio_file = output_path.replace('%(ext)s', 'mp3')
-            shutil.copy2(cached_file, temp_audio_file)
-            
             # 파일 크기 계산
-            file_size = os.path.getsize(temp_audio_file)
+            file_size = os.path.getsize(cached_file)
             file_size_mb = file_size / (1024 * 1024)
             
             # 캐시 메타데이터에서 duration 가져오기
-            cache_key = cache_manager._generate_cache_key(youtube_url)
-            duration = cache_manager.metadata.get(cache_key, {}).get('duration', 0)
+            duration = cache_manager.get_cached_duration(youtube_url, time_range) or 0
             
             return True, {
-                'file_path': temp_audio_file,
+                'file_path': cached_file,
                 'size_mb': file_size_mb,
                 'duration': duration,
-                'from_cache': True
+                'from_cache': True,
+                'pinned': True
             }
         
-        # 2. 캐시에 없으면 새로 다운로드
-        logger.info(f"새로운 오디오 다운로드 시작: {youtube_url}")
+        # 1-1. 구간 요청이고 전체 오디오가 캐시되어 있으면 잘라내서 사용
+        if time_range is not None:
+            full_cached_file = cache_manager.get_cached_file(youtube_url, pin=True)
+            if full_cached_file:
+                extract_start_time = time.time()
+                try:
+                    extracted = extract_audio_range(full_cached_file, temp_audio_file, time_range)
+                finally:
+                    cache_manager.release_file(full_cached_file)
+                
+                if extracted:
+                    duration = get_range_duration(time_range, cache_manager.get_cached_duration(youtube_url))
+                    audio_file = cache_manager.cache_file(
+                        youtube_url, temp_audio_file, duration, time_range, pin=True,
+                        fetch_seconds=time.time() - extract_start_time
+                    )
+                    
+                    file_size_mb = os.path.getsize(audio_file) / (1024 * 1024)
+                    logger.info(f"캐시된 전체 오디오에서 구간 추출: {format_time_range(time_range)}")
+                    return True, {
+                        'file_path': audio_file,
+                        'size_mb': file_size_mb,
+                        'duration': duration,
+                        'from_cache': True,
+                        'pinned': audio_file != temp_audio_file
+                    }
+        
+        # 2. 최근 실패한 영상이면 다시 추출하지 않고 기록된 사유로 바로 실패
+        failure_key = cache_manager.get_cache_key(youtube_url)
+        cached_failure = cache_manager.get_value("failure", failure_key)
+        if cached_failure is not None:
+            logger.info(f"캐시된 다운로드 실패 사용: {youtube_url} ({cached_failure['reason']})")
+            return False, {'failure': {**cached_failure, 'cached': True}}
+        
+        # 3. 캐시에 없으면 새로 다운로드
+        logger.info(f"새로운 오디오 다운로드 시작: {youtube_url} ({format_time_range(time_range)})")
         
         ydl_opts = {
             'format': 'bestaudio/best',
@@ -167,30 +589,57 @@ def download_audio(youtube_url: str, output_path: str) -> tuple[bool, dict]:
             'no_warnings': True
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # 먼저 정보만 가져오기
-            info = ydl.extract_info(youtube_url, download=False)
-            duration = info.get('duration', 0)
-            
-            # 실제 다운로드
-            ydl.download([youtube_url])
+        # 구간 요청 시 해당 구간만 다운로드
+        if time_range is not None:
+            start, end = time_range
+            ydl_opts['download_ranges'] = download_range_func(None, [(start, end if end is not None else float('inf'))])
+            ydl_opts['force_keyframes_at_cuts'] = True
+        
+        # 일시적 실패는 대기 시간을 늘려 가며 재시도하고, 최종 실패는 분류하여 캐시
+        for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+            try:
+                fetched = fetch_with_ytdlp(ydl_opts, youtube_url, caption_language, time_range)
+                break
+            except DownloadError as e:
+                failure = classify_download_error(e)
+                if failure['kind'] != TRANSIENT or attempt == DOWNLOAD_MAX_ATTEMPTS:
+                    logger.error(f"오디오 다운로드 실패 ({failure['kind']}/{failure['reason']}): {failure['detail']}")
+                    cache_manager.put_value("failure", failure_key, failure, ttl_hours=failure['ttl_hours'])
+                    return False, {'failure': failure}
+                
+                delay = DOWNLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logger.warning(f"일시적 다운로드 실패, {delay:.0f}초 후 재시도 ({attempt}/{DOWNLOAD_MAX_ATTEMPTS}): {failure['detail']}")
+                time.sleep(delay)
+        
+        duration = fetched['duration']
+        if 'captions' in fetched:
+            return True, {
+                'captions': fetched['captions'],
+                'size_mb': 0,
+                'duration': duration,
+                'from_cache': False
+            }
+        fetch_seconds = fetched['fetch_seconds']
         
         # 실제 파일 경로 확인 (확장자가 mp3로 변경됨)
-        audio_file = output_path.replace('%(ext)s', 'mp3')
+        audio_file = temp_audio_file
         if os.path.exists(audio_file):
             # 파일 크기 계산
             file_size = os.path.getsize(audio_file)
             file_size_mb = file_size / (1024 * 1024)
             
-            # 캐시에 저장
-            cache_manager.cache_file(youtube_url, audio_file, duration)
+            # 캐시로 이동 (복사 없이 os.replace), 이후 캐시 경로를 사용
+            cached_audio_file = cache_manager.cache_file(
+                youtube_url, audio_file, duration, time_range, pin=True, fetch_seconds=fetch_seconds
+            )
             
-            logger.info(f"오디오 다운로드 완료: {audio_file} ({file_size_mb:.2f}MB, {duration}초)")
+            logger.info(f"오디오 다운로드 완료: {cached_audio_file} ({file_size_mb:.2f}MB, {duration}초)")
             return True, {
-                'file_path': audio_file,
+                'file_path': cached_audio_file,
                 'size_mb': file_size_mb,
                 'duration': duration,
-                'from_cache': False
+                'from_cache': False,
+                'pinned': cached_audio_file != audio_file
             }
         else:
             logger.error(f"오디오 파일을 찾을 수 없음: {audio_file}")
@@ -200,87 +649,21 @@ def download_audio(youtube_url: str, output_path: str) -> tuple[bool, dict]:
         logger.error(f"오디오 다운로드 실패: {str(e)}")
         return False, {}
 
-def format_time(seconds: float) -> str:
-    """초를 MM:SS 형식으로 변환"""
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    return f"{minutes:02d}:{secs:02d}"
-
-def format_transcription_text(text: str) -> str:
-    """
-    음성 인식 결과 텍스트를 읽기 쉽게 포맷팅
-    
-    Args:
-        text: 원본 텍스트
-        
-    Returns:
-        포맷팅된 텍스트
-    """
-    # 기본 문장 구분자로 분할
-    sentences = []
-    current_sentence = ""
-    
-    # 마침표, 느낌표, 물음표로 문장 구분
-    for char in text:
-        current_sentence += char
-        if char in ['.', '!', '?', '。', '！', '？']:
-            sentences.append(current_sentence.strip())
-            current_sentence = ""
-    
-    # 마지막 문장이 있다면 추가
-    if current_sentence.strip():
-        sentences.append(current_sentence.strip())
-    
-    # 빈 문장 제거하고 줄바꿈으로 연결
-    formatted_text = '\n'.join([s for s in sentences if s])
-    
-    return formatted_text
-
-def format_transcription_with_segments(result: dict, with_timestamps: bool = False) -> str:
-    """
-    Whisper 결과의 세그먼트 정보를 활용하여 포맷팅
-    
-    Args:
-        result: Whisper transcribe 결과
-        with_timestamps: 시간 정보 포함 여부
-        
-    Returns:
-        포맷팅된 텍스트
-    """
-    if "segments" not in result:
-        # 세그먼트 정보가 없으면 기본 포맷팅 사용
-        return format_transcription_text(result["text"].strip())
-    
-    formatted_lines = []
-    
-    for segment in result["segments"]:
-        text = segment["text"].strip()
-        if not text:
-            continue
-            
-        if with_timestamps:
-            start_time = format_time(segment["start"])
-            end_time = format_time(segment["end"])
-            line = f"[{start_time}-{end_time}] {text}"
-        else:
-            line = text
-            
-        formatted_lines.append(line)
-    
-    return '\n'.join(formatted_lines)
-
 import signal
-import threading
 from contextlib import contextmanager
 
 @contextmanager
 def timeout_context(seconds):
-    """타임아웃 컨텍스트 매니저"""
+    """
+    타임아웃 컨텍스트 매니저
+    
+    SIGALRM은 메인 스레드에서만 설정할 수 있으므로 스레드 풀에서 실행될 때는 타임아웃 없이 진행한다.
+    """
     def timeout_handler(signum, frame):
         raise TimeoutError(f"작업이 {seconds}초 후 타임아웃되었습니다")
     
-    # Unix 시스템에서만 signal 사용
-    if hasattr(signal, 'SIGALRM'):
+    # Unix 시스템의 메인 스레드에서만 signal 사용
+    if hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread():
         old_handler = signal.signal(signal.SIGALRM, timeout_handler)
         signal.alarm(seconds)
         try:
@@ -289,21 +672,24 @@ def timeout_context(seconds):
             signal.alarm(0)
             signal.signal(signal.SIGALRM, old_handler)
     else:
-        # Windows나 다른 시스템에서는 단순히 yield
+        # Windows나 작업 스레드에서는 단순히 yield
         yield
 
-def transcribe_audio(audio_path: str, model_size: str = DEFAULT_WHISPER_MODEL, format_with_segments: bool = DEFAULT_FORMAT_WITH_SEGMENTS, format_with_timestamps: bool = DEFAULT_FORMAT_WITH_TIMESTAMPS) -> Optional[str]:
+def transcribe_audio(audio_path: str, model_size: str = DEFAULT_WHISPER_MODEL, language: str = DEFAULT_TRANSCRIPTION_LANGUAGE, time_offset: float = 0.0, word_timestamps: bool = False) -> Optional[dict]:
     """
     오디오 파일을 텍스트로 변환 (타임아웃 및 강화된 에러 처리)
     
+    출력 형식 변환은 하지 않고 세그먼트를 반환한다 (transcript_renderer.render로 변환).
+    
     Args:
         audio_path: 오디오 파일 경로
         model_size: Whisper 모델 크기
-        format_with_segments: 세그먼트별 줄바꿈 여부
-        format_with_timestamps: 시간 정보 포함 여부
+        language: 음성 언어 코드
+        time_offset: 구간 오디오의 영상 내 시작 시각 (초), 타임스탬프 보정용
+        word_timestamps: 단어 단위 세그먼트 (단어별 시간과 확률)
         
     Returns:
-        변환된 텍스트 또는 None
+        {"text": 원본 텍스트, "segments": 영상 기준 시간의 SegmentArray} 또는 None
     """
     try:
         logger.info(f"음성 인식 시작: {audio_path}")
@@ -330,47 +716,20 @@ def transcribe_audio(audio_path: str, model_size: str = DEFAULT_WHISPER_MODEL, f
             logger.info("🚀 Whisper.cpp Metal 사용 (GPU 가속)")
             try:
                 # 모델별 인스턴스 가져오기 또는 생성
-                if model_size not in whisper_cpp_instances:
-                    logger.info(f"Whisper.cpp {model_size} 모델 초기화 중...")
-                    # medium 모델이 손상된 경우 large 모델 사용
-                    actual_model = model_size
-                    if model_size == "medium":
-                        actual_model = "large-v3"
-                        logger.warning(f"medium 모델 대신 {actual_model} 모델 사용")
-                    whisper_cpp_instances[model_size] = whisper_cpp_module(model_size=actual_model)
-                
-                whisper_cpp = whisper_cpp_instances[model_size]
+                whisper_cpp = get_whisper_cpp_instance(model_size)
                 
-                # 음성 인식 실행
+                # 음성 인식 실행 (내보내기용 시간 정보를 위해 타임스탬프는 항상 포함)
                 result = whisper_cpp.transcribe(
                     audio_path=audio_path,
-                    language="ko",  # 한국어로 명시적 설정
-                    no_timestamps=not format_with_timestamps
+                    language=language,
+                    word_timestamps=word_timestamps
                 )
                 
                 if result["success"]:
                     text = result["text"]
-                    
-                    # 세그먼트 포맷팅이 필요한 경우
-                    if format_with_segments and result.get("segments"):
-                        segments = result["segments"]
-                        if format_with_timestamps:
-                            formatted_lines = []
-                            for seg in segments:
-                                if isinstance(seg, dict) and "text" in seg:
-                                    start = seg.get("start", 0)
-                                    end = seg.get("end", 0)
-                                    text_content = seg["text"].strip()
-                                    if text_content:
-                                        formatted_lines.append(f"[{format_time(start)}-{format_time(end)}] {text_content}")
-                                else:
-                                    formatted_lines.append(str(seg))
-                            text = '\n'.join(formatted_lines)
-                        else:
-                            text = '\n'.join([seg.get("text", "").strip() for seg in segments if isinstance(seg, dict)])
-                    
-                    logger.info(f"Whisper.cpp Metal 음성 인식 완료: {len(text)} 문자")
-                    return text
+                    segments = result["segments"].shift(time_offset)
+                    logger.info(f"Whisper.cpp Metal 음성 인식 완료: {len(text)} 문자, 세그먼트 {len(segments)}개")
+                    return {"text": text, "segments": segments}
                 else:
                     logger.error(f"Whisper.cpp 오류: {result.get('error', 'Unknown error')}")
                     # OpenAI Whisper로 폴백
@@ -380,7 +739,9 @@ def transcribe_audio(audio_path: str, model_size: str = DEFAULT_WHISPER_MODEL, f
                 logger.info("OpenAI Whisper로 폴백")
         
         # CPU 모드로 OpenAI Whisper 사용 (폴백 또는 기본)
+        # 양자화 모델 이름(large-v3:q5_0)은 Whisper.cpp 전용이므로 원본 모델 사용
         logger.info("CPU 모드로 OpenAI Whisper 사용")
+        model_size = model_size.split(":")[0]
         model = get_whisper_model(model_size)
         
         # 타임아웃 설정 (파일 크기에 따라 조정)
@@ -390,20 +751,15 @@ def transcribe_audio(audio_path: str, model_size: str = DEFAULT_WHISPER_MODEL, f
         )
         logger.info(f"타임아웃 설정: {timeout_seconds}초 (파일 크기: {file_size_mb:.2f}MB)")
         
-        # 타임아웃과 함께 음성 인식 실행
-        with timeout_context(timeout_seconds):
-            result = model.transcribe(audio_path)
+        # 타임아웃과 함께 음성 인식 실행 (같은 모델의 동시 추론은 순서대로)
+        with whisper_model_locks[model_size], timeout_context(timeout_seconds):
+            result = model.transcribe(audio_path, language=language, word_timestamps=word_timestamps)
         
         raw_text = result["text"].strip()
+        segments = SegmentArray.from_records(result.get("segments"), expand_words=word_timestamps).shift(time_offset)
         
-        # 텍스트 포맷팅 적용
-        if format_with_segments:
-            formatted_text = format_transcription_with_segments(result, format_with_timestamps)
-        else:
-            formatted_text = format_transcription_text(raw_text)
-        
-        logger.info(f"OpenAI Whisper 음성 인식 완료: {len(raw_text)} 문자 -> {len(formatted_text)} 문자 (포맷팅됨)")
-        return formatted_text
+        logger.info(f"OpenAI Whisper 음성 인식 완료: {len(raw_text)} 문자, 세그먼트 {len(segments)}개")
+        return {"text": raw_text, "segments": segments}
         
     except TimeoutError as e:
         logger.error(f"음성 인식 타임아웃: {str(e)}")
@@ -433,32 +789,71 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /transcribe": "YouTube URL로부터 스크립트 추출",
-            "GET /health": "서버 상태 확인"
+            "GET /health": "서버 상태 확인",
+            "GET /search?q=": "추출한 모든 스크립트에서 문구 검색",
+            "GET /health/live": "프로세스 동작 확인",
+            "GET /health/ready": "요청 처리 준비 확인"
         }
     }
 
-@app.get("/health")
-async def health_check():
-    """서버 상태 확인"""
-    from gpu_utils import get_device_info
-    
-    device_info = get_device_info()
-    
-    # Whisper 모드 정보
-    whisper_info = {
+@app.get("/health/live")
+async def liveness_check():
+    """프로세스 동작 확인 (초기화 완료 여부와 관계없이 바로 응답)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """요청 처리 준비 확인 (캐시 인덱스와 미리 로드할 모델이 준비되면 200, 그 전에는 503)"""
+    if not server_readiness["ready"]:
+        raise HTTPException(status_code=503, detail={"status": "initializing", **server_readiness})
+    return {"status": "ready", **server_readiness}
+
+def get_whisper_mode_info() -> dict:
+    """Whisper 실행 방식 정보"""
+    return {
         "mode": "Metal GPU" if USE_WHISPER_CPP else "CPU",
         "whisper_cpp": USE_WHISPER_CPP,
         "message": "Metal GPU 가속 활성화 (고속 처리)" if USE_WHISPER_CPP else "CPU 모드로 안정적으로 실행 중",
         "loaded_models": list(whisper_cpp_instances.keys()) if USE_WHISPER_CPP else []
     }
+
+@app.get("/health")
+async def health_check():
+    """
+    서버 상태 확인
     
+    디바이스 정보는 서버 시작 시 확인한 결과를 사용한다 (확인 전이면 null).
+    다시 확인하려면 GET /health/diagnostics?refresh=true
+    """
     return {
         "status": "healthy", 
         "message": "서버가 정상적으로 동작 중입니다 (CPU 모드)",
+        "ready": server_readiness["ready"],
+        "device_info": get_cached_device_info(),
+        "whisper": get_whisper_mode_info(),
+        "worker": get_model_memory_info()
+    }
+
+@app.get("/health/diagnostics")
+async def health_diagnostics(refresh: bool = False):
+    """
+    상세 진단 정보 (디바이스, 초기화 단계, 워커 메모리, 공유 whisper-server)
+    
+    Args:
+        refresh: True이면 디바이스 확인(torch import, MPS 텐서 테스트)을 다시 수행하여 캐시 갱신
+    """
+    device_info = await asyncio.to_thread(get_device_info, refresh)
+    return {
         "device_info": device_info,
-        "whisper": whisper_info
+        "readiness": server_readiness,
+        "whisper": get_whisper_mode_info(),
+        "worker": get_model_memory_info()
     }
 
+# 스크립트 추출 동시 실행 제한 (워커 프로세스당)
+transcription_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+active_transcriptions = 0
+
 @app.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_youtube_video(
     request: TranscriptionRequest,
@@ -467,6 +862,9 @@ async def transcribe_youtube_video(
     """
     YouTube 영상의 스크립트 추출 (개선된 버전)
     
+    다운로드와 음성 인식은 블로킹 작업이므로 스레드 풀에서 실행하고,
+    동시에 MAX_CONCURRENT_TRANSCRIPTIONS개까지만 처리한다 (이벤트 루프는 다른 요청을 계속 처리).
+    
     Args:
         request: YouTube URL과 모델 크기
         background_tasks: 백그라운드 작업 (파일 정리용)
@@ -474,37 +872,188 @@ async def transcribe_youtube_video(
     Returns:
         변환된 텍스트 또는 에러 메시지
     """
-    import time
+    global active_transcriptions
+    async with transcription_semaphore:
+        active_transcriptions += 1
+        try:
+            return await asyncio.to_thread(process_transcription, request, background_tasks)
+        finally:
+            active_transcriptions -= 1
+
+def find_duplicate_transcript(audio_file: str, duration: Optional[float], model_size: str, language: str, work_dir: str) -> Optional[dict]:
+    """
+    앞부분만 음성 인식해 이미 추출한 영상과 같으면 저장된 전체 스크립트 반환 (재업로드 영상의 전체 음성 인식 생략)
+    
+    앞부분 서명이 비슷하고 영상 길이도 거의 같은 스크립트만 재사용한다 (앞부분만 같은 리액션/짜깁기 영상 제외).
+    
+    Args:
+        audio_file: 전체 오디오 파일 경로
+        duration: 영상 길이 (초)
+        model_size: Whisper 모델 크기
+        language: 음성 언어 코드
+        work_dir: 앞부분 오디오를 저장할 작업 디렉토리
+    
+    Returns:
+        {"text", "segments", "duplicate_of", "similarity"} 또는 None
+    """
+    # 앞부분 확인 비용이 절약할 시간보다 크면 건너뜀
+    if not duration or duration < NEAR_DUPLICATE_PREFIX_SECONDS * 2:
+        return None
+    
+    prefix_file = os.path.join(work_dir, "prefix" + os.path.splitext(audio_file)[1])
+    if not extract_audio_range(audio_file, prefix_file, (0.0, NEAR_DUPLICATE_PREFIX_SECONDS)):
+        return None
+    prefix = transcribe_audio(prefix_file, model_size, language=language)
+    if prefix is None:
+        return None
+    
+    for match in near_duplicate_index.find_by_prefix(prefix["segments"].text):
+        if not match.get("duration") or abs(match["duration"] - duration) > duration * NEAR_DUPLICATE_DURATION_TOLERANCE:
+            continue
+        stored = transcript_index.get_transcript(match["transcript_id"])
+        if stored is None:
+            continue
+        logger.info(f"중복 영상 스크립트 재사용: {match['transcript_id']} (앞부분 유사도 {match['similarity']})")
+        return {
+            "text": stored["segments"].text,
+            "segments": stored["segments"],
+            "duplicate_of": match["transcript_id"],
+            "similarity": match["similarity"]
+        }
+    return None
+
+def make_transcript_id(youtube_url: str, time_range: Optional[tuple], model_size: str, language: Optional[str], source_mode: str) -> str:
+    """
+    스크립트 ID (영상/구간, 모델, 언어, 자막 사용 여부로 결정, 출력 형식과 무관)
+    
+    Args:
+        youtube_url: YouTube URL
+        time_range: 구간 (start, end) 또는 None
+        model_size: Whisper 모델 크기
+        language: 음성 언어 코드
+        source_mode: "captions" (자막 우선) 또는 "asr"
+    
+    Returns:
+        16자리 16진수 ID
+    """
+    key = "|".join([cache_manager.get_cache_key(youtube_url, time_range), str(model_size), language or "", source_mode])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def resolve_output_format(request: TranscriptionRequest) -> str:
+    """요청의 출력 형식 (output_format이 없으면 기존 format_with_segments/format_with_timestamps 옵션으로 결정)"""
+    if request.output_format:
+        if request.output_format not in OUTPUT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 출력 형식입니다: {request.output_format} (가능: {', '.join(OUTPUT_FORMATS)})")
+        return request.output_format
+    if request.format_with_segments:
+        return "timestamped" if request.format_with_timestamps else "segments"
+    return "txt"
+
+def process_transcription(request: TranscriptionRequest, background_tasks: BackgroundTasks) -> TranscriptionResponse:
+    """스크립트 추출 처리 (스레드 풀에서 실행)"""
     start_time = time.time()
     download_start_time = None
+    
+    # 구간 요청 검증
+    time_range = None
+    if request.start is not None or request.end is not None:
+        range_start = request.start or 0.0
+        if range_start < 0 or (request.end is not None and request.end <= range_start):
+            raise HTTPException(status_code=400, detail="잘못된 구간입니다: start는 0 이상이고 end는 start보다 커야 합니다")
+        time_range = (range_start, request.end)
     transcription_start_time = None
     
-    # 임시 디렉토리 생성
-    temp_dir = tempfile.mkdtemp()
+    youtube_url = str(request.youtube_url)
+    output_format = resolve_output_format(request)
+    caption_language = None
+    if USE_CAPTIONS_WHEN_AVAILABLE and not request.force_asr:
+        caption_language = request.language
+    
+    # 같은 영상/구간/모델의 스크립트가 캐시되어 있으면 다운로드/음성 인식 없이 요청 형식으로 변환만 수행
+    # (세그먼트를 캐시하므로 출력 형식이 달라도 같은 항목 사용)
+    transcript_id = make_transcript_id(
+        youtube_url, time_range, request.model_size, request.language,
+        "captions" if caption_language else ("asr-words" if request.word_timestamps else "asr")
+    )
+    cached_transcript = cache_manager.get_value("transcript", transcript_id)
+    if cached_transcript is not None and "segments" in cached_transcript:
+        logger.info(f"캐시된 스크립트 사용: {youtube_url}")
+        if not all(store.contains(transcript_id) for store in (transcript_index, keyword_extractor, near_duplicate_index)):
+            background_tasks.add_task(index_transcript, transcript_id, cached_transcript, True)
+        return TranscriptionResponse(
+            success=True,
+            text=render_cached_transcript(transcript_id, cached_transcript, output_format),
+            processing_time=time.time() - start_time,
+            audio_size_mb=cached_transcript.get('audio_size_mb'),
+            audio_duration=cached_transcript.get('audio_duration'),
+            download_time=0.0,
+            transcription_time=0.0,
+            from_cache=True,
+            transcript_source=cached_transcript.get('transcript_source'),
+            transcript_id=transcript_id,
+            output_format=output_format
+        )
+    
+    # 임시 디렉토리 생성 (캐시와 같은 파일시스템에 생성하여 캐시 저장 시 파일 이동만 수행)
+    temp_dir = cache_manager.make_work_dir()
     audio_path = os.path.join(temp_dir, "audio.%(ext)s")
+    audio_info = {}
+    succeeded = False
     
     try:
-        # 1. YouTube URL에서 오디오 다운로드
-        youtube_url = str(request.youtube_url)
+        # 1. YouTube URL에서 오디오 다운로드 (자막이 있으면 자막 사용)
         download_start_time = time.time()
         
-        download_success, audio_info = download_audio(youtube_url, audio_path)
+        download_success, audio_info = download_audio(
+            youtube_url,
+            audio_path,
+            caption_language=caption_language,
+            time_range=time_range
+        )
         if not download_success:
+            failure = audio_info.get('failure')
+            if failure:
+                # 일시적 실패는 재시도 가능 시점을 알려준다
+                headers = None
+                if failure['kind'] == TRANSIENT:
+                    headers = {"Retry-After": str(max(1, int(failure['ttl_hours'] * 3600)))}
+                raise HTTPException(
+                    status_code=failure['status_code'],
+                    detail=f"{failure['message']} ({failure['reason']})",
+                    headers=headers
+                )
             raise HTTPException(status_code=400, detail="오디오 다운로드에 실패했습니다")
         
         download_time = time.time() - download_start_time
         logger.info(f"다운로드 완료: {download_time:.2f}초")
         
-        # 2. 오디오를 텍스트로 변환
+        # 2. 오디오를 텍스트로 변환 (자막이 있으면 자막 세그먼트 사용)
         transcription_start_time = time.time()
-        text = transcribe_audio(
-            audio_path, 
-            request.model_size,
-            format_with_segments=request.format_with_segments,
-            format_with_timestamps=request.format_with_timestamps
-        )
+        captions = audio_info.get('captions')
+        if captions:
+            transcript_source = "captions"
+            segments = SegmentArray.from_records(captions)
+            transcript = {"text": segments.text, "segments": segments}
+        else:
+            transcript_source = "asr"
+            transcript = None
+            # 저장된 스크립트는 세그먼트 단위라 단어별 타임스탬프 요청에는 재사용하지 않음
+            if request.reuse_duplicates and time_range is None and not request.word_timestamps:
+                transcript = find_duplicate_transcript(
+                    audio_info['file_path'], audio_info.get('duration'), request.model_size, request.language, temp_dir
+                )
+                if transcript is not None:
+                    transcript_source = "duplicate"
+            if transcript is None:
+                transcript = transcribe_audio(
+                    audio_info['file_path'],
+                    request.model_size,
+                    language=request.language,
+                    time_offset=time_range[0] if time_range else 0.0,
+                    word_timestamps=request.word_timestamps
+                )
         
-        if text is None:
+        if transcript is None:
             raise HTTPException(status_code=500, detail="음성 인식에 실패했습니다")
         
         transcription_time = time.time() - transcription_start_time
@@ -512,9 +1061,30 @@ async def transcribe_youtube_video(
         
         logger.info(f"음성 인식 완료: {transcription_time:.2f}초 (총 {total_time:.2f}초)")
         
-        # 3. 백그라운드에서 임시 파일 정리
+        transcript_value = {
+            'text': transcript["text"],
+            'segments': transcript["segments"].to_dict(),
+            'youtube_url': youtube_url,
+            'time_range': list(time_range) if time_range else None,
+            'model_size': request.model_size,
+            'language': request.language,
+            'audio_size_mb': audio_info.get('size_mb'),
+            'audio_duration': audio_info.get('duration'),
+            'transcript_source': transcript_source,
+            'word_timestamps': transcript_source == "asr" and request.word_timestamps
+        }
+        cache_manager.put_value("transcript", transcript_id, transcript_value, cost_seconds=transcription_time)
+        # 캐시된 스크립트를 다시 요청했을 때와 같은 정보로 변환
+        text = render_to_string(
+            transcript["segments"], output_format, transcript["text"],
+            transcript_export_metadata(transcript_id, transcript_value)
+        )
+        
+        # 3. 백그라운드에서 검색 색인/키워드 통계/중복 탐지 색인에 추가하고 임시 파일 정리
+        background_tasks.add_task(index_transcript, transcript_id, transcript_value)
         background_tasks.add_task(cleanup_files, audio_path.replace('%(ext)s', 'mp3'))
         background_tasks.add_task(shutil.rmtree, temp_dir)
+        succeeded = True
         
         return TranscriptionResponse(
             success=True,
@@ -524,7 +1094,11 @@ async def transcribe_youtube_video(
             audio_duration=audio_info.get('duration'),
             download_time=download_time,
             transcription_time=transcription_time,
-            from_cache=audio_info.get('from_cache', False)
+            from_cache=audio_info.get('from_cache', False),
+            transcript_source=transcript_source,
+            duplicate_of=transcript.get("duplicate_of"),
+            transcript_id=transcript_id,
+            output_format=output_format
         )
         
     except HTTPException:
@@ -532,38 +1106,211 @@ async def transcribe_youtube_video(
         raise
     except TimeoutError as e:
         logger.error(f"타임아웃 오류: {str(e)}")
-        # 임시 파일 정리
-        background_tasks.add_task(cleanup_files, audio_path.replace('%(ext)s', 'mp3'))
-        background_tasks.add_task(shutil.rmtree, temp_dir)
         raise HTTPException(status_code=408, detail=f"처리 시간이 초과되었습니다: {str(e)}")
     except MemoryError as e:
         logger.error(f"메모리 부족 오류: {str(e)}")
-        # 임시 파일 정리
-        background_tasks.add_task(cleanup_files, audio_path.replace('%(ext)s', 'mp3'))
-        background_tasks.add_task(shutil.rmtree, temp_dir)
         raise HTTPException(status_code=507, detail="메모리 부족으로 처리할 수 없습니다. 더 작은 파일을 시도해주세요.")
     except Exception as e:
         # 기타 예외 처리
         logger.error(f"처리 중 오류 발생: {str(e)}")
         
-        # 임시 파일 정리
-        background_tasks.add_task(cleanup_files, audio_path.replace('%(ext)s', 'mp3'))
-        background_tasks.add_task(shutil.rmtree, temp_dir)
-        
         raise HTTPException(
             status_code=500, 
             detail=f"처리 중 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        # 캐시 파일 사용 종료 (정리 작업이 삭제할 수 있도록 반환)
+        if audio_info.get('pinned'):
+            cache_manager.release_file(audio_info['file_path'])
+        # 실패하면 임시 디렉토리를 바로 삭제 (오류 응답에는 백그라운드 작업이 실행되지 않음)
+        if not succeeded:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+def index_transcript(transcript_id: str, transcript_value: dict, only_missing: bool = False):
+    """
+    스크립트를 검색 색인, 키워드 통계, 중복 탐지 색인에 추가 (응답 후 백그라운드 작업, 실패해도 요청에는 영향 없음)
+    
+    Args:
+        transcript_id: 스크립트 ID
+        transcript_value: 스크립트 캐시 값 (segments와 영상 정보)
+        only_missing: 이미 들어 있는 곳은 건너뛰기 (캐시된 스크립트 재사용 시)
+    """
+    youtube_url = transcript_value.get("youtube_url", "")
+    segments = load_segments(transcript_value.get("segments"))
+    metadata = {
+        "youtube_url": youtube_url,
+        "video_id": extract_video_id(youtube_url),
+        "language": transcript_value.get("language"),
+        "model_size": transcript_value.get("model_size"),
+        "transcript_source": transcript_value.get("transcript_source"),
+        "duration": transcript_value.get("audio_duration")
+    }
+    
+    def add_to_search_index():
+        # 영상 제목은 yt-dlp 정보 캐시에 남아 있을 때만 사용
+        info = cache_manager.get_value("metadata", cache_manager.get_cache_key(youtube_url)) or {}
+        transcript_index.add_transcript(transcript_id, segments, {**metadata, "title": info.get("title")})
+    
+    steps = [
+        ("키워드 통계", keyword_extractor, lambda: keyword_extractor.add_document(transcript_id, segments.text)),
+        ("검색 색인", transcript_index, add_to_search_index),
+        # 앞부분 서명은 영상 처음부터 세그먼트 단위로 추출한 스크립트만 (구간, 단어 단위 스크립트는 재사용 대상에서 제외)
+        ("중복 탐지 색인", near_duplicate_index, lambda: near_duplicate_index.add_transcript(
+            transcript_id, segments, metadata,
+            index_prefix=not transcript_value.get("time_range") and not transcript_value.get("word_timestamps")
+        )),
+    ]
+    for name, store, add in steps:
+        if only_missing and store.contains(transcript_id):
+            continue
+        try:
+            add()
+        except Exception as e:
+            logger.error(f"{name} 추가 실패: {transcript_id} - {e}")
+
+def render_cached_transcript(transcript_id: str, cached_transcript: dict, output_format: str) -> str:
+    """캐시된 스크립트(세그먼트 배열)를 요청 형식의 문자열로 변환"""
+    segments = load_segments(cached_transcript.get("segments"))
+    return render_to_string(
+        segments, output_format, cached_transcript.get("text"), transcript_export_metadata(transcript_id, cached_transcript)
+    )
+
+def transcript_export_metadata(transcript_id: str, transcript_value: dict) -> dict:
+    """JSON 출력에 포함할 스크립트 정보 (새로 추출한 응답, 캐시 응답, 내보내기 모두 같은 형식)"""
+    return {
+        "transcript_id": transcript_id,
+        **{
+            key: transcript_value.get(key)
+            for key in ("youtube_url", "time_range", "model_size", "language", "transcript_source", "audio_duration")
+        }
+    }
+
+@app.get("/transcripts/{transcript_id}/export")
+async def export_transcript(transcript_id: str, format: str = "srt"):
+    """
+    스크립트를 지정한 형식으로 내보내기 (txt, segments, timestamped, srt, vtt, json)
+    
+    캐시에서 만료된 스크립트는 검색 색인에 저장된 세그먼트를 사용한다.
+    세그먼트 단위로 스트리밍하므로 긴 스크립트도 전체 문자열을 만들지 않는다.
+    """
+    if format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 출력 형식입니다: {format} (가능: {', '.join(OUTPUT_FORMATS)})")
+    cached_transcript = cache_manager.get_value("transcript", transcript_id)
+    if cached_transcript is not None and "segments" in cached_transcript:
+        segments = load_segments(cached_transcript["segments"])
+        metadata = transcript_export_metadata(transcript_id, cached_transcript)
+    else:
+        cached_transcript = await asyncio.to_thread(transcript_index.get_transcript, transcript_id)
+        if cached_transcript is None:
+            raise HTTPException(status_code=404, detail="스크립트를 찾을 수 없습니다")
+        segments = cached_transcript.pop("segments")
+        cached_transcript["audio_duration"] = cached_transcript.get("duration")
+        metadata = transcript_export_metadata(transcript_id, cached_transcript)
+    
+    content_type, extension = OUTPUT_FORMATS[format]
+    return StreamingResponse(
+        render(segments, format, cached_transcript.get("text"), metadata),
+        media_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{transcript_id}.{extension}"'}
+    )
+
+@app.get("/transcripts/{transcript_id}/keywords")
+async def get_transcript_keywords(transcript_id: str, limit: int = 20):
+    """
+    스크립트의 TF-IDF 상위 키워드 (지금까지 추출한 모든 스크립트 대비 이 영상에서 두드러지는 단어)
+    
+    Args:
+        transcript_id: 스크립트 ID
+        limit: 최대 키워드 수
+    """
+    keywords = await asyncio.to_thread(keyword_extractor.document_keywords, transcript_id, max(1, min(limit, 200)))
+    if keywords is None:
+        raise HTTPException(status_code=404, detail="스크립트를 찾을 수 없습니다")
+    return {"success": True, "transcript_id": transcript_id, "keywords": keywords}
+
+@app.get("/keywords/transcripts")
+async def get_corpus_keywords(limit: int = 50, min_document_frequency: int = KEYWORD_MIN_DOCUMENT_FREQUENCY):
+    """
+    추출한 모든 스크립트의 상위 키워드 (스크립트별 TF-IDF 합)
+    
+    Args:
+        limit: 최대 키워드 수
+        min_document_frequency: 이 수 이상의 스크립트에 나온 단어만
+    """
+    result = await asyncio.to_thread(keyword_extractor.corpus_keywords, max(1, min(limit, 500)), min_document_frequency)
+    return {"success": True, **result}
+
+@app.get("/transcripts/{transcript_id}/duplicates")
+async def get_transcript_duplicates(transcript_id: str, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+    """
+    내용이 거의 같은 스크립트 (재업로드, 짜깁기, 리액션 영상)
+    
+    MinHash 서명의 LSH 버킷이 겹치는 스크립트만 비교하므로 스크립트 수와 관계없이 빠르게 찾는다.
+    
+    Args:
+        transcript_id: 스크립트 ID
+        threshold: 최소 유사도 (자카드 유사도 추정치, 0~1). LSH 후보 기준이 약 0.7이므로 너무 낮추면 일부를 놓칠 수 있음
+    """
+    duplicates = await asyncio.to_thread(near_duplicate_index.find_duplicates, transcript_id, threshold)
+    if duplicates is None:
+        raise HTTPException(status_code=404, detail="스크립트를 찾을 수 없습니다 (텍스트가 너무 짧으면 서명이 없음)")
+    return {"transcript_id": transcript_id, "threshold": threshold, "duplicates": duplicates}
+
+@app.get("/search")
+async def search_transcripts(q: str, limit: int = SEARCH_MAX_RESULTS):
+    """
+    지금까지 추출한 모든 스크립트에서 문구 검색
+    
+    공백으로 나눈 검색어를 모두 포함하는 구간을 찾아 영상별로 묶고, 각 구간의 시작/끝 시각(초)을 함께 반환한다.
+    
+    Args:
+        q: 검색어 (3글자 이상이면 색인 검색, 더 짧으면 부분 일치 검색)
+        limit: 최대 영상 수
+    """
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="검색어를 입력하세요")
+    start_time = time.time()
+    results = await asyncio.to_thread(transcript_index.search, query, max(1, min(limit, 100)))
+    return {
+        "query": query,
+        "results": results,
+        "search_time_ms": round((time.time() - start_time) * 1000, 1)
+    }
+
+@app.get("/search/stats")
+async def get_search_stats():
+    """검색 색인 통계 (스크립트 수, 세그먼트 수, 색인 크기)"""
+    return await asyncio.to_thread(transcript_index.get_stats)
 
 @app.get("/models")
 async def get_available_models():
-    """사용 가능한 Whisper 모델 목록"""
+    """
+    사용 가능한 Whisper 모델 목록
+    
+    Whisper.cpp 모델 파일 목록(크기, 체크섬, 구조, 양자화 형식, 측정 속도)을 반환한다.
+    양자화 모델은 "large-v3:q5_0"처럼 이름에 형식이 붙으며, 그대로 model_size로 요청할 수 있다.
+    """
+    registry_models = model_registry.list_models() if USE_WHISPER_CPP else []
+    if not registry_models:
+        return {
+            "models": [
+                {"name": "medium", "description": "높은 정확도, Metal 가속 지원"},
+                {"name": "large", "description": "최고 정확도, Metal 가속 지원 (large-v3)"}
+            ],
+            "loaded_models": list(whisper_models.keys())
+        }
+    
+    models = []
+    for model in registry_models:
+        description = WHISPER_MODEL_DESCRIPTIONS.get(model["architecture"], model["architecture"])
+        if model["quantization"] not in (None, "f16", "f32"):
+            description = f"{description} - {model['quantization']} 양자화 ({model['size_mb']:.0f}MB, 메모리 적고 CPU에서 빠름)"
+        models.append({**model, "description": description})
+    
     return {
-        "models": [
-            {"name": "medium", "description": "높은 정확도, Metal 가속 지원"},
-            {"name": "large", "description": "최고 정확도, Metal 가속 지원 (large-v3)"}
-        ],
-        "loaded_models": list(whisper_models.keys())
+        "models": models,
+        "loaded_models": list(whisper_models.keys()) + list(whisper_cpp_instances.keys())
     }
 
 @app.get("/cache/info")
@@ -571,6 +1318,61 @@ async def get_cache_info():
     """캐시 정보 조회"""
     return cache_manager.get_cache_info()
 
+def require_cache_snapshot_api(request: Request):
+    """캐시 스냅샷 API 사용 허용 확인 (CACHE_SNAPSHOT_API_ENABLED, CACHE_ADMIN_TOKEN)"""
+    if not CACHE_SNAPSHOT_API_ENABLED:
+        raise HTTPException(status_code=403, detail="캐시 스냅샷 API가 꺼져 있습니다 (CACHE_SNAPSHOT_API_ENABLED=1)")
+    if CACHE_ADMIN_TOKEN and not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), CACHE_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+
+@app.get("/cache/snapshot", dependencies=[Depends(require_cache_snapshot_api)])
+async def export_cache_snapshot(since_hours: Optional[float] = None, min_hits: Optional[int] = None):
+    """
+    캐시 스냅샷 내보내기 (tar 스트림)
+    
+    Args:
+        since_hours: 최근 N시간 안에 사용된 항목만
+        min_hits: 히트 수가 N 이상인 항목만
+    """
+    filename = f"cache-snapshot-{time.strftime('%Y%m%d-%H%M%S')}.tar"
+    return StreamingResponse(
+        iter_snapshot(since_hours=since_hours, min_hits=min_hits),
+        media_type="application/x-tar",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.post("/cache/snapshot", status_code=202, dependencies=[Depends(require_cache_snapshot_api)])
+async def import_cache_snapshot(request: Request, background_tasks: BackgroundTasks):
+    """
+    캐시 스냅샷 가져오기 (요청 본문: GET /cache/snapshot으로 받은 tar 파일)
+    
+    업로드를 임시 파일로 받은 뒤 백그라운드에서 가져오며, 진행 상태는 GET /cache/snapshot/status로 확인한다.
+    """
+    if is_import_running():
+        raise HTTPException(status_code=409, detail="이미 스냅샷을 가져오는 중입니다")
+    
+    snapshot_dir = cache_manager.make_work_dir()
+    snapshot_path = os.path.join(snapshot_dir, "snapshot.tar")
+    # 파일 쓰기는 스레드에서 (업로드 중에도 이벤트 루프가 다른 요청을 처리하도록)
+    f = await asyncio.to_thread(open, snapshot_path, 'wb')
+    try:
+        async for chunk in request.stream():
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(shutil.rmtree, snapshot_dir, True)
+        raise
+    await asyncio.to_thread(f.close)
+    
+    background_tasks.add_task(import_snapshot_file, snapshot_path, True)
+    background_tasks.add_task(shutil.rmtree, snapshot_dir, True)
+    return {"message": "캐시 스냅샷 가져오기를 시작했습니다.", "size_mb": os.path.getsize(snapshot_path) / (1024 * 1024)}
+
+@app.get("/cache/snapshot/status")
+async def get_cache_snapshot_status():
+    """캐시 스냅샷 가져오기 상태 조회"""
+    return import_status
+
 @app.delete("/cache/clear")
 async def clear_cache():
     """모든 캐시 삭제"""
@@ -588,11 +1390,16 @@ class KeywordTrendResponse(BaseModel):
     keywords: List[dict]
     error: Optional[str] = None
 
+def get_naver_service():
+    """네이버 데이터랩 서비스 (requests 등은 처음 사용할 때 import)"""
+    from naver_datalab import naver_datalab_service
+    return naver_datalab_service
+
 @app.post("/keywords/trends", response_model=KeywordTrendResponse)
 async def get_keyword_trends(request: KeywordTrendRequest):
     """네이버 데이터랩에서 키워드 트렌드 데이터 가져오기"""
     try:
-        keywords = naver_datalab_service.get_search_trends(
+        keywords = get_naver_service().get_search_trends(
             keywords=request.keywords,
             start_date=request.start_date,
             end_date=request.end_date
@@ -614,7 +1421,7 @@ async def get_keyword_trends(request: KeywordTrendRequest):
 async def get_shopping_insights():
     """네이버 쇼핑 인사이트 데이터 가져오기"""
     try:
-        keywords = naver_datalab_service.get_shopping_insights()
+        keywords = get_naver_service().get_shopping_insights()
         return {
             "success": True,
             "keywords": keywords
@@ -631,7 +1438,7 @@ async def get_shopping_insights():
 async def get_mock_keyword_data():
     """시뮬레이션된 키워드 데이터 반환 (테스트용)"""
     try:
-        keywords = naver_datalab_service._get_mock_trend_data([])
+        keywords = get_naver_service()._get_mock_trend_data([])
         return {
             "success": True,
             "keywords": keywords
@@ -655,7 +1462,7 @@ async def get_related_keywords(request: dict):
         if not main_keyword:
             return {"success": False, "error": "키워드가 필요합니다."}
         
-        keywords = naver_datalab_service.get_search_trends_with_related(
+        keywords = get_naver_service().get_search_trends_with_related(
             main_keyword=main_keyword,
             include_related=include_related,
             max_related=max_related
@@ -668,10 +1475,12 @@ async def get_related_keywords(request: dict):
 
 # Claude CLI 평가 요청 모델
 class ContentEvaluationRequest(BaseModel):
-    content: str
+    content: str = ""  # transcript_id를 주면 비워도 됨
     title: Optional[str] = None
     category: Optional[str] = None
     evaluation_type: Optional[str] = "comprehensive"  # comprehensive, simple, category_specific
+    long_content: Optional[bool] = None  # 구간별 평가 후 합치기 (None이면 EVALUATION_LONG_CONTENT_CHARS 초과 시 자동)
+    transcript_id: Optional[str] = None  # 저장된 스크립트 평가 (세그먼트 경계에서 구간을 나눔)
 
 class ContentEvaluationResponse(BaseModel):
     success: bool
@@ -679,152 +1488,89 @@ class ContentEvaluationResponse(BaseModel):
     error: Optional[str] = None
     processing_time: Optional[float] = None
     result: Optional[str] = None  # Claude CLI의 원본 텍스트 응답
+    from_cache: bool = False  # 캐시된 평가 결과 여부
+    chunks: Optional[List[dict]] = None  # 긴 콘텐츠 평가의 구간별 결과 (시작/끝, 평균 점수, 요약)
+
+def evaluation_content_error(content: str) -> Optional[str]:
+    """평가할 수 없는 콘텐츠면 이유 반환 (단일 평가, 일괄 평가 항목 공통)"""
+    if not content.strip():
+        return "평가할 콘텐츠가 없습니다."
+    if len(content) > EVALUATION_MAX_CONTENT_CHARS:
+        return f"콘텐츠가 너무 깁니다. (최대 {EVALUATION_MAX_CONTENT_CHARS}자, 요청 {len(content)}자)"
+    return None
+
+async def resolve_evaluation_input(request: ContentEvaluationRequest):
+    """
+    평가할 콘텐츠 준비 (transcript_id가 있으면 저장된 스크립트 사용)
+    
+    Returns:
+        (콘텐츠, 제목, 세그먼트 또는 None, 구간별 평가 여부)
+    """
+    content = request.content
+    title = request.title
+    segments = None
+    if request.transcript_id:
+        transcript = await asyncio.to_thread(transcript_index.get_transcript, request.transcript_id)
+        if transcript is None:
+            raise HTTPException(status_code=404, detail="스크립트를 찾을 수 없습니다.")
+        if not content:
+            # 요청에 콘텐츠가 없을 때만 저장된 스크립트 사용 (세그먼트 경계에서 구간을 나눔)
+            segments = transcript["segments"]
+            content = segments.text
+        title = title or transcript["title"]
+    error = evaluation_content_error(content)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    
+    long_content = request.long_content
+    if long_content is None:
+        long_content = len(content) > EVALUATION_LONG_CONTENT_CHARS
+    long_content = long_content and request.evaluation_type != "simple"
+    return content, title, segments, long_content
 
 @app.post("/evaluate/content", response_model=ContentEvaluationResponse)
 async def evaluate_content(request: ContentEvaluationRequest):
-    """Claude CLI를 사용하여 콘텐츠 평가"""
-    import time
+    """
+    Claude CLI를 사용하여 콘텐츠 평가
+    
+    CLI는 비동기 서브프로세스로 실행되어 평가 중에도 다른 요청을 처리하고,
+    같은 콘텐츠의 평가 결과는 캐시에서, 진행 중인 같은 평가는 그 결과를 함께 받는다.
+    긴 콘텐츠는 구간별로 동시에 평가한 뒤 합친다 (응답 시간이 전체 길이가 아닌 가장 느린 구간 + 합치기에 비례).
+    """
     start_time = time.time()
+    content, title, segments, long_content = await resolve_evaluation_input(request)
+    
+    # 터미널에 요청 내용 출력
+    print("\n" + "="*80)
+    print("[콘텐츠 평가 요청]")
+    print(f"시간: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"평가기: {evaluation_service.evaluator.name}")
+    print(f"평가 타입: {request.evaluation_type}")
+    if title:
+        print(f"제목: {title}")
+    if request.category:
+        print(f"카테고리: {request.category}")
+    print(f"콘텐츠 길이: {len(content)} 문자" + (" (구간별 평가)" if long_content else ""))
+    print("="*80)
     
     try:
-        
-        # 평가 프롬프트 생성
-        if request.evaluation_type == "simple":
-            prompt = f"""콘텐츠: {request.content}
-
-YouTube 영상 콘텐츠로서 1-10점 평가:
-- 재미도 (시청자가 재미있어할까?)
-- 정보성 (유용한 정보를 제공하는가?)
-- 바이럴 가능성 (공유하고 싶은 콘텐츠인가?)
-- 제작 난이도 (실제 만들기 어려운가?)
-
-JSON 형식으로 응답해주세요."""
-        else:  # comprehensive
-            prompt = f"""다음 콘텐츠를 객관적으로 평가해주세요.
-
-콘텐츠: {request.content}
-{f'제목: {request.title}' if request.title else ''}
-{f'카테고리: {request.category}' if request.category else ''}
-
-다음 기준으로 1-10점 척도로 평가하고 구체적인 이유를 제시해주세요:
-
-1. 재미도 (Entertainment Value): 시청자의 흥미를 유발하고 지속시킬 수 있는가?
-2. 사실성 (Factual Accuracy): 정보의 정확성과 신뢰성은 어떠한가?
-3. 흥미도 (Engagement Level): 시청자가 끝까지 볼 가능성은 얼마나 되는가?
-4. 독창성 (Originality): 기존 콘텐츠와 차별화되는 독특한 요소가 있는가?
-5. 실용성 (Practical Value): 시청자에게 실질적 도움이나 가치를 제공하는가?
-6. 트렌드 적합성 (Trend Relevance): 현재 트렌드와 얼마나 잘 맞는가?
-7. 타겟 명확성 (Target Clarity): 목표 시청자층이 명확하고 그들에게 적합한가?
-8. 제작 가능성 (Production Feasibility): 실제 제작이 현실적으로 가능한가?
-
-JSON 형식으로 응답해주세요:
-{{
-  "총평": "한 문장 종합 평가",
-  "점수": {{
-    "재미도": {{"점수": 0, "이유": ""}},
-    "사실성": {{"점수": 0, "이유": ""}},
-    "흥미도": {{"점수": 0, "이유": ""}},
-    "독창성": {{"점수": 0, "이유": ""}},
-    "실용성": {{"점수": 0, "이유": ""}},
-    "트렌드_적합성": {{"점수": 0, "이유": ""}},
-    "타겟_명확성": {{"점수": 0, "이유": ""}},
-    "제작_가능성": {{"점수": 0, "이유": ""}}
-  }},
-  "평균_점수": 0,
-  "강점": ["강점1", "강점2"],
-  "개선점": ["개선점1", "개선점2"],
-  "추천_액션": "구체적인 다음 단계 제안"
-}}"""
-
-        # Claude CLI 명령어 구성
-        cmd = [
-            "claude",
-            "-p",
-            prompt
-        ]
-        
-        # 터미널에 요청 내용 출력
-        print("\n" + "="*80)
-        print("[Claude CLI 요청]")
-        print(f"시간: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"평가 타입: {request.evaluation_type}")
-        if request.title:
-            print(f"제목: {request.title}")
-        if request.category:
-            print(f"카테고리: {request.category}")
-        print(f"콘텐츠 길이: {len(request.content)} 문자")
-        print(f"프롬프트 길이: {len(prompt)} 문자")
-        print("명령어:", ' '.join(cmd[:3]) + " [프롬프트 생략]")
-        print("="*80)
-        
-        logger.info(f"Claude CLI 호출 시작")
-        
-        # subprocess로 Claude CLI 실행
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60  # 60초 타임아웃
-        )
-        
-        if result.returncode != 0:
-            logger.error(f"Claude CLI 오류: {result.stderr}")
-            print(f"\n[오류] Claude CLI 실행 실패: {result.stderr}")
-            print("="*80 + "\n")
-            raise Exception(f"Claude CLI 실행 실패: {result.stderr}")
-        
-        # JSON 파싱
-        try:
-            # Claude CLI의 출력에서 JSON 부분만 추출
-            output = result.stdout.strip()
-            
-            # JSON 부분만 추출 (코드블록 제거)
-            if '```json' in output:
-                json_start = output.find('```json') + 7
-                json_end = output.find('```', json_start)
-                output = output[json_start:json_end].strip()
-            elif output.startswith('{'):
-                pass  # 이미 JSON 형태
-            else:
-                # JSON 찾기
-                json_start = output.find('{')
-                json_end = output.rfind('}') + 1
-                if json_start != -1 and json_end > json_start:
-                    output = output[json_start:json_end]
-                else:
-                    raise ValueError("Claude CLI가 JSON 형식으로 응답하지 않았습니다.")
-            
-            evaluation_data = json.loads(output)
-            
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
-            logger.error(f"JSON 파싱 오류: {e}")
-            logger.error(f"원본 응답: {result}")
-            raise Exception(f"응답 파싱 실패: {str(e)}")
-        
-        processing_time = time.time() - start_time
-        logger.info(f"콘텐츠 평가 완료: {processing_time:.2f}초")
-        
-        # 터미널에 결과 요약 출력
-        print(f"\n[성공] Claude CLI 응답 수신")
-        print(f"처리 시간: {processing_time:.2f}초")
-        if 'total_score' in evaluation_data or '평균_점수' in evaluation_data:
-            score = evaluation_data.get('total_score') or evaluation_data.get('평균_점수', 0)
-            print(f"평가 점수: {score}/10")
-        if '총평' in evaluation_data:
-            print(f"총평: {evaluation_data['총평']}")
-        print("="*80 + "\n")
-        
-        # Claude CLI의 원본 텍스트 응답도 함께 반환
-        return ContentEvaluationResponse(
-            success=True,
-            evaluation=evaluation_data,
-            processing_time=processing_time,
-            result=result.stdout.strip()  # 원본 텍스트 응답 추가
-        )
-        
-    except subprocess.TimeoutExpired:
+        if long_content:
+            outcome = await evaluation_service.evaluate_long(
+                content,
+                title=title,
+                category=request.category,
+                segments=segments
+            )
+        else:
+            outcome = await evaluation_service.evaluate(
+                content,
+                title=title,
+                category=request.category,
+                evaluation_type=request.evaluation_type
+            )
+    except EvaluationTimeout as e:
         logger.error("Claude CLI 타임아웃")
-        print(f"\n[오류] Claude CLI 타임아웃 (60초 초과)")
+        print(f"\n[오류] {e}")
         print("="*80 + "\n")
         return ContentEvaluationResponse(
             success=False,
@@ -840,6 +1586,163 @@ JSON 형식으로 응답해주세요:
             error=str(e),
             processing_time=time.time() - start_time
         )
+    
+    evaluation_data = outcome["evaluation"]
+    processing_time = time.time() - start_time
+    logger.info(f"콘텐츠 평가 완료: {processing_time:.2f}초 (캐시: {outcome['from_cache']}, 합침: {outcome['coalesced']})")
+    
+    # 터미널에 결과 요약 출력
+    source = "캐시" if outcome["from_cache"] else ("진행 중인 평가 공유" if outcome["coalesced"] else "평가기")
+    print(f"\n[성공] 평가 결과 수신 ({source})")
+    print(f"처리 시간: {processing_time:.2f}초")
+    if outcome.get("chunks"):
+        print(f"구간 수: {len(outcome['chunks'])}")
+    if 'total_score' in evaluation_data or '평균_점수' in evaluation_data:
+        score = evaluation_data.get('total_score') or evaluation_data.get('평균_점수', 0)
+        print(f"평가 점수: {score}/10")
+    if '총평' in evaluation_data:
+        print(f"총평: {evaluation_data['총평']}")
+    print("="*80 + "\n")
+    
+    # Claude CLI의 원본 텍스트 응답도 함께 반환
+    return ContentEvaluationResponse(
+        success=True,
+        evaluation=evaluation_data,
+        processing_time=processing_time,
+        result=outcome["result"],
+        from_cache=outcome["from_cache"],
+        chunks=outcome.get("chunks")
+    )
+
+def format_sse(event: dict) -> str:
+    """평가 이벤트를 Server-Sent Events 형식으로 변환 (event 이름 + JSON data)"""
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.post("/evaluate/content/stream")
+async def evaluate_content_stream(request: ContentEvaluationRequest):
+    """
+    Claude CLI를 사용하여 콘텐츠 평가 (Server-Sent Events 스트리밍)
+    
+    CLI를 stream-json 출력 모드로 실행해 응답이 생성되는 대로 전달한다.
+    - delta: 응답 텍스트 조각 {"text"}
+    - field: 완성된 최상위 JSON 필드 {"name", "value"} (총평, 점수 등)
+    - chunk: 긴 콘텐츠의 구간 평가 완료 {"index", "total", "start", "end", "평균_점수", "요약"}
+    - done: 검증된 최종 결과 (POST /evaluate/content 응답 형식 + missing_fields)
+    - error: 평가 실패 {"error", "processing_time"}
+    
+    연결이 끊겨도 평가는 끝까지 진행되어 캐시된다 (같은 평가를 기다리는 요청도 결과를 받음).
+    """
+    start_time = time.time()
+    content, title, segments, long_content = await resolve_evaluation_input(request)
+    logger.info(f"스트리밍 콘텐츠 평가 시작: {len(content)}자" + (" (구간별 평가)" if long_content else ""))
+    
+    if long_content:
+        events = evaluation_service.evaluate_long_stream(content, title=title, category=request.category, segments=segments)
+    else:
+        events = evaluation_service.evaluate_stream(
+            content, title=title, category=request.category, evaluation_type=request.evaluation_type
+        )
+    
+    async def event_stream():
+        try:
+            async for event in events:
+                if event["event"] == "done":
+                    processing_time = time.time() - start_time
+                    logger.info(f"스트리밍 콘텐츠 평가 완료: {processing_time:.2f}초 (캐시: {event['from_cache']})")
+                    event = {
+                        "event": "done",
+                        **ContentEvaluationResponse(
+                            success=True,
+                            evaluation=event["evaluation"],
+                            processing_time=processing_time,
+                            result=event["result"],
+                            from_cache=event["from_cache"],
+                            chunks=event.get("chunks")
+                        ).model_dump(),
+                        "missing_fields": event["missing_fields"]
+                    }
+                yield format_sse(event)
+        except EvaluationTimeout:
+            logger.error("Claude CLI 타임아웃 (스트리밍)")
+            yield format_sse({"event": "error", "error": "평가 처리 시간이 초과되었습니다.", "processing_time": time.time() - start_time})
+        except Exception as e:
+            logger.error(f"스트리밍 콘텐츠 평가 실패: {str(e)}")
+            yield format_sse({"event": "error", "error": str(e), "processing_time": time.time() - start_time})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class BatchEvaluationItem(BaseModel):
+    content: str
+    title: Optional[str] = None
+    category: Optional[str] = None
+    evaluation_type: Optional[str] = None  # 없으면 요청의 evaluation_type
+    long_content: Optional[bool] = None  # 구간별 평가 후 합치기 (None이면 EVALUATION_LONG_CONTENT_CHARS 초과 시 자동)
+
+class BatchEvaluationRequest(BaseModel):
+    items: List[BatchEvaluationItem]
+    evaluation_type: Optional[str] = "comprehensive"  # comprehensive, simple
+    workers: Optional[int] = None  # 동시에 진행할 평가 수 (없으면 EVALUATION_BATCH_WORKERS)
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """
+    여러 콘텐츠 일괄 평가 (NDJSON 스트리밍)
+    
+    같은 콘텐츠는 한 번만 평가하고, 캐시된 항목은 바로, 나머지는 평가가 끝나는 대로 한 줄씩 반환한다.
+    - {"type": "item", "index", "success", "evaluation", "error", "from_cache", "deduplicated", "latency", "completed_at"}
+    - 마지막 줄 {"type": "summary", "items", "succeeded", "failed", "cache_hits", "deduplicated", "elapsed", "throughput", "latency"}
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="평가할 항목이 없습니다.")
+    if len(request.items) > EVALUATION_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {EVALUATION_BATCH_MAX_ITEMS}개까지 평가할 수 있습니다.")
+    
+    # 평가할 수 없는 항목은 평가기 자리를 차지하지 않고 해당 줄에 오류로 반환
+    items = []
+    for item in request.items:
+        error = evaluation_content_error(item.content)
+        if error:
+            items.append({"content": item.content, "error": error})
+            continue
+        evaluation_type = item.evaluation_type or request.evaluation_type
+        long_content = item.long_content
+        if long_content is None:
+            long_content = len(item.content) > EVALUATION_LONG_CONTENT_CHARS
+        items.append({
+            "content": item.content,
+            "title": item.title,
+            "category": item.category,
+            "evaluation_type": evaluation_type,
+            "long_content": long_content and evaluation_type != "simple"
+        })
+    logger.info(f"일괄 콘텐츠 평가 시작: {len(items)}개 항목")
+    events = evaluation_service.evaluate_batch(items, request.workers or EVALUATION_BATCH_WORKERS)
+    
+    async def line_stream():
+        try:
+            async for event in events:
+                if event["type"] == "summary":
+                    logger.info(
+                        f"일괄 콘텐츠 평가 완료: {event['items']}개 항목, {event['elapsed']:.2f}초 "
+                        f"(성공 {event['succeeded']}, 실패 {event['failed']}, 캐시 {event['cache_hits']}, 중복 {event['deduplicated']})"
+                    )
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(line_stream(), media_type="application/x-ndjson")
+
+@app.get("/evaluate/stats")
+async def get_evaluation_stats():
+    """콘텐츠 평가 서비스 상태 (평가기, 동시 실행 수, 캐시 적중/합친 요청 수)"""
+    return evaluation_service.get_stats()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,476 @@
+"""
+Whisper.cpp 모델 목록 모듈
+models 디렉토리를 한 번 읽어 모델 파일 정보(크기, 체크섬, 구조, 양자화 형식)를 기록하고,
+디렉토리/파일 수정 시각이 바뀌었을 때만 다시 읽는다
+
+모델 이름은 파일 이름에서 정한다:
+    ggml-large-v3.bin       -> large-v3
+    ggml-large-v3-q5_0.bin  -> large-v3:q5_0 (quantize 도구로 만든 양자화 모델)
+
+사용법:
+    python model_registry.py list
+    python model_registry.py quantize large-v3 q5_0   # 양자화 모델 생성 후 속도 측정
+    python model_registry.py bench large-v3:q5_0      # 인코더 속도 측정
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import struct
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+GGML_FILE_MAGIC = 0x67676d6c  # "ggml"
+GGML_QNT_VERSION_FACTOR = 1000
+
+# ggml_ftype 값 -> 이름 (ggml/include/ggml.h)
+_FTYPE_NAMES = {
+    0: "f32", 1: "f16", 2: "q4_0", 3: "q4_1", 7: "q8_0", 8: "q5_0", 9: "q5_1",
+    10: "q2_k", 11: "q3_k", 12: "q4_k", 13: "q5_k", 14: "q6_k"
+}
+# quantize 도구가 지원하는 형식
+QUANTIZATION_TYPES = ("q4_0", "q4_1", "q5_0", "q5_1", "q8_0", "q2_k", "q3_k", "q4_k", "q5_k", "q6_k")
+
+# 오디오 인코더 층 수 -> 모델 구조 (src/whisper.cpp)
+_ARCHITECTURES = {4: "tiny", 6: "base", 12: "small", 24: "medium", 32: "large"}
+
+# 큰 모델 이름 요청 시 찾아볼 파일 순서 (large -> large-v3 우선)
+_MODEL_ALIASES = {"large": ["large-v3", "large-v1", "large"]}
+
+_MODEL_FILE_PATTERN = re.compile(
+    r"^(?P<test>for-tests-)?ggml-(?P<base>.+?)(?:-(?P<quant>q\d_(?:[01]|k)))?\.bin$"
+)
+_ENCODE_TIME_PATTERN = re.compile(r"encode time\s*=\s*([\d.]+)\s*ms")
+
+# 측정 속도 이동 평균 가중치 (최근 실행 비중)
+_SPEED_SMOOTHING = 0.3
+
+
+def _hash_file(path: Path) -> str:
+    """파일 SHA-256 체크섬"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_ggml_header(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    ggml 모델 파일 헤더 읽기
+    
+    Returns:
+        {"architecture", "quantization", "n_vocab", "n_mels", "n_audio_layer", "n_text_layer", "qnt_version"}
+        (ggml 형식이 아니면 None)
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(4 + 11 * 4)
+    except OSError:
+        return None
+    if len(header) < 48 or struct.unpack("<I", header[:4])[0] != GGML_FILE_MAGIC:
+        return None
+    
+    (n_vocab, n_audio_ctx, n_audio_state, n_audio_head, n_audio_layer,
+     n_text_ctx, n_text_state, n_text_head, n_text_layer, n_mels, ftype) = struct.unpack("<11i", header[4:48])
+    
+    return {
+        "architecture": _ARCHITECTURES.get(n_audio_layer, "unknown"),
+        "quantization": _FTYPE_NAMES.get(ftype % GGML_QNT_VERSION_FACTOR, f"ftype{ftype % GGML_QNT_VERSION_FACTOR}"),
+        "qnt_version": ftype // GGML_QNT_VERSION_FACTOR,
+        "n_vocab": n_vocab,
+        "n_mels": n_mels,
+        "n_audio_layer": n_audio_layer,
+        "n_text_layer": n_text_layer
+    }
+
+
+class ModelRegistry:
+    """
+    ggml 모델 파일 목록
+    
+    디렉토리나 모델 파일의 수정 시각이 바뀌면(파일 추가/삭제/이름 변경/덮어쓰기) 다시 읽고, 크기와 수정 시각이 같은 파일은
+    이전 정보를 그대로 사용한다. 체크섬은 whisper.cpp/models-registry.json에 저장하여 재시작 후에도 유지한다.
+    측정 속도는 음성 인식마다 갱신되므로 whisper.cpp/models-speed.db(SQLite)에 한 행씩 갱신한다
+    (여러 워커가 동시에 기록해도 서로의 측정값을 덮어쓰지 않음).
+    """
+    
+    def __init__(self, whisper_cpp_dir: Optional[Path] = None, models_dir: Optional[Path] = None):
+        self.base_dir = Path(whisper_cpp_dir) if whisper_cpp_dir else Path(__file__).parent / "whisper.cpp"
+        self.models_dir = Path(models_dir) if models_dir else self.base_dir / "models"
+        self.bin_dir = self.base_dir / "build" / "bin"
+        # models 디렉토리 밖에 두어 상태 저장이 디렉토리 수정 시각을 바꾸지 않게 함
+        self.state_file = self.base_dir / "models-registry.json"
+        self.speed_file = self.base_dir / "models-speed.db"
+        
+        self._lock = threading.RLock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._dir_mtime: Optional[float] = None
+        self._state: Dict[str, Dict[str, Any]] = {}  # 파일 이름 -> {size, mtime, sha256}
+        self._state_loaded = False
+        
+        # 스레드별 SQLite 연결 (측정 속도)
+        self._local = threading.local()
+        self._speed_ready = False
+    
+    def _load_state(self):
+        if self._state_loaded:
+            return
+        self._state_loaded = True
+        try:
+            self._state = json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._state = {}
+    
+    def _save_state(self):
+        """상태 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".partial")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            logger.warning(f"모델 목록 상태 저장 실패: {e}")
+    
+    def _connect_speed(self) -> sqlite3.Connection:
+        """현재 스레드의 측정 속도 DB 연결 반환 (WAL 모드, 처음 사용 시 테이블 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.speed_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.speed_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._speed_ready:
+            with self._lock:
+                if not self._speed_ready:
+                    # 파일 크기/수정 시각이 바뀌면(같은 이름으로 덮어쓴 모델) 새 행에서 다시 측정
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS model_speed (
+                            file_name TEXT NOT NULL,
+                            size INTEGER NOT NULL,
+                            mtime REAL NOT NULL,
+                            realtime_factor REAL,
+                            runs INTEGER NOT NULL DEFAULT 0,
+                            encode_ms REAL,
+                            bench_threads INTEGER,
+                            updated_at REAL,
+                            PRIMARY KEY (file_name, size, mtime)
+                        )
+                    """)
+                    self._speed_ready = True
+        return conn
+    
+    def _file_key(self, model: Dict[str, Any]) -> Optional[tuple]:
+        """측정 속도 행 키 (파일 이름, 크기, 수정 시각)"""
+        file_name = Path(model["path"]).name
+        size = self._state.get(file_name, {}).get("size")
+        return (file_name, size, model["mtime"]) if size is not None else None
+    
+    def _get_speed(self, model: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """모델 파일의 측정 속도 (기록이 없으면 None)"""
+        key = self._file_key(model)
+        if key is None:
+            return None
+        try:
+            row = self._connect_speed().execute(
+                "SELECT realtime_factor, runs, updated_at, encode_ms, bench_threads FROM model_speed "
+                "WHERE file_name = ? AND size = ? AND mtime = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"모델 측정 속도 조회 실패: {e}")
+            return None
+        if row is None:
+            return None
+        return {name: row[name] for name in row.keys() if row[name] is not None}
+    
+    def _is_unchanged(self, dir_mtime: float) -> bool:
+        """디렉토리와 알려진 모델 파일의 수정 시각이 마지막으로 읽었을 때와 같은지 확인"""
+        if dir_mtime != self._dir_mtime:
+            return False
+        for model in self._models.values():
+            try:
+                if os.stat(model["path"]).st_mtime != model["mtime"]:
+                    return False  # 같은 이름으로 덮어쓴 파일
+            except OSError:
+                return False
+        return True
+    
+    def _refresh(self):
+        """디렉토리나 모델 파일이 바뀌었으면 다시 읽기"""
+        try:
+            dir_mtime = self.models_dir.stat().st_mtime
+        except OSError:
+            self._models, self._dir_mtime = {}, None
+            return
+        if self._is_unchanged(dir_mtime):
+            return
+        
+        self._load_state()
+        models = {}
+        for path in self.models_dir.glob("*.bin"):
+            match = _MODEL_FILE_PATTERN.match(path.name)
+            if not match:
+                continue
+            stat = path.stat()
+            state = self._state.get(path.name, {})
+            if state.get("size") != stat.st_size or state.get("mtime") != stat.st_mtime:
+                # 새 파일이거나 내용이 바뀐 파일 - 체크섬을 다시 구함 (측정 속도는 크기/수정 시각별로 따로 기록)
+                state = {"size": stat.st_size, "mtime": stat.st_mtime}
+                self._state[path.name] = state
+            
+            header = read_ggml_header(path)
+            name = match.group("base")
+            if match.group("quant"):
+                name = f"{name}:{match.group('quant')}"
+            if match.group("test"):
+                name = f"for-tests-{name}"
+            
+            models[name] = {
+                "name": name,
+                "path": str(path),
+                "size_mb": round(stat.st_size / (1024 * 1024), 1),
+                "mtime": stat.st_mtime,
+                "architecture": header["architecture"] if header else "unknown",
+                "quantization": header["quantization"] if header else None,
+                "header": header,
+                "is_test_model": bool(match.group("test"))
+            }
+        
+        # 삭제된 파일 상태 정리
+        for file_name in list(self._state):
+            if not (self.models_dir / file_name).exists():
+                del self._state[file_name]
+        
+        self._models = models
+        self._dir_mtime = dir_mtime
+        logger.info(f"Whisper.cpp 모델 {len(models)}개 확인: {', '.join(sorted(models))}")
+    
+    def _with_state(self, model: Dict[str, Any]) -> Dict[str, Any]:
+        """모델 정보에 체크섬, 측정 속도 추가"""
+        state = self._state.get(Path(model["path"]).name, {})
+        return {**model, "sha256": state.get("sha256"), "speed": self._get_speed(model)}
+    
+    def list_models(self, include_test_models: bool = False) -> List[Dict[str, Any]]:
+        """
+        모델 목록 (이름순)
+        
+        Args:
+            include_test_models: for-tests 모델 포함 여부
+        """
+        with self._lock:
+            self._refresh()
+            return [
+                self._with_state(model) for name, model in sorted(self._models.items())
+                if include_test_models or not model["is_test_model"]
+            ]
+    
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """이름이 정확히 일치하는 모델 정보"""
+        with self._lock:
+            self._refresh()
+            model = self._models.get(name)
+            return self._with_state(model) if model else None
+    
+    def resolve(self, model_size: str) -> Optional[Dict[str, Any]]:
+        """
+        요청된 모델 이름에 해당하는 모델 찾기
+        
+        "large"는 large-v3, large-v1 순으로, 이름이 없으면 영어 전용(.en), for-tests 모델 순으로 찾는다.
+        ":q5_0"처럼 양자화 형식을 붙이면 해당 양자화 모델만 찾는다.
+        
+        Args:
+            model_size: 모델 이름 (예: large, large-v3, large-v3:q5_0)
+        
+        Returns:
+            모델 정보 또는 None
+        """
+        base, _, quant = model_size.partition(":")
+        suffix = f":{quant}" if quant else ""
+        candidates = []
+        for name in _MODEL_ALIASES.get(base, [base]):
+            candidates.extend([f"{name}{suffix}", f"{name}.en{suffix}"])
+        candidates.append(f"for-tests-{base}{suffix}")
+        
+        with self._lock:
+            self._refresh()
+            for candidate in candidates:
+                if candidate in self._models:
+                    return self._with_state(self._models[candidate])
+        return None
+    
+    def compute_checksums(self):
+        """체크섬이 없는 모델 파일의 체크섬 계산 (서버 시작 후 백그라운드에서 호출)"""
+        with self._lock:
+            self._refresh()
+            pending = [
+                Path(model["path"]) for model in self._models.values()
+                if not self._state.get(Path(model["path"]).name, {}).get("sha256")
+            ]
+        if not pending:
+            return
+        
+        for path in pending:
+            try:
+                checksum = _hash_file(path)
+            except OSError as e:
+                logger.warning(f"모델 체크섬 계산 실패: {path.name} ({e})")
+                continue
+            with self._lock:
+                if path.name in self._state:
+                    self._state[path.name]["sha256"] = checksum
+        with self._lock:
+            self._save_state()
+        logger.info(f"모델 체크섬 계산 완료: {len(pending)}개")
+    
+    def record_speed(self, name: str, audio_seconds: float, processing_seconds: float):
+        """
+        실제 음성 인식 속도 기록 (오디오 길이 / 처리 시간, 이동 평균)
+        
+        이동 평균은 SQL 한 문장으로 갱신하므로 여러 워커가 동시에 기록해도 측정값이 빠지지 않는다.
+        
+        Args:
+            name: 모델 이름
+            audio_seconds: 처리한 오디오 길이 (초)
+            processing_seconds: 처리 시간 (초)
+        """
+        if audio_seconds <= 0 or processing_seconds <= 0:
+            return
+        realtime_factor = audio_seconds / processing_seconds
+        with self._lock:
+            model = self._models.get(name)
+            key = self._file_key(model) if model else None
+        if key is None:
+            return
+        try:
+            self._connect_speed().execute("""
+                INSERT INTO model_speed (file_name, size, mtime, realtime_factor, runs, updated_at)
+                VALUES (?, ?, ?, ROUND(?, 2), 1, ?)
+                ON CONFLICT (file_name, size, mtime) DO UPDATE SET
+                    realtime_factor = ROUND(CASE
+                        WHEN realtime_factor IS NULL THEN excluded.realtime_factor
+                        ELSE realtime_factor + ? * (? - realtime_factor)
+                    END, 2),
+                    runs = runs + 1,
+                    updated_at = excluded.updated_at
+            """, (*key, realtime_factor, time.time(), _SPEED_SMOOTHING, realtime_factor))
+        except sqlite3.Error as e:
+            logger.warning(f"모델 측정 속도 기록 실패: {name} ({e})")
+    
+    def benchmark(self, name: str, threads: int = 4) -> Optional[float]:
+        """
+        whisper-bench로 인코더 실행 시간 측정 후 기록
+        
+        Returns:
+            인코더 1회 실행 시간 (ms), 측정 실패 시 None
+        """
+        model = self.get(name)
+        bench_bin = self.bin_dir / "whisper-bench"
+        if model is None or not bench_bin.exists():
+            logger.warning(f"속도 측정 불가: {name} (모델 또는 whisper-bench 없음)")
+            return None
+        
+        result = subprocess.run(
+            [str(bench_bin), "-m", model["path"], "-t", str(threads)],
+            capture_output=True, text=True, check=False
+        )
+        match = _ENCODE_TIME_PATTERN.search(result.stderr + result.stdout)
+        if result.returncode != 0 or not match:
+            logger.warning(f"whisper-bench 실패: {name} ({result.stderr[-300:]})")
+            return None
+        
+        encode_ms = float(match.group(1))
+        key = self._file_key(model)
+        if key is not None:
+            self._connect_speed().execute("""
+                INSERT INTO model_speed (file_name, size, mtime, encode_ms, bench_threads, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (file_name, size, mtime) DO UPDATE SET
+                    encode_ms = excluded.encode_ms,
+                    bench_threads = excluded.bench_threads,
+                    updated_at = excluded.updated_at
+            """, (*key, encode_ms, threads, time.time()))
+        logger.info(f"{name} 인코더 실행 시간: {encode_ms:.1f}ms (스레드 {threads}개)")
+        return encode_ms
+    
+    def quantize(self, name: str, quantization: str) -> Dict[str, Any]:
+        """
+        quantize 도구로 양자화 모델 생성 (ggml-<이름>-<형식>.bin)
+        
+        Args:
+            name: 원본 모델 이름 (예: large-v3)
+            quantization: 양자화 형식 (예: q5_0, q8_0)
+        
+        Returns:
+            생성된 모델 정보
+        """
+        if quantization not in QUANTIZATION_TYPES:
+            raise ValueError(f"지원하지 않는 양자화 형식: {quantization} (가능: {', '.join(QUANTIZATION_TYPES)})")
+        source = self.get(name)
+        if source is None:
+            raise FileNotFoundError(f"모델을 찾을 수 없습니다: {name}")
+        quantize_bin = self.bin_dir / "quantize"
+        if not quantize_bin.exists():
+            raise FileNotFoundError(f"quantize 도구를 찾을 수 없습니다: {quantize_bin}")
+        
+        output_path = self.models_dir / f"ggml-{name}-{quantization}.bin"
+        subprocess.run([str(quantize_bin), source["path"], str(output_path), quantization], check=True)
+        
+        quantized = self.get(f"{name}:{quantization}")
+        if quantized is None:
+            raise RuntimeError(f"양자화 모델이 생성되지 않았습니다: {output_path}")
+        logger.info(f"양자화 모델 생성: {quantized['name']} ({source['size_mb']}MB -> {quantized['size_mb']}MB)")
+        return quantized
+
+
+# 전역 모델 목록 인스턴스
+model_registry = ModelRegistry()
+
+
+def main():
+    """명령줄 실행 (list/quantize/bench)"""
+    parser = argparse.ArgumentParser(description="Whisper.cpp 모델 목록 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    subparsers.add_parser("list", help="모델 목록 출력 (체크섬 계산 포함)")
+    
+    quantize_parser = subparsers.add_parser("quantize", help="양자화 모델 생성 후 원본과 속도 비교")
+    quantize_parser.add_argument("model", help="원본 모델 이름 (예: large-v3)")
+    quantize_parser.add_argument("type", choices=QUANTIZATION_TYPES, help="양자화 형식")
+    quantize_parser.add_argument("--threads", type=int, default=4, help="속도 측정 스레드 수")
+    
+    bench_parser = subparsers.add_parser("bench", help="인코더 속도 측정")
+    bench_parser.add_argument("model", help="모델 이름 (예: large-v3:q5_0)")
+    bench_parser.add_argument("--threads", type=int, default=4, help="스레드 수")
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    
+    if args.command == "list":
+        model_registry.compute_checksums()
+        print(json.dumps(model_registry.list_models(include_test_models=True), ensure_ascii=False, indent=2))
+    elif args.command == "quantize":
+        quantized = model_registry.quantize(args.model, args.type)
+        model_registry.benchmark(args.model, args.threads)
+        model_registry.benchmark(quantized["name"], args.threads)
+        print(json.dumps([model_registry.get(args.model), model_registry.get(quantized["name"])], ensure_ascii=False, indent=2))
+    else:
+        model_registry.benchmark(args.model, args.threads)
+        print(json.dumps(model_registry.get(args.model), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
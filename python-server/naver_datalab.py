@@ -5,11 +5,14 @@
 
 import os
 import json
+import time
 import requests
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
+from cache_manager import cache_manager
+
 logger = logging.getLogger(__name__)
 
 class NaverDataLabService:
@@ -47,6 +50,13 @@ class NaverDataLabService:
             if not end_date:
                 end_date = datetime.now().strftime("%Y-%m-%d")
             
+            # 같은 키워드/기간의 응답이 캐시되어 있으면 재사용
+            cache_key = json.dumps([keywords, start_date, end_date], ensure_ascii=False)
+            cached_trends = cache_manager.get_value("naver", cache_key)
+            if cached_trends is not None:
+                logger.info(f"캐시된 네이버 트렌드 사용: {keywords}")
+                return cached_trends
+            
             # API 요청 데이터 구성
             request_data = {
                 "startDate": start_date,
@@ -69,6 +79,7 @@ class NaverDataLabService:
             
             logger.info(f"네이버 데이터랩 API 호출: {keywords}")
             
+            request_start_time = time.time()
             response = requests.post(
                 f"{self.base_url}/search",
                 headers=headers,
@@ -78,7 +89,9 @@ class NaverDataLabService:
             if response.status_code == 200:
                 data = response.json()
                 logger.info("네이버 API 호출 성공 - 실제 데이터 반환")
-                return self._process_trend_data(data, keywords)
+                trends = self._process_trend_data(data, keywords)
+                cache_manager.put_value("naver", cache_key, trends, cost_seconds=time.time() - request_start_time)
+                return trends
             else:
                 logger.error(f"네이버 API 오류: {response.status_code} - {response.text}")
                 logger.info("API 오류로 인해 시뮬레이션 데이터 반환")
@@ -0,0 +1,316 @@
+"""
+중복 스크립트 탐지 모듈
+재업로드, 짜깁기, 리액션 영상처럼 내용이 거의 같은 스크립트를 MinHash 서명과 LSH(밴드별 버킷) 색인으로 찾기
+후보는 버킷이 겹치는 스크립트만 비교하므로 스크립트 수와 관계없이 빠르게 찾는다
+"""
+
+import re
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from constants import (
+    NEAR_DUPLICATE_INDEX_FILE,
+    NEAR_DUPLICATE_THRESHOLD,
+    NEAR_DUPLICATE_PREFIX_SECONDS,
+    MINHASH_NUM_PERM,
+    MINHASH_LSH_BANDS,
+    MINHASH_SHINGLE_CHARS
+)
+from segment_array import SegmentArray
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 31) - 1  # 순열 해시 모듈러 (a * x가 uint64를 넘지 않음)
+_MIN_SHINGLES = 20  # 이보다 짧은 텍스트는 서명을 만들지 않음 (우연히 겹칠 확률이 큼)
+_PERM_CHUNK = 16  # 한 번에 계산할 순열 수 (긴 스크립트의 메모리 사용량 제한)
+_NORMALIZE_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+
+_rng = np.random.RandomState(20240501)  # 고정 시드 - 서버를 다시 시작해도 같은 서명
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=MINHASH_NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=MINHASH_NUM_PERM).astype(np.uint64)
+
+FULL = "full"      # 전체 스크립트 서명
+PREFIX = "prefix"  # 앞부분(NEAR_DUPLICATE_PREFIX_SECONDS) 서명 - 앞부분만 음성 인식해 중복 확인
+
+
+def shingle_hashes(text: str, size: int = MINHASH_SHINGLE_CHARS) -> np.ndarray:
+    """
+    문자 n-gram(공백/문장부호 제거, 소문자) 해시 집합
+    
+    띄어쓰기가 달라도 같은 문장이면 같은 n-gram이 나오도록 글자만 남긴 뒤 겹치는 n글자 조각으로 나눈다.
+    """
+    normalized = _NORMALIZE_PATTERN.sub("", text.lower())
+    if len(normalized) < size:
+        return np.empty(0, dtype=np.uint64)
+    codepoints = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    count = len(codepoints) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = (hashes * np.uint64(1000003) + codepoints[offset:offset + count]) & np.uint64(0xFFFFFFFF)
+    return np.unique(hashes)
+
+
+def minhash_signature(hashes: np.ndarray) -> Optional[np.ndarray]:
+    """
+    MinHash 서명 (MINHASH_NUM_PERM개의 uint32, 두 서명의 같은 위치 값이 일치하는 비율 = 자카드 유사도 추정치)
+    
+    Args:
+        hashes: shingle_hashes 결과
+    
+    Returns:
+        서명 또는 None (텍스트가 너무 짧음)
+    """
+    if len(hashes) < _MIN_SHINGLES:
+        return None
+    values = hashes % np.uint64(_MERSENNE_PRIME)
+    signature = np.empty(MINHASH_NUM_PERM, dtype=np.uint32)
+    for start in range(0, MINHASH_NUM_PERM, _PERM_CHUNK):
+        a = _PERM_A[start:start + _PERM_CHUNK, None]
+        b = _PERM_B[start:start + _PERM_CHUNK, None]
+        signature[start:start + _PERM_CHUNK] = ((a * values[None, :] + b) % np.uint64(_MERSENNE_PRIME)).min(axis=1)
+    return signature
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """LSH 밴드별 버킷 번호 (밴드의 서명 값들이 모두 같아야 같은 버킷)"""
+    rows = signature.reshape(MINHASH_LSH_BANDS, -1)
+    return [
+        int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), "little", signed=True)
+        for row in rows
+    ]
+
+
+class NearDuplicateIndex:
+    def __init__(self, index_file: str = NEAR_DUPLICATE_INDEX_FILE):
+        self.index_file = Path(index_file)
+        
+        # 스레드별 SQLite 연결
+        self._local = threading.local()
+        
+        # 테이블 준비 상태 (처음 사용할 때 생성)
+        self._ready = False
+        self._init_lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 반환 (WAL 모드, 처음 사용 시 테이블 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._init_tables(conn)
+                    self._ready = True
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    def _init_tables(self, conn: sqlite3.Connection):
+        """테이블 생성"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                transcript_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                shingles INTEGER NOT NULL,
+                youtube_url TEXT,
+                video_id TEXT,
+                duration REAL,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (transcript_id, kind)
+            )
+        """)
+        # LSH 버킷 (같은 밴드/버킷에 들어간 스크립트가 후보)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                kind TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                transcript_id TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_lookup ON buckets(kind, band, bucket)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_transcript ON buckets(transcript_id)")
+    
+    def contains(self, transcript_id: str) -> bool:
+        """색인에 있는 스크립트인지 확인"""
+        row = self._connect().execute("SELECT 1 FROM signatures WHERE transcript_id = ? LIMIT 1", (transcript_id,)).fetchone()
+        return row is not None
+    
+    def add_transcript(self, transcript_id: str, segments: SegmentArray, metadata: Dict[str, Any], index_prefix: bool = True):
+        """
+        스크립트 서명을 색인에 추가 (같은 ID가 있으면 교체)
+        
+        Args:
+            transcript_id: 스크립트 ID
+            segments: 세그먼트 배열
+            metadata: youtube_url, video_id, duration
+            index_prefix: 앞부분 서명도 저장 (영상 처음부터 추출한 스크립트만, 구간 스크립트는 제외)
+        """
+        signatures = {FULL: segments.text}
+        if index_prefix:
+            signatures[PREFIX] = segments.slice_time(0.0, NEAR_DUPLICATE_PREFIX_SECONDS).text
+        
+        rows = []
+        for kind, text in signatures.items():
+            hashes = shingle_hashes(text)
+            signature = minhash_signature(hashes)
+            if signature is not None:
+                rows.append((kind, signature, len(hashes)))
+        
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM buckets WHERE transcript_id = ?", (transcript_id,))
+            conn.execute("DELETE FROM signatures WHERE transcript_id = ?", (transcript_id,))
+            for kind, signature, shingles in rows:
+                conn.execute(
+                    """
+                    INSERT INTO signatures (transcript_id, kind, signature, shingles, youtube_url, video_id, duration, added_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        transcript_id, kind, signature.tobytes(), shingles,
+                        metadata.get("youtube_url"), metadata.get("video_id"),
+                        metadata.get("duration") or segments.duration, time.time()
+                    )
+                )
+                conn.executemany(
+                    "INSERT INTO buckets (kind, band, bucket, transcript_id) VALUES (?, ?, ?, ?)",
+                    [(kind, band, bucket, transcript_id) for band, bucket in enumerate(band_buckets(signature))]
+                )
+    
+    def remove_transcript(self, transcript_id: str) -> bool:
+        """스크립트 서명 삭제"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM buckets WHERE transcript_id = ?", (transcript_id,))
+            return conn.execute("DELETE FROM signatures WHERE transcript_id = ?", (transcript_id,)).rowcount > 0
+    
+    def query(
+        self,
+        signature: np.ndarray,
+        kind: str = FULL,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        shingles: Optional[int] = None,
+        exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        서명과 유사한 스크립트 찾기 (LSH 후보만 서명 비교)
+        
+        Args:
+            signature: MinHash 서명
+            kind: 비교할 서명 종류 (FULL 또는 PREFIX)
+            threshold: 최소 자카드 유사도 추정치
+            shingles: 서명을 만든 n-gram 수 (포함 비율 계산용)
+            exclude: 제외할 스크립트 ID (자기 자신)
+        
+        Returns:
+            [{"transcript_id", "similarity", "containment", "youtube_url", "video_id", "duration"}] (유사도 높은 순)
+        """
+        conn = self._connect()
+        conditions = " OR ".join("(band = ? AND bucket = ?)" for _ in range(MINHASH_LSH_BANDS))
+        params: List[Any] = [kind]
+        for band, bucket in enumerate(band_buckets(signature)):
+            params.extend([band, bucket])
+        candidates = {
+            row['transcript_id']
+            for row in conn.execute(f"SELECT DISTINCT transcript_id FROM buckets WHERE kind = ? AND ({conditions})", params)
+        }
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+        
+        placeholders = ",".join("?" * len(candidates))
+        rows = conn.execute(
+            f"SELECT * FROM signatures WHERE kind = ? AND transcript_id IN ({placeholders})",
+            [kind] + list(candidates)
+        ).fetchall()
+        matrix = np.vstack([np.frombuffer(row['signature'], dtype=np.uint32) for row in rows])
+        similarities = (matrix == signature[None, :]).mean(axis=1)
+        
+        results = []
+        for row, similarity in zip(rows, similarities.tolist()):
+            if similarity < threshold:
+                continue
+            result = {
+                "transcript_id": row['transcript_id'],
+                "similarity": round(similarity, 4),
+                "youtube_url": row['youtube_url'],
+                "video_id": row['video_id'],
+                "duration": row['duration']
+            }
+            if shingles:
+                # |A ∩ B| = J / (1 + J) * (|A| + |B|), 짧은 쪽이 긴 쪽에 포함된 비율
+                intersection = similarity / (1 + similarity) * (shingles + row['shingles'])
+                result["containment"] = round(min(1.0, intersection / max(1, min(shingles, row['shingles']))), 4)
+            results.append(result)
+        results.sort(key=lambda result: result["similarity"], reverse=True)
+        return results
+    
+    def find_duplicates(self, transcript_id: str, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Optional[List[Dict[str, Any]]]:
+        """
+        색인된 스크립트와 내용이 거의 같은 스크립트
+        
+        Returns:
+            유사 스크립트 목록 또는 None (색인에 없음)
+        """
+        row = self._connect().execute(
+            "SELECT signature, shingles FROM signatures WHERE transcript_id = ? AND kind = ?", (transcript_id, FULL)
+        ).fetchone()
+        if row is None:
+            return None
+        signature = np.frombuffer(row['signature'], dtype=np.uint32)
+        return self.query(signature, FULL, threshold, row['shingles'], exclude=transcript_id)
+    
+    def find_by_prefix(self, text: str, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Dict[str, Any]]:
+        """
+        영상 앞부분 스크립트로 이미 추출한 영상 찾기 (전체를 음성 인식하기 전에 중복 확인)
+        
+        Args:
+            text: 앞부분(NEAR_DUPLICATE_PREFIX_SECONDS) 스크립트
+            threshold: 최소 유사도
+        """
+        hashes = shingle_hashes(text)
+        signature = minhash_signature(hashes)
+        if signature is None:
+            return []
+        return self.query(signature, PREFIX, threshold, len(hashes))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """색인 통계"""
+        conn = self._connect()
+        counts = {row['kind']: row['count'] for row in conn.execute("SELECT kind, COUNT(*) AS count FROM signatures GROUP BY kind")}
+        return {
+            "transcripts": counts.get(FULL, 0),
+            "prefix_signatures": counts.get(PREFIX, 0),
+            "num_perm": MINHASH_NUM_PERM,
+            "bands": MINHASH_LSH_BANDS,
+            "threshold": NEAR_DUPLICATE_THRESHOLD
+        }
+
+
+# 전역 중복 탐지 색인 인스턴스
+near_duplicate_index = NearDuplicateIndex()
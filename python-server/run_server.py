@@ -1,28 +1,152 @@
 #!/usr/bin/env python3
 """
 YouTube 스크립트 추출 서버 실행 스크립트
+
+사용법:
+    python run_server.py                          # 개발 모드 (단일 프로세스, 코드 변경 시 자동 재시작)
+    python run_server.py --production --workers 4 # 운영 모드 (워커 프로세스 N개)
+    python run_server.py --production --workers 4 --preload large
+                                                  # 모델을 한 번 로드한 뒤 워커들이 공유
 """
 
+import os
+import gc
+import time
+import signal
+import socket
+import argparse
+
 import uvicorn
-from main import app
+
+from constants import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+    MAX_CONCURRENT_TRANSCRIPTIONS,
+    PRELOAD_WHISPER_MODELS
+)
+
+
+def run_preforked(host: str, port: int, workers: int, preload: list):
+    """
+    모델을 미리 로드한 뒤 워커 프로세스를 fork하는 운영 모드
+    
+    uvicorn의 workers 옵션은 워커마다 새 인터프리터를 띄워 main을 다시 import하므로 모델도 워커마다 로드된다.
+    여기서는 감독 프로세스가 모델을 한 번 로드하고 fork하므로 워커들은 가중치 메모리를 copy-on-write로 공유한다
+    (추론은 가중치를 읽기만 하므로 페이지가 복사되지 않음). Whisper.cpp 모델은 공유 whisper-server로 로드된다.
+    감독 프로세스는 종료된 워커를 다시 시작하고, SIGTERM/SIGINT를 받으면 워커와 whisper-server를 종료한다.
+    
+    Args:
+        host: 서버 주소
+        port: 서버 포트
+        workers: 워커 프로세스 수
+        preload: 미리 로드할 모델 크기 목록
+    """
+    import main
+    
+    main.preload_models(preload)
+    # 이후 GC가 fork 전 객체의 헤더를 건드려 공유 페이지가 복사되지 않도록 영구 세대로 이동
+    gc.collect()
+    gc.freeze()
+    
+    # 모든 워커가 같은 소켓에서 연결을 받음
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    
+    children = set()
+    stopping = False
+    
+    def spawn_worker():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            server = uvicorn.Server(uvicorn.Config(main.app, log_level="info"))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children.add(pid)
+    
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    
+    for _ in range(workers):
+        spawn_worker()
+    
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue  # whisper-server 등 워커가 아닌 자식 프로세스
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️ 워커 {pid} 종료됨 (상태 {status}), 다시 시작합니다")
+            time.sleep(1)
+            spawn_worker()
+    
+    main.stop_shared_servers()
+    sock.close()
 
 
 def main():
     """서버 실행 메인 함수"""
+    parser = argparse.ArgumentParser(description="YouTube 스크립트 추출 서버")
+    parser.add_argument("--production", action="store_true", help="운영 모드 (자동 재시작 없이 여러 워커 프로세스로 실행)")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="운영 모드 워커 프로세스 수")
+    parser.add_argument("--host", default=SERVER_HOST, help="서버 주소")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="서버 포트")
+    parser.add_argument(
+        "--preload",
+        default=",".join(PRELOAD_WHISPER_MODELS),
+        help="운영 모드에서 워커 생성 전에 로드할 모델 (쉼표 구분, 워커들이 같은 메모리를 공유)"
+    )
+    args = parser.parse_args()
+    preload = [m.strip() for m in args.preload.split(",") if m.strip()]
+    
     print("🎬 YouTube 스크립트 추출 서버를 시작합니다...")
-    print("📡 서버 주소: http://localhost:15000")
-    print("📚 API 문서: http://localhost:15000/docs")
-    print("🔧 서버 상태: http://localhost:15000/health")
+    print(f"📡 서버 주소: http://localhost:{args.port}")
+    print(f"📚 API 문서: http://localhost:{args.port}/docs")
+    print(f"🔧 서버 상태: http://localhost:{args.port}/health")
+    if args.production:
+        print(f"⚙️ 운영 모드: 워커 {args.workers}개, 워커당 동시 스크립트 추출 {MAX_CONCURRENT_TRANSCRIPTIONS}개")
+        if preload:
+            print(f"📦 미리 로드할 모델: {', '.join(preload)} (워커 간 공유)")
     print("=" * 50)
     
-    uvicorn.run(
-        "main:app",  # import string으로 변경
-        host="0.0.0.0", 
-        port=15000,
-        reload=True,  # 개발 모드에서 코드 변경 시 자동 재시작
-        log_level="info"
-    )
+    if args.production and preload and hasattr(os, "fork"):
+        run_preforked(args.host, args.port, args.workers, preload)
+    elif args.production:
+        # 워커마다 main을 따로 import하므로 OpenAI Whisper 모델은 워커별로 로드되고
+        # (Whisper.cpp 모델은 공유 whisper-server 사용), 캐시는 SQLite 인덱스(WAL)와 파일 잠금으로 워커 간에 조정된다
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",  # import string으로 변경
+            host=args.host,
+            port=args.port,
+            reload=True,  # 개발 모드에서 코드 변경 시 자동 재시작
+            log_level="info"
+        )
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,296 @@
+"""
+세그먼트 배열 모듈
+세그먼트를 dict 목록 대신 시작/끝 시간 배열, 하나의 UTF-8 텍스트 버퍼와 오프셋 배열, 선택적 확률 배열로 보관
+단어 단위 타임스탬프(세그먼트 수만 개)도 세그먼트당 수십 바이트로 저장하고 시간 이동/구간 자르기/병합을 배열 연산으로 처리
+"""
+
+import base64
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from transcript_renderer import Segment
+
+_TIME_DTYPE = np.float64       # 초 단위 시간 (몇 시간짜리 영상도 밀리초 정밀도 유지)
+_OFFSET_DTYPE = np.int64       # 텍스트 버퍼 내 바이트 위치
+_PROBABILITY_DTYPE = np.float32
+
+
+def _encode_array(array: np.ndarray) -> str:
+    """배열을 base64 문자열로 (리틀 엔디언)"""
+    return base64.b64encode(np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<"), copy=False).tobytes()).decode("ascii")
+
+
+def _decode_array(data: str, dtype) -> np.ndarray:
+    """base64 문자열을 배열로"""
+    return np.frombuffer(base64.b64decode(data), dtype=np.dtype(dtype).newbyteorder("<")).astype(dtype)
+
+
+def _record_probability(record: Dict[str, Any]) -> Optional[float]:
+    """세그먼트/단어 dict의 확률 (probability 또는 토큰 p 평균, 없으면 None)"""
+    probability = record.get("probability")
+    if probability is not None:
+        return float(probability)
+    tokens = record.get("tokens")
+    if isinstance(tokens, list):
+        values = [
+            token.get("p", token.get("probability"))
+            for token in tokens
+            if isinstance(token, dict) and not str(token.get("text", "")).startswith("[_")
+        ]
+        values = [value for value in values if value is not None]
+        if values:
+            return float(sum(values) / len(values))
+    return None
+
+
+class SegmentArray:
+    """
+    세그먼트 배열 (시간순 정렬, 변경하지 않음 - 연산은 새 배열을 반환)
+    
+    반복하면 Segment(start, end, text)를 내보내므로 transcript_renderer의 변환 함수에 그대로 넘길 수 있다.
+    """
+    
+    __slots__ = ("starts", "ends", "offsets", "text_buffer", "probabilities")
+    
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        offsets: np.ndarray,
+        text_buffer: bytes,
+        probabilities: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            starts: 시작 시간 (초)
+            ends: 끝 시간 (초)
+            offsets: 텍스트 버퍼 내 i번째 세그먼트 범위는 offsets[i]:offsets[i + 1] (길이 n + 1)
+            text_buffer: 모든 세그먼트 텍스트를 이어 붙인 UTF-8 바이트
+            probabilities: 세그먼트(단어)별 확률 또는 None
+        """
+        self.starts = np.asarray(starts, dtype=_TIME_DTYPE)
+        self.ends = np.asarray(ends, dtype=_TIME_DTYPE)
+        self.offsets = np.asarray(offsets, dtype=_OFFSET_DTYPE)
+        self.text_buffer = text_buffer
+        self.probabilities = None if probabilities is None else np.asarray(probabilities, dtype=_PROBABILITY_DTYPE)
+    
+    @classmethod
+    def empty(cls) -> "SegmentArray":
+        """빈 배열"""
+        return cls(np.empty(0), np.empty(0), np.zeros(1), b"")
+    
+    @classmethod
+    def from_records(cls, records: Optional[Iterable[Any]], expand_words: bool = False) -> "SegmentArray":
+        """
+        OpenAI Whisper/whisper-server/자막 세그먼트를 배열로 변환 (빈 텍스트 제외)
+        
+        Args:
+            records: {"start", "end", "text", "probability"?, "tokens"?, "words"?} dict, Segment 또는 [start, end, text] 목록
+            expand_words: 세그먼트에 words(단어별 시간)가 있으면 단어 단위로 펼치기
+        """
+        starts: List[float] = []
+        ends: List[float] = []
+        texts: List[bytes] = []
+        probabilities: List[float] = []
+        has_probability = False
+        
+        def append(start, end, text, probability):
+            nonlocal has_probability
+            text = str(text).strip()
+            if not text:
+                return
+            starts.append(float(start or 0))
+            ends.append(float(end or 0))
+            texts.append(text.encode("utf-8"))
+            if probability is not None:
+                has_probability = True
+            probabilities.append(np.nan if probability is None else probability)
+        
+        for record in records or []:
+            if isinstance(record, (Segment, list, tuple)):
+                append(record[0], record[1], record[2], None)
+            elif isinstance(record, dict):
+                words = record.get("words") if expand_words else None
+                if words:
+                    for word in words:
+                        append(word.get("start"), word.get("end"), word.get("word", word.get("text", "")), _record_probability(word))
+                else:
+                    append(record.get("start"), record.get("end"), record.get("text", ""), _record_probability(record))
+        
+        return cls._build(starts, ends, texts, probabilities if has_probability else None)
+    
+    @classmethod
+    def from_whisper_cpp(cls, transcription: Optional[Iterable[Any]]) -> "SegmentArray":
+        """
+        whisper-cli JSON(-oj/-ojf)의 transcription 목록을 배열로 변환
+        ({"offsets": {"from": ms, "to": ms}, "text", "tokens"?} -> 초 단위, 토큰 확률 평균)
+        """
+        records = []
+        for seg in transcription or []:
+            if not isinstance(seg, dict):
+                continue
+            offsets = seg.get("offsets", {})
+            records.append({
+                "start": offsets.get("from", 0) / 1000,
+                "end": offsets.get("to", 0) / 1000,
+                "text": seg.get("text", ""),
+                "probability": _record_probability(seg)
+            })
+        return cls.from_records(records)
+    
+    @classmethod
+    def _build(cls, starts: List[float], ends: List[float], texts: List[bytes], probabilities: Optional[List[float]]) -> "SegmentArray":
+        """목록에서 배열 생성 (시작 시간순 정렬 유지)"""
+        offsets = np.zeros(len(texts) + 1, dtype=_OFFSET_DTYPE)
+        if texts:
+            np.cumsum([len(text) for text in texts], out=offsets[1:])
+        array = cls(np.array(starts), np.array(ends), offsets, b"".join(texts), probabilities)
+        if len(array) > 1 and np.any(np.diff(array.starts) < 0):
+            return array.take(np.argsort(array.starts, kind="stable"))
+        return array
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+    
+    def text_at(self, index: int) -> str:
+        """i번째 세그먼트 텍스트"""
+        return self.text_buffer[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+    
+    def __getitem__(self, index: int) -> Segment:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Segment(float(self.starts[index]), float(self.ends[index]), self.text_at(index))
+    
+    def __iter__(self) -> Iterator[Segment]:
+        buffer = self.text_buffer
+        offsets = self.offsets.tolist()
+        for index, (start, end) in enumerate(zip(self.starts.tolist(), self.ends.tolist())):
+            yield Segment(start, end, buffer[offsets[index]:offsets[index + 1]].decode("utf-8"))
+    
+    @property
+    def text(self) -> str:
+        """전체 텍스트 (세그먼트를 공백으로 연결)"""
+        return " ".join(segment.text for segment in self)
+    
+    @property
+    def duration(self) -> float:
+        """마지막 세그먼트 끝 시간 (빈 배열은 0)"""
+        return float(self.ends.max()) if len(self) else 0.0
+    
+    @property
+    def nbytes(self) -> int:
+        """배열과 텍스트 버퍼가 차지하는 메모리 (바이트)"""
+        size = self.starts.nbytes + self.ends.nbytes + self.offsets.nbytes + len(self.text_buffer)
+        return size + (self.probabilities.nbytes if self.probabilities is not None else 0)
+    
+    def shift(self, offset: float) -> "SegmentArray":
+        """시간 이동 (구간 오디오 기준 -> 영상 기준), 텍스트 버퍼는 공유"""
+        if not offset:
+            return self
+        return SegmentArray(self.starts + offset, self.ends + offset, self.offsets, self.text_buffer, self.probabilities)
+    
+    def take(self, indices: np.ndarray) -> "SegmentArray":
+        """지정한 위치의 세그먼트만 골라 새 배열 생성 (텍스트 버퍼 재구성)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == len(self) and np.array_equal(indices, np.arange(len(self))):
+            return self
+        lengths = self.offsets[indices + 1] - self.offsets[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=_OFFSET_DTYPE)
+        np.cumsum(lengths, out=offsets[1:])
+        buffer = np.frombuffer(self.text_buffer, dtype=np.uint8)
+        if len(indices):
+            # 각 세그먼트의 바이트 위치를 한 번에 계산해 복사
+            byte_index = np.repeat(self.offsets[indices] - offsets[:-1], lengths) + np.arange(offsets[-1])
+            text_buffer = buffer[byte_index].tobytes()
+        else:
+            text_buffer = b""
+        probabilities = self.probabilities[indices] if self.probabilities is not None else None
+        return SegmentArray(self.starts[indices], self.ends[indices], offsets, text_buffer, probabilities)
+    
+    def slice_time(self, start: float = 0.0, end: Optional[float] = None) -> "SegmentArray":
+        """
+        시간 구간과 겹치는 세그먼트만 남기기
+        
+        Args:
+            start: 구간 시작 (초)
+            end: 구간 끝 (초), None이면 끝까지
+        """
+        mask = self.ends > start
+        if end is not None:
+            mask &= self.starts < end
+        if mask.all():
+            return self
+        return self.take(np.flatnonzero(mask))
+    
+    @classmethod
+    def merge(cls, arrays: Iterable["SegmentArray"]) -> "SegmentArray":
+        """여러 배열을 하나로 합쳐 시작 시간순으로 정렬 (구간별 결과 합치기)"""
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return cls.empty()
+        if len(arrays) == 1:
+            return arrays[0]
+        buffer_starts = np.cumsum([0] + [len(array.text_buffer) for array in arrays[:-1]])
+        offsets = np.concatenate(
+            [array.offsets[:-1] + base for array, base in zip(arrays, buffer_starts)]
+            + [np.array([buffer_starts[-1] + len(arrays[-1].text_buffer)], dtype=_OFFSET_DTYPE)]
+        )
+        probabilities = None
+        if any(array.probabilities is not None for array in arrays):
+            probabilities = np.concatenate([
+                array.probabilities if array.probabilities is not None else np.full(len(array), np.nan, dtype=_PROBABILITY_DTYPE)
+                for array in arrays
+            ])
+        merged = cls(
+            np.concatenate([array.starts for array in arrays]),
+            np.concatenate([array.ends for array in arrays]),
+            offsets,
+            b"".join(array.text_buffer for array in arrays),
+            probabilities
+        )
+        if np.any(np.diff(merged.starts) < 0):
+            return merged.take(np.argsort(merged.starts, kind="stable"))
+        return merged
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        캐시 저장용 직렬화 (JSON 호환)
+        
+        시간/오프셋/확률 배열은 base64 바이너리, 텍스트는 버퍼 문자열 하나로 저장한다.
+        """
+        data = {
+            "format": "segment-array/1",
+            "count": len(self),
+            "starts": _encode_array(self.starts),
+            "ends": _encode_array(self.ends),
+            "offsets": _encode_array(self.offsets),
+            "text": self.text_buffer.decode("utf-8"),
+        }
+        if self.probabilities is not None:
+            data["probabilities"] = _encode_array(self.probabilities)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SegmentArray":
+        """to_dict 결과 복원"""
+        probabilities = data.get("probabilities")
+        return cls(
+            _decode_array(data["starts"], _TIME_DTYPE),
+            _decode_array(data["ends"], _TIME_DTYPE),
+            _decode_array(data["offsets"], _OFFSET_DTYPE),
+            data["text"].encode("utf-8"),
+            _decode_array(probabilities, _PROBABILITY_DTYPE) if probabilities else None
+        )
+
+
+def load_segments(value: Union[Dict[str, Any], List[Any], None]) -> SegmentArray:
+    """캐시 값에서 세그먼트 배열 복원 (to_dict 형식 또는 이전 [start, end, text] 행 목록)"""
+    if isinstance(value, dict):
+        return SegmentArray.from_dict(value)
+    return SegmentArray.from_records(value)
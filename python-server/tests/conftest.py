@@ -0,0 +1,27 @@
+"""
+테스트 공통 설정
+평가 결과 캐시는 테스트마다 임시 디렉토리의 새 캐시를 사용한다
+"""
+
+import pytest
+
+import cache_manager as cache_manager_module
+import evaluation_service
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    """임시 디렉토리의 새 캐시 (CACHE_DIR은 실행 디렉토리 기준 상대 경로)"""
+    monkeypatch.chdir(tmp_path)
+    cache = cache_manager_module.CacheManager()
+    monkeypatch.setattr(evaluation_service, "cache_manager", cache)
+    return cache
+
+
+@pytest.fixture
+def make_service(isolated_cache):
+    """FakeEvaluator를 쓰는 평가 서비스 생성 함수"""
+    def factory(delay: float = 0.0, max_concurrency: int = 4, use_cache: bool = True):
+        evaluator = evaluation_service.FakeEvaluator(delay=delay)
+        return evaluation_service.EvaluationService(evaluator, max_concurrency=max_concurrency, use_cache=use_cache)
+    return factory
@@ -0,0 +1,267 @@
+"""
+콘텐츠 평가 서비스 테스트 (FakeEvaluator 사용, Claude CLI 없이 실행)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from evaluation_service import (
+    COMPREHENSIVE_FIELDS,
+    JsonFieldParser,
+    split_content
+)
+
+LONG_CONTENT = " ".join(f"이것은 {i}번째 문장입니다." for i in range(1500))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+def test_json_field_parser_yields_fields_as_they_complete():
+    text = '```json\n{"a": "x,}{\\"y", "b": {"c": [1, 2]}, "d": 3}\n```'
+    parser = JsonFieldParser()
+    fields = []
+    for i in range(0, len(text), 3):
+        fields += parser.feed(text[i:i + 3])
+    assert fields == [("a", 'x,}{"y'), ("b", {"c": [1, 2]}), ("d", 3)]
+
+
+def test_cache_hit(make_service):
+    service = make_service()
+    
+    async def scenario():
+        first = await service.evaluate("캐시 테스트", title="제목")
+        second = await service.evaluate("캐시 테스트", title="제목")
+        return first, second
+    
+    first, second = run(scenario())
+    assert not first["from_cache"]
+    assert second["from_cache"]
+    assert second["evaluation"] == first["evaluation"]
+    assert service.evaluator.calls == 1
+
+
+def test_inflight_requests_are_coalesced(make_service):
+    service = make_service(delay=0.2)
+    
+    async def scenario():
+        return await asyncio.gather(*[service.evaluate("동시 요청", title="제목") for _ in range(3)])
+    
+    results = run(scenario())
+    assert service.evaluator.calls == 1
+    assert sorted(result["coalesced"] for result in results) == [False, True, True]
+    assert service.get_stats()["inflight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_evaluation(make_service):
+    service = make_service(delay=0.2)
+    
+    async def scenario():
+        first = asyncio.create_task(service.evaluate("취소 테스트"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(service.evaluate("취소 테스트"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await second
+    
+    result = run(scenario())
+    assert result["coalesced"]
+    assert set(COMPREHENSIVE_FIELDS) <= set(result["evaluation"])
+
+
+def test_incomplete_response_is_not_cached(make_service):
+    service = make_service()
+    service.evaluator._respond = lambda prompt: '{"총평": "필드가 빠진 응답"}'
+    
+    async def scenario():
+        await service.evaluate("형식 검증")
+        return await service.evaluate("형식 검증")
+    
+    result = run(scenario())
+    assert not result["from_cache"]
+    assert service.evaluator.calls == 2
+
+
+def test_split_content_respects_max_chunks():
+    chunks = split_content(LONG_CONTENT, max_chars=1000, max_chunks=3)
+    assert len(chunks) == 3
+    assert "".join(chunk.text for chunk in chunks).replace(" ", "") == LONG_CONTENT.replace(" ", "")
+
+
+def test_map_reduce_evaluates_chunks_then_reduces(make_service):
+    service = make_service(max_concurrency=4)
+    
+    async def scenario():
+        first = await service.evaluate_long(LONG_CONTENT, title="긴 콘텐츠")
+        calls = service.evaluator.calls
+        second = await service.evaluate_long(LONG_CONTENT, title="긴 콘텐츠")
+        return first, calls, second
+    
+    first, calls, second = run(scenario())
+    chunk_count = len(first["chunks"])
+    assert 1 < chunk_count <= service.max_concurrency
+    assert calls == chunk_count + 1  # 구간 평가 + 합치기
+    assert all(chunk["요약"] for chunk in first["chunks"])
+    assert second["from_cache"]
+    assert service.evaluator.calls == calls
+
+
+def test_repeated_chunks_are_evaluated_separately(make_service):
+    service = make_service(max_concurrency=4, use_cache=False)
+    content = " ".join(["같은 문장이 반복됩니다."] * 4000)
+    
+    result = run(service.evaluate_long(content))
+    assert len(result["chunks"]) == 4
+    assert service.evaluator.calls == 5
+
+
+def test_stream_events(make_service):
+    service = make_service()
+    
+    events = run(collect(service.evaluate_stream("스트리밍 테스트", title="제목")))
+    kinds = [event["event"] for event in events]
+    assert kinds[0] == "delta"
+    assert kinds[-1] == "done"
+    fields = [event["name"] for event in events if event["event"] == "field"]
+    assert fields == list(COMPREHENSIVE_FIELDS)
+    done = events[-1]
+    assert done["missing_fields"] == []
+    assert "".join(event["text"] for event in events if event["event"] == "delta") == done["result"]
+    
+    cached = run(collect(service.evaluate_stream("스트리밍 테스트", title="제목")))
+    assert cached[-1]["from_cache"]
+    assert service.evaluator.calls == 1
+
+
+def test_stream_disconnect_keeps_evaluation_for_coalesced_requests(make_service):
+    service = make_service(delay=0.3)
+    
+    async def scenario():
+        stream = service.evaluate_stream("연결 끊김")
+        await stream.__anext__()
+        waiting = asyncio.create_task(service.evaluate("연결 끊김"))
+        await asyncio.sleep(0.05)
+        await stream.aclose()
+        result = await waiting
+        cached = await service.evaluate("연결 끊김")
+        return result, cached
+    
+    result, cached = run(scenario())
+    assert result["coalesced"]
+    assert set(COMPREHENSIVE_FIELDS) <= set(result["evaluation"])
+    assert cached["from_cache"]
+    assert service.evaluator.calls == 1
+
+
+def test_concurrent_streams_share_one_run(make_service):
+    service = make_service(delay=0.2)
+    
+    async def scenario():
+        return await asyncio.gather(*[collect(service.evaluate_stream("공유 스트림")) for _ in range(2)])
+    
+    first, second = run(scenario())
+    assert [event["event"] for event in first] == [event["event"] for event in second]
+    assert sorted([first[-1]["coalesced"], second[-1]["coalesced"]]) == [False, True]
+    assert service.evaluator.calls == 1
+
+
+def test_long_stream_reports_chunks_before_done(make_service):
+    service = make_service()
+    
+    events = run(collect(service.evaluate_long_stream(LONG_CONTENT)))
+    kinds = [event["event"] for event in events]
+    chunk_count = kinds.count("chunk")
+    assert chunk_count > 1
+    assert kinds.index("chunk") < kinds.index("done")
+    assert len(events[-1]["chunks"]) == chunk_count
+
+
+def test_batch_deduplicates_and_reports_cache_hits(make_service):
+    service = make_service(delay=0.05)
+    
+    async def scenario():
+        await service.evaluate("캐시된 항목")
+        items = [
+            {"content": "항목 1", "evaluation_type": "comprehensive"},
+            {"content": "항목 2", "evaluation_type": "comprehensive"},
+            {"content": "항목 1", "evaluation_type": "comprehensive"},
+            {"content": "캐시된 항목", "evaluation_type": "comprehensive"}
+        ]
+        return await collect(service.evaluate_batch(items, workers=2))
+    
+    events = run(scenario())
+    items = sorted((event for event in events if event["type"] == "item"), key=lambda event: event["index"])
+    summary = events[-1]
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert all(item["success"] for item in items)
+    assert items[3]["from_cache"]
+    assert summary["type"] == "summary"
+    assert summary["succeeded"] == 4
+    assert summary["deduplicated"] == 1
+    assert summary["cache_hits"] == 1
+    assert service.evaluator.calls == 3  # 캐시 채우기 1 + 새 항목 2
+
+
+def test_batch_reports_invalid_items_without_evaluating(make_service):
+    service = make_service()
+    items = [
+        {"content": "정상 항목", "evaluation_type": "comprehensive"},
+        {"content": " ", "error": "평가할 콘텐츠가 없습니다."}
+    ]
+    
+    events = run(collect(service.evaluate_batch(items)))
+    invalid = next(event for event in events if event.get("index") == 1)
+    assert not invalid["success"]
+    assert invalid["error"] == "평가할 콘텐츠가 없습니다."
+    assert events[-1]["failed"] == 1
+    assert service.evaluator.calls == 1
+
+
+class TestEndpoints:
+    """평가 API (FastAPI TestClient, 서버 시작 작업 없이 실행)"""
+    
+    @pytest.fixture
+    def client(self, make_service, monkeypatch):
+        testclient = pytest.importorskip("fastapi.testclient")
+        import main
+        monkeypatch.setattr(main, "evaluation_service", make_service())
+        return testclient.TestClient(main.app)
+    
+    def test_stream_endpoint(self, client):
+        response = client.post("/evaluate/content/stream", json={"content": "스트리밍 API", "title": "제목"})
+        assert response.status_code == 200
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            name_line, data_line = block.split("\n")
+            events.append((name_line[len("event: "):], json.loads(data_line[len("data: "):])))
+        assert events[0][0] == "delta"
+        name, done = events[-1]
+        assert name == "done"
+        assert done["success"]
+        assert done["missing_fields"] == []
+    
+    def test_stream_endpoint_rejects_empty_content(self, client):
+        response = client.post("/evaluate/content/stream", json={"content": "   "})
+        assert response.status_code == 400
+    
+    def test_batch_endpoint(self, client):
+        response = client.post("/evaluate/batch", json={"items": [
+            {"content": "일괄 항목"},
+            {"content": ""},
+            {"content": "일괄 항목"}
+        ]})
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        items = {line["index"]: line for line in lines if line["type"] == "item"}
+        summary = lines[-1]
+        assert not items[1]["success"]
+        assert items[0]["success"] and items[2]["success"]
+        assert summary["failed"] == 1
+        assert summary["deduplicated"] == 1
@@ -0,0 +1,364 @@
+"""
+스크립트 검색 색인 모듈
+추출한 스크립트를 SQLite FTS5(trigram 토크나이저) 색인에 영구 저장하여 전체 스크립트에서 문구를 검색
+trigram은 띄어쓰기/조사와 관계없이 3글자 이상 부분 문자열을 찾으므로 한국어에 형태소 분석기 없이 사용할 수 있다
+"""
+
+import json
+import time
+import bisect
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants import (
+    TRANSCRIPT_INDEX_FILE,
+    TRANSCRIPT_INDEX_PASSAGE_CHARS,
+    SEARCH_MAX_RESULTS,
+    SEARCH_MAX_HITS_PER_TRANSCRIPT,
+    SEARCH_MAX_SCANNED_HITS
+)
+from segment_array import SegmentArray, load_segments
+
+logger = logging.getLogger(__name__)
+
+_TRIGRAM_MIN_CHARS = 3  # trigram 색인으로 찾을 수 있는 최소 검색어 길이
+
+
+def iter_passages(
+    segments: SegmentArray,
+    max_chars: int = TRANSCRIPT_INDEX_PASSAGE_CHARS
+) -> Iterator[Tuple[float, float, str, List[List[float]]]]:
+    """
+    연속 세그먼트를 max_chars 길이까지 묶은 검색 단위 (세그먼트 경계에서만 나눔)
+    
+    단어 단위 세그먼트도 여러 단어에 걸친 문구로 찾을 수 있고, 색인 행 수가 줄어든다.
+    
+    Yields:
+        (시작 초, 끝 초, 텍스트, 세그먼트 경계 [[텍스트 내 시작 위치, 시작 초, 끝 초], ...])
+    """
+    parts: List[str] = []
+    boundaries: List[List[float]] = []
+    length = 0
+    for segment in segments:
+        if parts and length + len(segment.text) + 1 > max_chars:
+            yield boundaries[0][1], boundaries[-1][2], " ".join(parts), boundaries
+            parts, boundaries, length = [], [], 0
+        boundaries.append([length, segment.start, segment.end])
+        parts.append(segment.text)
+        length += len(segment.text) + 1
+    if parts:
+        yield boundaries[0][1], boundaries[-1][2], " ".join(parts), boundaries
+
+
+def match_segments(text: str, boundaries: List[List[float]], terms: List[str]) -> List[Dict[str, Any]]:
+    """
+    검색 단위 안에서 검색어가 나온 세그먼트 찾기
+    
+    Args:
+        text: 검색 단위 텍스트
+        boundaries: iter_passages의 세그먼트 경계
+        terms: 검색어 목록
+    
+    Returns:
+        [{"start", "end", "text"}] (시간 순, 검색어가 세그먼트 경계에 걸치면 걸친 세그먼트 모두)
+    """
+    offsets = [int(boundary[0]) for boundary in boundaries]
+    lowered = text.lower()
+    matched = set()
+    for term in terms:
+        term = term.lower()
+        position = lowered.find(term)
+        while position != -1:
+            first = bisect.bisect_right(offsets, position) - 1
+            last = bisect.bisect_right(offsets, position + len(term) - 1) - 1
+            matched.update(range(max(first, 0), last + 1))
+            position = lowered.find(term, position + 1)
+    
+    results = []
+    for index in sorted(matched):
+        segment_end = offsets[index + 1] - 1 if index + 1 < len(offsets) else len(text)
+        results.append({
+            "start": boundaries[index][1],
+            "end": boundaries[index][2],
+            "text": text[offsets[index]:segment_end]
+        })
+    return results
+
+
+def _fts_phrase(term: str) -> str:
+    """FTS5 구문 검색식 (따옴표 이스케이프)"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term: str) -> str:
+    """LIKE 부분 일치 패턴 (%, _ 이스케이프)"""
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class TranscriptIndex:
+    def __init__(self, index_file: str = TRANSCRIPT_INDEX_FILE):
+        self.index_file = Path(index_file)
+        
+        # 스레드별 SQLite 연결
+        self._local = threading.local()
+        
+        # 색인 준비 상태 (처음 사용할 때 테이블 생성)
+        self._ready = False
+        self._init_lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 색인 연결 반환 (WAL 모드, 처음 사용 시 테이블 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._init_tables(conn)
+                    self._ready = True
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    def _init_tables(self, conn: sqlite3.Connection):
+        """색인 테이블 생성"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                transcript_id TEXT PRIMARY KEY,
+                video_id TEXT,
+                youtube_url TEXT NOT NULL,
+                title TEXT,
+                language TEXT,
+                model_size TEXT,
+                transcript_source TEXT,
+                duration REAL,
+                segment_count INTEGER NOT NULL,
+                segments TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_video_id ON transcripts(video_id)")
+        # 검색 단위 (연속 세그먼트 묶음)와 본문 색인 (외부 콘텐츠 테이블이므로 본문은 한 번만 저장)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS passages (
+                id INTEGER PRIMARY KEY,
+                transcript_id TEXT NOT NULL,
+                start REAL NOT NULL,
+                end REAL NOT NULL,
+                text TEXT NOT NULL,
+                segments TEXT
+            )
+        """)
+        # 세그먼트 경계 열이 없던 색인 (기존 구간은 검색 단위 전체 시간으로 반환)
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(passages)")}
+        if "segments" not in columns:
+            conn.execute("ALTER TABLE passages ADD COLUMN segments TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_passages_transcript_id ON passages(transcript_id)")
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+                text, content='passages', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    
+    def _delete_passages(self, conn: sqlite3.Connection, transcript_id: str):
+        """스크립트의 검색 단위와 본문 색인 삭제"""
+        rows = conn.execute("SELECT id, text FROM passages WHERE transcript_id = ?", (transcript_id,)).fetchall()
+        conn.executemany(
+            "INSERT INTO passages_fts(passages_fts, rowid, text) VALUES ('delete', ?, ?)",
+            [(row['id'], row['text']) for row in rows]
+        )
+        conn.execute("DELETE FROM passages WHERE transcript_id = ?", (transcript_id,))
+    
+    def add_transcript(self, transcript_id: str, segments: SegmentArray, metadata: Dict[str, Any]):
+        """
+        스크립트 색인에 추가 (같은 ID가 있으면 교체)
+        
+        Args:
+            transcript_id: 스크립트 ID
+            segments: 세그먼트 배열
+            metadata: youtube_url, video_id, title, language, model_size, transcript_source, duration
+        """
+        started = time.time()
+        passages = list(iter_passages(segments))
+        with self._transaction() as conn:
+            self._delete_passages(conn, transcript_id)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO transcripts
+                    (transcript_id, video_id, youtube_url, title, language, model_size,
+                     transcript_source, duration, segment_count, segments, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    transcript_id,
+                    metadata.get("video_id"),
+                    metadata.get("youtube_url", ""),
+                    metadata.get("title"),
+                    metadata.get("language"),
+                    metadata.get("model_size"),
+                    metadata.get("transcript_source"),
+                    metadata.get("duration") or segments.duration,
+                    len(segments),
+                    json.dumps(segments.to_dict(), ensure_ascii=False),
+                    time.time()
+                )
+            )
+            for start, end, text, boundaries in passages:
+                cursor = conn.execute(
+                    "INSERT INTO passages (transcript_id, start, end, text, segments) VALUES (?, ?, ?, ?, ?)",
+                    (transcript_id, start, end, text, json.dumps(boundaries))
+                )
+                conn.execute("INSERT INTO passages_fts(rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+        logger.info(f"스크립트 색인 완료: {transcript_id} (세그먼트 {len(segments)}개, 검색 단위 {len(passages)}개, {time.time() - started:.2f}초)")
+    
+    def remove_transcript(self, transcript_id: str) -> bool:
+        """스크립트 색인에서 삭제"""
+        with self._transaction() as conn:
+            self._delete_passages(conn, transcript_id)
+            return conn.execute("DELETE FROM transcripts WHERE transcript_id = ?", (transcript_id,)).rowcount > 0
+    
+    def contains(self, transcript_id: str) -> bool:
+        """색인에 있는 스크립트인지 확인"""
+        row = self._connect().execute("SELECT 1 FROM transcripts WHERE transcript_id = ?", (transcript_id,)).fetchone()
+        return row is not None
+    
+    def get_transcript(self, transcript_id: str) -> Optional[Dict[str, Any]]:
+        """
+        저장된 스크립트 (캐시에서 만료된 스크립트 내보내기용)
+        
+        Returns:
+            정보와 "segments"(SegmentArray) 또는 None
+        """
+        row = self._connect().execute("SELECT * FROM transcripts WHERE transcript_id = ?", (transcript_id,)).fetchone()
+        if row is None:
+            return None
+        transcript = dict(row)
+        transcript["segments"] = load_segments(json.loads(row["segments"]))
+        return transcript
+    
+    def search(
+        self,
+        query: str,
+        limit: int = SEARCH_MAX_RESULTS,
+        hits_per_transcript: int = SEARCH_MAX_HITS_PER_TRANSCRIPT
+    ) -> List[Dict[str, Any]]:
+        """
+        문구 검색 (공백으로 나눈 검색어를 모두 포함하는 구간)
+        
+        구간의 시작/끝은 검색어가 나온 세그먼트의 시간이다 (검색 단위 안의 일치 위치를 세그먼트 경계와 대조).
+        3글자 이상 검색어는 trigram 색인, 2글자 이하만 있으면 LIKE 부분 일치로 찾는다.
+        일치하는 구간이 SEARCH_MAX_SCANNED_HITS 이하면 관련도(bm25) 순, 더 많으면 관련도 계산 없이 최근 색인 순으로 읽는다.
+        
+        Args:
+            query: 검색어
+            limit: 최대 스크립트 수
+            hits_per_transcript: 스크립트별 최대 구간 수
+        
+        Returns:
+            [{"transcript_id", "youtube_url", "video_id", "title", ..., "hit_count",
+              "hits": [{"start", "end", "text", "segments": [{"start", "end", "text"}]}]}]
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        long_terms = [term for term in terms if len(term) >= _TRIGRAM_MIN_CHARS]
+        short_terms = [term for term in terms if len(term) < _TRIGRAM_MIN_CHARS]
+        like_clause = " AND ".join("p.text LIKE ? ESCAPE '\\'" for _ in short_terms)
+        like_params = [_like_pattern(term) for term in short_terms]
+        
+        conn = self._connect()
+        started = time.time()
+        if long_terms:
+            match = " AND ".join(_fts_phrase(term) for term in long_terms)
+            # 흔한 검색어는 모든 일치 구간의 bm25 계산이 느리므로 일치 수를 먼저 확인 (색인만 읽음)
+            match_count = conn.execute("SELECT COUNT(*) FROM passages_fts WHERE passages_fts MATCH ?", (match,)).fetchone()[0]
+            sql = """
+                SELECT p.transcript_id, p.start, p.end, p.text, p.segments
+                FROM passages_fts f JOIN passages p ON p.id = f.rowid
+                WHERE passages_fts MATCH ?
+            """
+            params = [match] + like_params
+            if like_clause:
+                sql += " AND " + like_clause
+            sql += " ORDER BY f.rank LIMIT ?" if match_count <= SEARCH_MAX_SCANNED_HITS else " ORDER BY f.rowid DESC LIMIT ?"
+        else:
+            # trigram 색인을 쓸 수 없는 짧은 검색어 - 전체 구간을 훑으므로 최근 색인 순으로 제한
+            sql = f"SELECT p.transcript_id, p.start, p.end, p.text, p.segments FROM passages p WHERE {like_clause} ORDER BY p.id DESC LIMIT ?"
+            params = like_params
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for row in conn.execute(sql, params + [SEARCH_MAX_SCANNED_HITS]):
+            result = results.get(row['transcript_id'])
+            if result is None:
+                if len(results) >= limit:
+                    continue
+                result = results[row['transcript_id']] = {"transcript_id": row['transcript_id'], "hit_count": 0, "hits": []}
+            result["hit_count"] += 1
+            if len(result["hits"]) < hits_per_transcript:
+                result["hits"].append(self._make_hit(row, terms))
+        
+        if results:
+            placeholders = ",".join("?" * len(results))
+            for row in conn.execute(
+                f"""
+                SELECT transcript_id, video_id, youtube_url, title, language, model_size, transcript_source, duration
+                FROM transcripts WHERE transcript_id IN ({placeholders})
+                """,
+                list(results)
+            ):
+                results[row['transcript_id']].update(dict(row))
+        for result in results.values():
+            result["hits"].sort(key=lambda hit: hit["start"])
+        
+        logger.info(f"스크립트 검색: {query!r} -> {len(results)}개 ({(time.time() - started) * 1000:.1f}ms)")
+        return list(results.values())
+    
+    @staticmethod
+    def _make_hit(row: sqlite3.Row, terms: List[str]) -> Dict[str, Any]:
+        """검색 결과 구간 (검색어가 나온 세그먼트의 시간, 세그먼트 경계가 없는 기존 색인은 검색 단위 전체)"""
+        segments = match_segments(row['text'], json.loads(row['segments']), terms) if row['segments'] else []
+        if not segments:
+            return {"start": row['start'], "end": row['end'], "text": row['text'], "segments": []}
+        return {
+            "start": segments[0]["start"],
+            "end": max(segment["end"] for segment in segments),
+            "text": row['text'],
+            "segments": segments
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """색인 통계"""
+        conn = self._connect()
+        row = conn.execute("SELECT COUNT(*) AS transcripts, COALESCE(SUM(segment_count), 0) AS segments FROM transcripts").fetchone()
+        passages = conn.execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+        return {
+            "transcripts": row['transcripts'],
+            "segments": row['segments'],
+            "passages": passages,
+            "index_size_mb": round(self.index_file.stat().st_size / (1024 * 1024), 2) if self.index_file.exists() else 0
+        }
+
+
+# 전역 색인 인스턴스
+transcript_index = TranscriptIndex()
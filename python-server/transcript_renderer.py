@@ -0,0 +1,152 @@
+"""
+스크립트 출력 모듈
+스크립트 세그먼트(Segment)를 TXT, SRT, VTT, JSON 등으로 변환
+변환 함수는 문자열 조각을 순서대로 내보내는 제너레이터이므로 긴 스크립트도 큰 중간 문자열 없이 스트리밍할 수 있다
+"""
+
+import re
+import json
+from typing import Iterator, List, NamedTuple, Optional, Dict, Any
+
+
+class Segment(NamedTuple):
+    """스크립트 세그먼트 (시간은 영상 기준 초)"""
+    start: float
+    end: float
+    text: str
+
+
+# 문장 끝: 마침표/물음표/느낌표 또는 한국어 종결 어미 뒤에 공백이 오는 위치
+_KOREAN_SENTENCE_ENDINGS = (
+    "습니다", "니다", "거든요", "는데요", "어요", "아요", "에요", "예요", "해요", "네요", "군요",
+    "지요", "까요", "세요", "죠", "었다", "았다", "했다", "한다", "된다", "이다"
+)
+_SENTENCE_PATTERN = re.compile(
+    r"\S.*?(?:[.!?。！？…]+(?=\s|$)|(?:" + "|".join(_KOREAN_SENTENCE_ENDINGS) + r")(?=\s|$)|$)",
+    re.DOTALL
+)
+
+# 출력 형식 -> (Content-Type, 파일 확장자)
+OUTPUT_FORMATS = {
+    "txt": ("text/plain; charset=utf-8", "txt"),          # 문장마다 줄바꿈
+    "segments": ("text/plain; charset=utf-8", "txt"),     # 세그먼트마다 줄바꿈
+    "timestamped": ("text/plain; charset=utf-8", "txt"),  # [MM:SS-MM:SS] 세그먼트
+    "srt": ("application/x-subrip; charset=utf-8", "srt"),
+    "vtt": ("text/vtt; charset=utf-8", "vtt"),
+    "json": ("application/json", "json"),
+}
+
+
+def split_sentences(text: str) -> Iterator[str]:
+    """
+    텍스트를 문장 단위로 나누기 (정규식 한 번 훑기, 선형 시간)
+    
+    문장부호(. ! ? 。 ！ ？ …)와 한국어 종결 어미(습니다, 어요, 죠 등) 뒤의 공백에서 나눈다.
+    """
+    for match in _SENTENCE_PATTERN.finditer(text):
+        sentence = match.group(0).strip()
+        if sentence:
+            yield sentence
+
+
+def format_clock(seconds: float) -> str:
+    """초를 MM:SS 형식으로 변환"""
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _format_timestamp(seconds: float, separator: str) -> str:
+    """초를 HH:MM:SS,mmm (SRT) 또는 HH:MM:SS.mmm (VTT) 형식으로 변환"""
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def render_txt(segments: List[Segment], text: Optional[str] = None) -> Iterator[str]:
+    """문장마다 한 줄 (text가 주어지면 세그먼트 대신 원본 텍스트를 나눔)"""
+    if text is None:
+        text = " ".join(seg.text for seg in segments)
+    first = True
+    for sentence in split_sentences(text):
+        yield sentence if first else "\n" + sentence
+        first = False
+
+
+def render_lines(segments: List[Segment]) -> Iterator[str]:
+    """세그먼트마다 한 줄"""
+    for index, seg in enumerate(segments):
+        yield seg.text if index == 0 else "\n" + seg.text
+
+
+def render_timestamped(segments: List[Segment]) -> Iterator[str]:
+    """[MM:SS-MM:SS] 세그먼트"""
+    for index, seg in enumerate(segments):
+        line = f"[{format_clock(seg.start)}-{format_clock(seg.end)}] {seg.text}"
+        yield line if index == 0 else "\n" + line
+
+
+def render_srt(segments: List[Segment]) -> Iterator[str]:
+    """SubRip 자막"""
+    for index, seg in enumerate(segments, start=1):
+        yield f"{index}\n{_format_timestamp(seg.start, ',')} --> {_format_timestamp(seg.end, ',')}\n{seg.text}\n\n"
+
+
+def render_vtt(segments: List[Segment]) -> Iterator[str]:
+    """WebVTT 자막"""
+    yield "WEBVTT\n\n"
+    for seg in segments:
+        yield f"{_format_timestamp(seg.start, '.')} --> {_format_timestamp(seg.end, '.')}\n{seg.text}\n\n"
+
+
+def render_json(segments: List[Segment], metadata: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """{...metadata, "segments": [{"start", "end", "text"}, ...]} - 세그먼트 하나씩 내보냄"""
+    header = json.dumps(metadata or {}, ensure_ascii=False)[:-1]
+    yield header + (", " if len(header) > 1 else "") + '"segments": ['
+    for index, seg in enumerate(segments):
+        item = json.dumps({"start": round(seg.start, 3), "end": round(seg.end, 3), "text": seg.text}, ensure_ascii=False)
+        yield item if index == 0 else ", " + item
+    yield "]}"
+
+
+def render(
+    segments: List[Segment],
+    output_format: str,
+    text: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """
+    지정한 형식으로 스크립트 변환 (문자열 조각 제너레이터)
+    
+    세그먼트 정보가 필요한 형식(segments, timestamped, srt, vtt)인데 세그먼트가 없으면 문장 단위 텍스트로 대신한다.
+    
+    Args:
+        segments: 세그먼트 목록
+        output_format: OUTPUT_FORMATS 중 하나
+        text: 세그먼트가 없을 때 사용할 원본 텍스트
+        metadata: JSON 형식에 함께 넣을 정보
+    
+    Raises:
+        ValueError: 지원하지 않는 형식
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"지원하지 않는 출력 형식: {output_format} (가능: {', '.join(OUTPUT_FORMATS)})")
+    
+    if output_format == "json":
+        return render_json(segments, metadata)
+    if output_format == "txt" or not segments:
+        return render_txt(segments, text if not segments else None)
+    if output_format == "segments":
+        return render_lines(segments)
+    if output_format == "timestamped":
+        return render_timestamped(segments)
+    if output_format == "srt":
+        return render_srt(segments)
+    return render_vtt(segments)
+
+
+def render_to_string(segments: List[Segment], output_format: str, text: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """render 결과를 하나의 문자열로 (응답 본문용)"""
+    return "".join(render(segments, output_format, text, metadata))
@@ -5,25 +5,265 @@ Mac Metal GPU 가속을 사용하여 빠른 음성 인식 제공
 """
 
 import os
+import signal
+import socket
 import subprocess
 import json
 import logging
 import tempfile
-from typing import Optional, Dict, Any
+import time
+import uuid
+import urllib.request
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: 서버 시작 잠금 없이 동작
+    fcntl = None
+
+from model_registry import model_registry
+from segment_array import SegmentArray
+from constants import (
+    USE_WHISPER_CPP_SERVER,
+    WHISPER_CPP_SERVER_HOST,
+    WHISPER_CPP_SERVER_STARTUP_TIMEOUT,
+    MAX_TIMEOUT_SECONDS
+)
+
 logger = logging.getLogger(__name__)
 
+def _find_free_port() -> int:
+    """사용 가능한 로컬 포트 번호"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((WHISPER_CPP_SERVER_HOST, 0))
+        return sock.getsockname()[1]
+
+def _read_rss_mb(pid: int) -> Optional[float]:
+    """프로세스 메모리 사용량 (RSS, MB) - /proc이 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def _encode_multipart(fields: Dict[str, str], file_field: str, file_path: str) -> Tuple[bytes, str]:
+    """multipart/form-data 요청 본문과 Content-Type 생성"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    with open(file_path, "rb") as f:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{os.path.basename(file_path)}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode("utf-8")
+            + f.read() + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+class SharedWhisperServer:
+    """
+    모델 하나를 로드한 whisper-server 프로세스 (모든 워커 프로세스가 함께 사용)
+    
+    whisper-cli는 실행할 때마다 모델 파일 전체를 메모리로 읽으므로 워커 N개가 동시에 처리하면
+    모델 N개 분량의 메모리를 쓴다. whisper-server 하나에 모델을 한 번만 로드하고 워커는 HTTP로 요청한다.
+    서버 주소는 임시 디렉토리의 상태 파일에 기록하고, 파일 잠금으로 한 워커만 서버를 시작한다.
+    추론은 서버 안에서 순서대로 처리된다 (GPU 하나를 나눠 쓰므로 전체 처리량은 같음).
+    """
+    
+    def __init__(self, server_bin: Path, model_path: Path, threads: int = 4):
+        self.server_bin = server_bin
+        self.model_path = model_path
+        self.threads = threads
+        state_dir = Path(tempfile.gettempdir()) / "ttube-whisper-server"
+        state_dir.mkdir(exist_ok=True)
+        self.state_path = state_dir / f"{model_path.stem}.json"
+        self.lock_path = state_dir / f"{model_path.stem}.lock"
+        self.log_path = state_dir / f"{model_path.stem}.log"
+        self.pid: Optional[int] = None
+        self.port: Optional[int] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._owner_pid: Optional[int] = None  # 서버를 시작한 프로세스 (fork된 워커는 상속받아도 소유자가 아님)
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{WHISPER_CPP_SERVER_HOST}:{self.port}"
+    
+    def _read_state(self) -> bool:
+        """상태 파일에서 서버 PID/포트 읽기"""
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return False
+        self.pid, self.port = state.get("pid"), state.get("port")
+        return bool(self.pid and self.port)
+    
+    @contextmanager
+    def _start_lock(self):
+        """서버 시작 잠금 (여러 워커가 동시에 서버를 띄우지 않도록)"""
+        with open(self.lock_path, "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+    
+    def is_healthy(self) -> bool:
+        """서버가 모델 로드를 마치고 요청을 받을 수 있는지 확인"""
+        if not self.port:
+            return False
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/health", timeout=2) as response:
+                return response.status == 200
+        except OSError:
+            return False
+    
+    def ensure_running(self) -> bool:
+        """
+        서버가 없으면 시작 (다른 워커가 시작한 서버가 있으면 그대로 사용)
+        
+        Returns:
+            서버 사용 가능 여부
+        """
+        if self._read_state() and self.is_healthy():
+            return True
+        
+        with self._start_lock():
+            # 잠금을 기다리는 동안 다른 워커가 서버를 시작했을 수 있음
+            if self._read_state() and self.is_healthy():
+                return True
+            try:
+                return self._start()
+            except Exception as e:
+                logger.error(f"whisper-server 시작 실패: {e}")
+                return False
+    
+    def _start(self) -> bool:
+        """whisper-server 프로세스 시작 후 모델 로드 완료까지 대기"""
+        port = _find_free_port()
+        cmd = [
+            str(self.server_bin),
+            "-m", str(self.model_path),
+            "--host", WHISPER_CPP_SERVER_HOST,
+            "--port", str(port),
+            "-t", str(self.threads),
+            "--convert"  # mp3 등을 ffmpeg로 WAV 변환
+        ]
+        logger.info(f"whisper-server 시작: {' '.join(cmd)}")
+        
+        # 시작한 워커가 종료되어도 다른 워커가 계속 사용하도록 별도 세션으로 실행
+        with open(self.log_path, "ab") as log_file:
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+        self.pid, self.port = self._process.pid, port
+        self._owner_pid = os.getpid()
+        
+        deadline = time.time() + WHISPER_CPP_SERVER_STARTUP_TIMEOUT
+        while time.time() < deadline:
+            if self._process.poll() is not None:
+                logger.error(f"whisper-server 종료됨 (코드 {self._process.returncode}), 로그: {self.log_path}")
+                return False
+            if self.is_healthy():
+                self.state_path.write_text(json.dumps({
+                    "pid": self.pid,
+                    "port": self.port,
+                    "model": str(self.model_path)
+                }))
+                logger.info(f"✅ whisper-server 준비 완료: {self.model_path.name} (PID {self.pid}, 포트 {self.port})")
+                return True
+            time.sleep(0.5)
+        
+        logger.error(f"whisper-server 시작 시간 초과 ({WHISPER_CPP_SERVER_STARTUP_TIMEOUT}초)")
+        self._process.terminate()
+        return False
+    
+    @property
+    def owned(self) -> bool:
+        """이 프로세스가 시작한 서버인지 여부"""
+        return self._owner_pid == os.getpid()
+    
+    def stop(self):
+        """서버 종료 (운영 모드 감독 프로세스 또는 서버를 시작한 워커 종료 시)"""
+        if not self._read_state():
+            return
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except OSError:
+            pass
+        self.state_path.unlink(missing_ok=True)
+        logger.info(f"whisper-server 종료: {self.model_path.name} (PID {self.pid})")
+    
+    def transcribe(
+        self,
+        audio_path: str,
+        language: str,
+        translate: bool = False,
+        temperature: float = 0.0,
+        beam_size: int = 5,
+        best_of: int = 5,
+        no_timestamps: bool = False,
+        word_timestamps: bool = False
+    ) -> Dict[str, Any]:
+        """
+        서버에 음성 인식 요청 (POST /inference, verbose_json 응답)
+        
+        Returns:
+            whisper-server verbose_json 결과 (text, language, segments[start, end, text, tokens])
+        """
+        fields = {
+            "language": language,
+            "translate": "true" if translate else "false",
+            "temperature": str(temperature),
+            "beam_size": str(beam_size),
+            "best_of": str(best_of),
+            "no_timestamps": "true" if no_timestamps else "false",
+            "response_format": "verbose_json"
+        }
+        if word_timestamps:
+            # 세그먼트 최대 길이 1 + 단어 경계 분할 = 단어마다 세그먼트 하나 (whisper-cli -ml 1 -sow)
+            fields.update({"max_len": "1", "split_on_word": "true"})
+        body, content_type = _encode_multipart(fields, "file", audio_path)
+        request = urllib.request.Request(
+            f"{self.base_url}/inference",
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=MAX_TIMEOUT_SECONDS) as response:
+            result = json.loads(response.read().decode("utf-8"))
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+    
+    def memory_info(self) -> Dict[str, Any]:
+        """서버 프로세스 정보 (모든 워커가 공유하는 모델 메모리)"""
+        self._read_state()
+        rss_mb = _read_rss_mb(self.pid) if self.pid else None
+        return {
+            "pid": self.pid,
+            "port": self.port,
+            "rss_mb": round(rss_mb, 1) if rss_mb is not None else None
+        }
+
 class WhisperCppMetal:
     def __init__(self, model_size: str = "base"):
         """
         Whisper.cpp Metal 초기화
         
         Args:
-            model_size: 모델 크기 (tiny, base, small, medium, large)
+            model_size: 모델 이름 (tiny, base, small, medium, large, large-v3:q5_0 등 양자화 모델 포함)
         """
         self.base_dir = Path(__file__).parent / "whisper.cpp"
         self.whisper_cli = self.base_dir / "build" / "bin" / "whisper-cli"
+        self.whisper_server_bin = self.base_dir / "build" / "bin" / "whisper-server"
         self.models_dir = self.base_dir / "models"
         self.model_size = model_size
         
@@ -31,35 +271,28 @@ class WhisperCppMetal:
         if not self.whisper_cli.exists():
             raise FileNotFoundError(f"whisper-cli not found at {self.whisper_cli}")
         
-        # 모델 파일 경로 - 다국어 모델 우선 선택
-        # large 모델의 경우 v3 버전 우선 선택
-        if model_size == "large":
-            # large 모델은 v3와 v1이 있음
-            for variant in ["v3", "v1", ""]:
-                suffix = f"-{variant}" if variant else ""
-                candidate = self.models_dir / f"ggml-{model_size}{suffix}.bin"
-                if candidate.exists():
-                    self.model_path = candidate
-                    break
-        else:
-            self.model_path = self.models_dir / f"ggml-{model_size}.bin"
-        
-        if not self.model_path.exists():
-            # 영어 전용 모델 시도
-            self.model_path = self.models_dir / f"ggml-{model_size}.en.bin"
-            if not self.model_path.exists():
-                # for-tests 모델은 마지막 대안 (테스트용이므로)
-                self.model_path = self.models_dir / f"for-tests-ggml-{model_size}.bin"
-                if not self.model_path.exists():
-                    # 모든 가능한 모델 목록 출력
-                    available_models = list(self.models_dir.glob("*.bin"))
-                    logger.error(f"Model not found: {model_size}")
-                    logger.error(f"Available models: {[m.name for m in available_models]}")
-                    raise FileNotFoundError(f"Model not found: {self.model_path}")
-                else:
-                    logger.warning(f"⚠️ 테스트용 모델 사용 중: {self.model_path.name}")
+        # 모델 파일 선택 - 다국어 모델 우선, large는 v3 우선, for-tests 모델은 마지막 대안 (model_registry.resolve)
+        model_info = model_registry.resolve(model_size)
+        if model_info is None:
+            available_models = [m["name"] for m in model_registry.list_models(include_test_models=True)]
+            logger.error(f"Model not found: {model_size}")
+            logger.error(f"Available models: {available_models}")
+            raise FileNotFoundError(f"Model not found: {model_size}")
+        if model_info["is_test_model"]:
+            logger.warning(f"⚠️ 테스트용 모델 사용 중: {model_info['name']}")
+        self.model_name = model_info["name"]
+        self.model_path = Path(model_info["path"])
         
         logger.info(f"Whisper.cpp Metal initialized with model: {self.model_path}")
+        
+        # 모델을 공유하는 whisper-server (없으면 요청마다 whisper-cli 실행)
+        self.server: Optional[SharedWhisperServer] = None
+        if USE_WHISPER_CPP_SERVER and self.whisper_server_bin.exists():
+            self.server = SharedWhisperServer(self.whisper_server_bin, self.model_path)
+    
+    def start_server(self) -> bool:
+        """공유 whisper-server 시작 (운영 모드에서 워커 생성 전 미리 로드)"""
+        return self.server is not None and self.server.ensure_running()
     
     def transcribe(
         self, 
@@ -85,16 +318,43 @@ class WhisperCppMetal:
             temperature: 샘플링 온도 (0.0-1.0)
             beam_size: 빔 검색 크기
             best_of: 최선의 후보 수
-            word_timestamps: 단어별 타임스탬프
+            word_timestamps: 단어별 타임스탬프 (단어마다 세그먼트 하나, 토큰 확률 포함)
             no_timestamps: 타임스탬프 제거
             threads: 사용할 스레드 수
             
         Returns:
-            변환 결과 딕셔너리
+            변환 결과 딕셔너리 (segments는 SegmentArray)
         """
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
+        start_time = time.time()
+        
+        # 공유 whisper-server 우선 사용 (모델을 다시 읽지 않음)
+        if self.server is not None and self.server.ensure_running():
+            try:
+                server_result = self.server.transcribe(
+                    audio_path,
+                    language=language,
+                    translate=translate,
+                    temperature=temperature,
+                    beam_size=beam_size,
+                    best_of=best_of,
+                    no_timestamps=no_timestamps,
+                    word_timestamps=word_timestamps
+                )
+                # 서버도 단어마다 세그먼트 하나를 돌려주므로 펼치지 않음 (words 항목은 BPE 토큰이라 한국어가 깨짐)
+                segments = SegmentArray.from_records(server_result.get("segments"))
+                model_registry.record_speed(self.model_name, server_result.get("duration", 0), time.time() - start_time)
+                return {
+                    "success": True,
+                    "text": server_result.get("text", "").strip() or segments.text,
+                    "segments": segments,
+                    "language": server_result.get("language", language)
+                }
+            except Exception as e:
+                logger.warning(f"whisper-server 요청 실패, whisper-cli로 처리: {e}")
+        
         # 임시 출력 파일
         with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp_output:
             output_path = tmp_output.name
@@ -121,7 +381,8 @@ class WhisperCppMetal:
             if no_timestamps:
                 cmd.append("-nt")
             if word_timestamps:
-                cmd.extend(["-ml", "0"])  # 단어별 타임스탬프 활성화
+                # 단어마다 세그먼트 하나 (-ml 0은 길이 제한 없음이므로 1), 토큰 확률을 위해 전체 JSON 출력
+                cmd.extend(["-ml", "1", "-sow", "-ojf"])
             
             logger.info(f"Running whisper.cpp: {' '.join(cmd)}")
             
@@ -157,10 +418,14 @@ class WhisperCppMetal:
                         else:
                             text = str(segments)
                     
+                    segments = SegmentArray.from_whisper_cpp(json_result.get("transcription", []))
+                    if segments:
+                        model_registry.record_speed(self.model_name, segments.duration, time.time() - start_time)
+                    
                     return {
                         "success": True,
                         "text": text.strip(),
-                        "segments": json_result.get("transcription", []),
+                        "segments": segments,
                         "language": json_result.get("language", language),
                         "processing_time": json_result.get("processing_time", 0)
                     }
@@ -170,7 +435,7 @@ class WhisperCppMetal:
                     return {
                         "success": True,
                         "text": result.stdout.strip(),
-                        "segments": [],
+                        "segments": SegmentArray.empty(),
                         "language": language
                     }
             else:
@@ -179,7 +444,7 @@ class WhisperCppMetal:
                 return {
                     "success": True,
                     "text": result.stdout.strip(),
-                    "segments": [],
+                    "segments": SegmentArray.empty(),
                     "language": language
                 }
                 
@@ -216,17 +481,12 @@ class WhisperCppMetal:
     
     def get_available_models(self) -> list:
         """
-        사용 가능한 모델 목록 반환
+        사용 가능한 모델 목록 반환 (model_registry, 디렉토리가 바뀌었을 때만 다시 읽음)
         """
-        models = []
-        for model_file in self.models_dir.glob("ggml-*.bin"):
-            model_name = model_file.stem.replace("ggml-", "")
-            models.append({
-                "name": model_name,
-                "path": str(model_file),
-                "size": model_file.stat().st_size / (1024 * 1024)  # MB
-            })
-        return models
+        return [
+            {"name": model["name"], "path": model["path"], "size": model["size_mb"]}
+            for model in model_registry.list_models()
+        ]
 
 
 # 테스트 코드
@@ -10,6 +10,8 @@ import tempfile
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+from model_registry import ModelRegistry
+
 logger = logging.getLogger(__name__)
 
 class WhisperCPP:
@@ -19,20 +21,15 @@ class WhisperCPP:
         self.whisper_cpp_path = Path(whisper_cpp_path)
         self.models_path = Path(models_path)
         self.binary_path = self.whisper_cpp_path / "build" / "bin" / "whisper-cli"
+        self.registry = ModelRegistry(self.whisper_cpp_path, self.models_path)
         
     def is_available(self) -> bool:
         """Whisper.cpp가 사용 가능한지 확인"""
         return self.binary_path.exists()
     
     def get_available_models(self) -> list:
-        """사용 가능한 모델 목록 반환"""
-        models = []
-        if self.models_path.exists():
-            for model_file in self.models_path.glob("ggml-*.bin"):
-                model_name = model_file.stem.replace("ggml-", "")
-                models.append(model_name)
-                logger.info(f"발견된 모델: {model_name} ({model_file.name})")
-        return models
+        """사용 가능한 모델 목록 반환 (디렉토리가 바뀌었을 때만 다시 읽음)"""
+        return [model["name"] for model in self.registry.list_models()]
     
     def get_best_available_model(self, requested_model: str) -> str:
         """요청된 모델 중 사용 가능한 최고 품질 모델 반환"""
@@ -119,8 +116,9 @@ class WhisperCPP:
                 logger.error("사용 가능한 모델이 없습니다")
                 return None
             
-            # 모델 파일 경로 확인
-            model_file = self.models_path / f"ggml-{best_model}.bin"
+            # 모델 파일 경로 확인 (양자화 모델은 ggml-<이름>-<형식>.bin)
+            model_info = self.registry.get(best_model)
+            model_file = Path(model_info["path"]) if model_info else self.models_path / f"ggml-{best_model}.bin"
             if not model_file.exists():
                 logger.warning(f"모델 파일이 없습니다: {model_file}")
                 # 자동 다운로드 시도
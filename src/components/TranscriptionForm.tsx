@@ -12,6 +12,7 @@ import {
   getServerHealth,
   isValidYouTubeUrl,
   normalizeYouTubeUrl,
+  streamContentEvaluation,
   transcribeYouTubeVideo
 } from '@/utils/transcriptionApi';
 import {
@@ -275,18 +276,31 @@ export const TranscriptionForm: React.FC<TranscriptionFormProps> = ({
 
 각 아이디어는 원본과 연관성이 있으면서도 독창적이어야 합니다.`;
 
-      // Claude는 Python 서버를 통해 호출
-      console.log('Claude CLI 호출 시작 (Python 서버)...');
-      const claudePromise = fetch('http://localhost:15000/evaluate/content', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ 
+      // Claude는 Python 서버를 통해 스트리밍으로 호출 (응답이 생성되는 대로 표시)
+      console.log('Claude CLI 호출 시작 (Python 서버, 스트리밍)...');
+      let claudeText = '';
+      const showClaudeResponse = (response: string) => {
+        setRecommendations(prev => [
+          { model: 'Claude', response },
+          ...prev.filter(rec => rec.model !== 'Claude')
+        ]);
+      };
+      const claudePromise = streamContentEvaluation(
+        {
           content: prompt,
           title: videoTitle,
-          evaluation_type: 'simple' 
-        }),
+          evaluation_type: 'simple'
+        },
+        {
+          onDelta: (text) => {
+            claudeText += text;
+            // 첫 응답 조각이 오면 진행 모달을 닫고 추천 영역에 바로 표시
+            setShowRecommendationModal(false);
+            showClaudeResponse(claudeText);
+          }
+        },
         signal
-      });
+      );
 
       // Grok API 호출
       console.log('Grok API 호출 시작...');
@@ -302,29 +316,23 @@ export const TranscriptionForm: React.FC<TranscriptionFormProps> = ({
       
       const newRecommendations: Array<{model: string; response: string}> = [];
       
-      // Claude 응답 처리 (Python 서버)
+      // Claude 응답 처리 (Python 서버, 스트리밍 최종 결과)
       if (results[0].status === 'fulfilled') {
-        console.log('Claude 응답 상태:', results[0].value.status);
-        if (results[0].value.ok) {
-          const claudeData = await results[0].value.json();
-          console.log('Claude 응답 데이터:', claudeData);
-          if (claudeData.success && claudeData.result) {
-            newRecommendations.push({
-              model: 'Claude',
-              response: claudeData.result
-            });
-            setRecommendations(prev => [...prev, {
-              model: 'Claude',
-              response: claudeData.result
-            }]);
-          } else if (claudeData.error) {
-            console.error('Claude CLI 오류:', claudeData.error);
-          }
+        const claudeData = results[0].value;
+        console.log('Claude 응답 데이터:', claudeData);
+        if (claudeData.success && claudeData.result) {
+          newRecommendations.push({
+            model: 'Claude',
+            response: claudeData.result
+          });
+          showClaudeResponse(claudeData.result);
         } else {
-          console.error('Claude API 오류:', results[0].value.statusText);
+          console.error('Claude CLI 오류:', claudeData.error);
+          setRecommendations(prev => prev.filter(rec => rec.model !== 'Claude'));
         }
       } else if (results[0].status === 'rejected') {
         console.error('Claude Promise 거부:', results[0].reason);
+        setRecommendations(prev => prev.filter(rec => rec.model !== 'Claude'));
       }
       
       // Grok 응답 처리
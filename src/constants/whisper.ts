@@ -17,7 +17,11 @@ export type WhisperModelName = typeof WHISPER_MODEL_NAMES[number];
 export const API_ENDPOINTS = {
   TRANSCRIPTION: '/transcribe',
   HEALTH: '/health',
-  MODELS: '/models'
+  MODELS: '/models',
+  SEARCH: '/search',
+  EVALUATE: '/evaluate/content',
+  EVALUATE_STREAM: '/evaluate/content/stream',
+  EVALUATE_BATCH: '/evaluate/batch'
 } as const;
 
 export const DEFAULT_API_URL = 'http://localhost:15000'; 
\ No newline at end of file
@@ -12,8 +12,17 @@ const API_BASE_URL = DEFAULT_API_URL;
 export interface TranscriptionRequest {
   youtube_url: string;
   model_size?: WhisperModelName;
+  language?: string;
+  force_asr?: boolean;
+  start?: number;
+  end?: number;
+  output_format?: TranscriptOutputFormat;
+  word_timestamps?: boolean;
+  reuse_duplicates?: boolean;  // 앞부분이 이미 추출한 영상과 같으면 저장된 스크립트 재사용
 }
 
+export type TranscriptOutputFormat = 'txt' | 'segments' | 'timestamped' | 'srt' | 'vtt' | 'json';
+
 // 응답 타입 정의
 export interface TranscriptionResponse {
   success: boolean;
@@ -25,6 +34,10 @@ export interface TranscriptionResponse {
   download_time?: number;
   transcription_time?: number;
   from_cache?: boolean;
+  transcript_source?: 'captions' | 'asr' | 'duplicate';
+  duplicate_of?: string | null;
+  transcript_id?: string;
+  output_format?: TranscriptOutputFormat;
 }
 
 export interface CacheInfo {
@@ -32,14 +45,181 @@ export interface CacheInfo {
   valid_files: number;
   expired_files: number;
   total_size_mb: number;
+  unique_blobs?: number;
+  dedup_saved_mb?: number;
+  hits?: number;
+  misses?: number;
+  hit_rate?: number | null;
+  alias_hits?: number;
+  dedup_hits?: number;
+  served_mb?: number;
+  download_seconds_saved?: number;
+  asr_seconds_saved?: number;
+  tiers?: Record<string, CacheTierInfo>;
   retention_hours: number;
   cache_dir: string;
 }
 
+// 캐시 계층별 통계 (audio, audio_range, transcript, metadata, naver)
+export interface CacheTierInfo {
+  items: number;
+  valid_items: number;
+  size_mb: number;
+  hits: number;
+  misses: number;
+  hit_rate: number | null;
+  evictions: number;
+  expirations: number;
+  served_mb: number;
+  seconds_saved: number;
+  age_histogram: Record<string, number>;
+  size_histogram: Record<string, number>;
+}
+
+// 스크립트 검색 결과 (일치한 구간의 시각은 초 단위)
+export interface TranscriptSearchSegment {
+  start: number;
+  end: number;
+  text: string;
+}
+
+export interface TranscriptSearchHit {
+  start: number;  // 검색어가 나온 첫 세그먼트 시작
+  end: number;  // 검색어가 나온 마지막 세그먼트 끝
+  text: string;  // 앞뒤 문맥을 포함한 검색 단위 (약 200자)
+  segments: TranscriptSearchSegment[];  // 검색어가 나온 세그먼트
+}
+
+export interface TranscriptSearchResult {
+  transcript_id: string;
+  youtube_url: string;
+  video_id?: string | null;
+  title?: string | null;
+  language?: string | null;
+  transcript_source?: 'captions' | 'asr' | 'duplicate' | null;
+  duration?: number | null;
+  hit_count: number;
+  hits: TranscriptSearchHit[];
+}
+
+export interface TranscriptSearchResponse {
+  query: string;
+  results: TranscriptSearchResult[];
+  search_time_ms: number;
+}
+
+// 중복 스크립트 (재업로드, 짜깁기, 리액션 영상)
+export interface TranscriptDuplicate {
+  transcript_id: string;
+  similarity: number;  // 자카드 유사도 추정치
+  containment?: number;  // 짧은 쪽이 긴 쪽에 포함된 비율
+  youtube_url?: string | null;
+  video_id?: string | null;
+  duration?: number | null;
+}
+
+export interface TranscriptDuplicatesResponse {
+  transcript_id: string;
+  threshold: number;
+  duplicates: TranscriptDuplicate[];
+}
+
+// 스크립트 키워드 (TF-IDF)
+export interface TranscriptKeyword {
+  keyword: string;
+  score: number;
+  count?: number;  // 영상별 키워드만
+  document_frequency: number;  // 이 단어가 나온 스크립트 수
+  document_ratio?: number;  // 전체 키워드만
+}
+
+export interface TranscriptKeywordsResponse {
+  success: boolean;
+  transcript_id: string;
+  keywords: TranscriptKeyword[];
+}
+
+export interface CorpusKeywordsResponse {
+  success: boolean;
+  documents: number;
+  keywords: TranscriptKeyword[];
+}
+
+// 콘텐츠 평가 (Claude CLI)
+export interface ContentEvaluationRequest {
+  content: string;
+  title?: string;
+  category?: string;
+  evaluation_type?: 'comprehensive' | 'simple';
+  long_content?: boolean;  // 구간별 평가 후 합치기 (생략하면 길이에 따라 자동)
+  transcript_id?: string;  // 저장된 스크립트 평가 (content 생략 가능)
+}
+
+export interface ContentEvaluationChunk {
+  index?: number;
+  total?: number;
+  start?: number | null;
+  end?: number | null;
+  characters: number;
+  평균_점수?: number;
+  요약?: string;
+  from_cache: boolean;
+}
+
+export interface ContentEvaluationResponse {
+  success: boolean;
+  evaluation?: Record<string, any>;
+  error?: string;
+  processing_time?: number;
+  result?: string;  // Claude CLI의 원본 텍스트 응답
+  from_cache?: boolean;
+  chunks?: ContentEvaluationChunk[];
+  missing_fields?: string[];  // 스트리밍 응답만: 종합 평가 형식에서 빠진 필드
+}
+
+export interface ContentEvaluationStreamHandlers {
+  onDelta?: (text: string) => void;  // 응답 텍스트 조각
+  onField?: (name: string, value: unknown) => void;  // 완성된 최상위 JSON 필드
+  onChunk?: (chunk: ContentEvaluationChunk) => void;  // 긴 콘텐츠의 구간 평가 완료
+}
+
+// 여러 콘텐츠 일괄 평가 (완료되는 대로 한 줄씩 수신)
+export interface BatchEvaluationItemResult extends ContentEvaluationResponse {
+  type: 'item';
+  index: number;  // 요청 items의 순서
+  timeout: boolean;
+  deduplicated: boolean;  // 같은 요청 안의 동일 항목 결과를 재사용
+  latency: number;  // 항목 처리 시간 (초)
+  completed_at: number;  // 요청 시작부터 완료까지 (초)
+}
+
+export interface BatchEvaluationSummary {
+  type: 'summary';
+  items: number;
+  unique_items: number;
+  succeeded: number;
+  failed: number;
+  cache_hits: number;
+  deduplicated: number;
+  evaluated: number;
+  workers: number;
+  elapsed: number;
+  throughput: number | null;  // 초당 항목 수
+  latency: { mean: number | null; p50: number | null; p95: number | null; max: number | null };
+}
+
 // 사용 가능한 모델 타입
 export interface WhisperModel {
-  name: string;
+  name: string;  // 양자화 모델은 "large-v3:q5_0" 형식
   description: string;
+  size_mb?: number;
+  architecture?: string;
+  quantization?: string | null;
+  sha256?: string | null;
+  speed?: {
+    realtime_factor?: number;  // 실제 처리 속도 (오디오 길이 / 처리 시간)
+    encode_ms?: number;  // whisper-bench 인코더 실행 시간
+  } | null;
 }
 
 export interface ModelsResponse {
@@ -67,7 +247,8 @@ export interface WhisperInfo {
 export interface HealthResponse {
   status: string;
   message: string;
-  device_info: DeviceInfo;
+  ready?: boolean;
+  device_info: DeviceInfo | null;  // 서버 시작 직후 디바이스 확인 전에는 null
   whisper: WhisperInfo;
 }
 
@@ -154,6 +335,205 @@ export const transcribeYouTubeVideo = async (
   }
 };
 
+/**
+ * 추출한 모든 스크립트에서 문구 검색
+ * @param query 검색어 (공백으로 나눈 단어를 모두 포함하는 구간)
+ * @param limit 최대 영상 수
+ */
+export const searchTranscripts = async (
+  query: string,
+  limit = 20
+): Promise<TranscriptSearchResponse> => {
+  try {
+    const params = new URLSearchParams({ q: query, limit: String(limit) });
+    const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.SEARCH}?${params}`);
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || '스크립트 검색에 실패했습니다');
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('스크립트 검색 실패:', error);
+    throw error;
+  }
+};
+
+/**
+ * 스크립트의 TF-IDF 상위 키워드
+ */
+export const getTranscriptKeywords = async (
+  transcriptId: string,
+  limit = 20
+): Promise<TranscriptKeywordsResponse> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/transcripts/${transcriptId}/keywords?limit=${limit}`);
+    if (!response.ok) {
+      throw new Error('스크립트 키워드를 가져올 수 없습니다');
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('스크립트 키워드 가져오기 실패:', error);
+    throw error;
+  }
+};
+
+/**
+ * 추출한 모든 스크립트의 상위 키워드
+ */
+export const getCorpusKeywords = async (limit = 50): Promise<CorpusKeywordsResponse> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/keywords/transcripts?limit=${limit}`);
+    if (!response.ok) {
+      throw new Error('전체 키워드를 가져올 수 없습니다');
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('전체 키워드 가져오기 실패:', error);
+    throw error;
+  }
+};
+
+/**
+ * 내용이 거의 같은 스크립트 찾기
+ */
+export const getTranscriptDuplicates = async (
+  transcriptId: string
+): Promise<TranscriptDuplicatesResponse> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/transcripts/${transcriptId}/duplicates`);
+    if (!response.ok) {
+      throw new Error('중복 스크립트를 찾을 수 없습니다');
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('중복 스크립트 찾기 실패:', error);
+    throw error;
+  }
+};
+
+/**
+ * 콘텐츠 평가 (Server-Sent Events 스트리밍)
+ * 응답 텍스트와 완성된 JSON 필드를 받는 대로 handlers로 전달하고, 검증된 최종 결과를 반환
+ * @param request 평가할 콘텐츠
+ * @param handlers 스트리밍 이벤트 콜백
+ * @param signal 요청 취소 (서버의 CLI 프로세스도 종료됨)
+ */
+export const streamContentEvaluation = async (
+  request: ContentEvaluationRequest,
+  handlers: ContentEvaluationStreamHandlers = {},
+  signal?: AbortSignal
+): Promise<ContentEvaluationResponse> => {
+  const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.EVALUATE_STREAM}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(request),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null as ContentEvaluationResponse | null;  // 콜백에서 할당 (타입 좁히기 방지)
+
+  const dispatch = (frame: string) => {
+    let eventName = 'message';
+    let data = '';
+    for (const line of frame.split('\n')) {
+      if (line.startsWith('event:')) eventName = line.slice(6).trim();
+      else if (line.startsWith('data:')) data += line.slice(5).trim();
+    }
+    if (!data) return;
+    const payload = JSON.parse(data);
+    switch (eventName) {
+      case 'delta':
+        handlers.onDelta?.(payload.text);
+        break;
+      case 'field':
+        handlers.onField?.(payload.name, payload.value);
+        break;
+      case 'chunk':
+        handlers.onChunk?.(payload);
+        break;
+      case 'done':
+        result = payload;
+        break;
+      case 'error':
+        result = { success: false, error: payload.error, processing_time: payload.processing_time };
+        break;
+    }
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      dispatch(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+  if (buffer.trim()) dispatch(buffer);
+
+  if (!result) {
+    throw new Error('평가 스트림이 결과 없이 종료되었습니다');
+  }
+  return result;
+};
+
+/**
+ * 여러 콘텐츠 일괄 평가
+ * 항목 결과를 완료되는 대로 onItem으로 전달하고, 처리량/지연 시간 요약을 반환
+ * @param items 평가할 콘텐츠 목록 (최대 100개)
+ * @param onItem 항목 결과 콜백 (완료 순서, index로 요청 순서 확인)
+ * @param signal 요청 취소
+ */
+export const evaluateContentBatch = async (
+  items: Omit<ContentEvaluationRequest, 'transcript_id'>[],
+  onItem: (item: BatchEvaluationItemResult) => void,
+  signal?: AbortSignal
+): Promise<BatchEvaluationSummary> => {
+  const response = await fetch(`${API_BASE_URL}${API_ENDPOINTS.EVALUATE_BATCH}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ items }),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.detail || `HTTP ${response.status}: ${response.statusText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let summary: BatchEvaluationSummary | null = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    const lines = buffer.split('\n');
+    buffer = done ? '' : lines.pop() ?? '';
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event = JSON.parse(line) as BatchEvaluationItemResult | BatchEvaluationSummary;
+      if (event.type === 'summary') summary = event;
+      else onItem(event);
+    }
+    if (done) break;
+  }
+
+  if (!summary) {
+    throw new Error('일괄 평가가 요약 없이 종료되었습니다');
+  }
+  return summary;
+};
+
 /**
  * YouTube URL 유효성 검사
  */